@@ -1,4 +1,6 @@
+from apps.core.revocation import is_revoked, publish_revocation
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 
 from .models import BlacklistedToken
 
@@ -9,6 +11,7 @@ def blacklist_refresh_token(refresh_token_str: str):
         jti = token.get("jti")
         if jti:
             BlacklistedToken.objects.get_or_create(jti=jti)
+            publish_revocation(jti, datetime_from_epoch(token["exp"]))
             return True
     except Exception:
         pass
@@ -16,4 +19,4 @@ def blacklist_refresh_token(refresh_token_str: str):
 
 
 def is_token_blacklisted(jti: str) -> bool:
-    return BlacklistedToken.objects.filter(jti=jti).exists()
+    return is_revoked(jti)
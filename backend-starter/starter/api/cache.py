@@ -0,0 +1,128 @@
+"""Per-model version counters and versioned response caching.
+
+Cached values embed the current version of every model they were computed
+from; writes bump the version, so stale entries simply stop being read and
+expire on their own. No key scanning or explicit deletes are needed.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = "starter:model-version:{label}"
+RESPONSE_KEY = "starter:response:{digest}"
+
+
+def _version_key(model) -> str:
+    return VERSION_KEY.format(label=model._meta.label_lower)
+
+
+def _seed_version(key: str) -> int:
+    # Seed with a clock value instead of 1 so an evicted counter can never
+    # come back at a number that older cache entries were stored under.
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def get_model_versions(*models) -> tuple:
+    """Return the current version of each model, in order."""
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    return tuple(found[key] if key in found else _seed_version(key) for key in keys)
+
+
+def bump_model_version(model) -> None:
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        _seed_version(key)
+
+
+def _normalized_params(request) -> list:
+    return sorted(
+        (name, sorted(v for v in values if v != ""))
+        for name, values in request.query_params.lists()
+        if any(v != "" for v in values)
+    )
+
+
+class VersionedResponseCacheMixin:
+    """Cache ``list``/``retrieve`` responses keyed by model versions.
+
+    The cache key covers the tenant, host, path, normalized query params and
+    the current version of every model in ``cache_models``; the strong ETag is
+    derived from that key, so ``If-None-Match`` is answered with a 304 before
+    the queryset is touched. Concurrent misses for the same key are collapsed
+    behind a short lock (single flight) so a popular page is rendered once.
+    """
+
+    cache_models = ()
+    cache_lock_seconds = 10
+    cache_lock_wait_seconds = 2.0
+    cache_lock_poll_seconds = 0.05
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_key(self, request) -> str:
+        tenant = getattr(request, "tenant", None)
+        raw = json.dumps(
+            [
+                str(getattr(tenant, "pk", "") or ""),
+                request.get_host(),
+                request.path,
+                _normalized_params(request),
+                get_model_versions(*self.cache_models),
+            ],
+            sort_keys=True,
+        )
+        return RESPONSE_KEY.format(digest=hashlib.sha256(raw.encode()).hexdigest())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.cache_models or settings.API_RESPONSE_CACHE_SECONDS <= 0:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        etag = quote_etag(key.rsplit(":", 1)[-1][:32])
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        data = cache.get(key)
+        if data is None:
+            response = self._render_single_flight(
+                key, handler, request, *args, **kwargs
+            )
+        else:
+            response = Response(data)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+    def _render_single_flight(self, key, handler, request, *args, **kwargs):
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, self.cache_lock_seconds):
+            # Another worker is rendering this page: wait briefly for it
+            deadline = time.monotonic() + self.cache_lock_wait_seconds
+            while time.monotonic() < deadline:
+                time.sleep(self.cache_lock_poll_seconds)
+                data = cache.get(key)
+                if data is not None:
+                    return Response(data)
+            return handler(request, *args, **kwargs)
+        try:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, settings.API_RESPONSE_CACHE_SECONDS)
+            return response
+        finally:
+            cache.delete(lock_key)
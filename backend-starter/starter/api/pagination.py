@@ -1,7 +1,93 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class DefaultPagination(PageNumberPagination):
     page_size = 12
     page_size_query_param = "page_size"
     max_page_size = 50
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (seek) pagination over a descending ``(timestamp, id)`` pair.
+
+    Unlike page numbers, each page is fetched with an indexed range predicate
+    instead of ``OFFSET``, so deep pages cost the same as the first one.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Cursor inválido"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ts_field, pk_field = (field.lstrip("-") for field in self.ordering)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            ts, pk = position
+            queryset = queryset.filter(
+                Q(**{f"{ts_field}__lt": ts})
+                | Q(**{ts_field: ts, f"{pk_field}__lt": pk})
+            )
+
+        # Fetch one extra row to know whether a next page exists
+        rows = list(queryset[: self.page_size + 1])
+        page = rows[: self.page_size]
+        self.next_position = None
+        if len(rows) > self.page_size:
+            last = page[-1]
+            self.next_position = (getattr(last, ts_field), getattr(last, pk_field))
+        return page
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        try:
+            size = int(raw)
+        except (TypeError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            ts = parse_datetime(data["t"])
+            pk = int(data["i"])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message) from None
+        if ts is None:
+            raise NotFound(self.invalid_cursor_message)
+        return ts, pk
+
+    def encode_cursor(self, position):
+        ts, pk = position
+        raw = json.dumps({"t": ts.isoformat(), "i": pk}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
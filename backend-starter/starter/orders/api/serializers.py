@@ -1,28 +1,41 @@
 from rest_framework import serializers
 from starter.products.api.serializers import ProductSerializer
+from starter.products.models import Product
 
-from ..models import Cart, CartItem, Order, PaymentTransaction
+from ..models import Cart, CartItem, Order, OrderItem, PaymentTransaction
+
+# Product columns needed by OrderProductSerializer; used with .only() so order
+# lines never load descriptions, images or relations.
+ORDER_PRODUCT_FIELDS = ("id", "name", "slug", "price")
+
+
+class OrderProductSerializer(serializers.ModelSerializer):
+    """Slim product projection for order lines (no categories/tags/images)."""
+
+    class Meta:
+        model = Product
+        fields = ORDER_PRODUCT_FIELDS
+        read_only_fields = ORDER_PRODUCT_FIELDS
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product = OrderProductSerializer(read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ("product", "quantity", "unit_price", "line_total")
+        read_only_fields = fields
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    items = serializers.SerializerMethodField()
+    # Expects `items` prefetched (see orders.api.views.with_order_items)
+    items = OrderItemSerializer(many=True, read_only=True)
 
     class Meta:
         model = Order
         fields = ("id", "user", "total", "status", "ordered_at", "items")
         read_only_fields = ("id", "ordered_at")
 
-    def get_items(self, obj):
-        return [
-            {
-                "product": ProductSerializer(item.product).data,
-                "quantity": item.quantity,
-                "unit_price": str(item.unit_price),
-                "line_total": str(item.line_total),
-            }
-            for item in obj.items.all()
-        ]
-
 
 class CartItemSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
@@ -1,16 +1,20 @@
 import logging
 
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from starter.api.pagination import KeysetPagination
 from starter.api.permissions import IsAdminOrReadOnly
 from starter.api.views import TenantScopedViewSet
+from starter.products.read_model import with_catalog_relations
 
 from ..models import Cart, CartItem, Order, OrderItem, OrderStatus
 from ..services import PaymentService
 from .serializers import (
+    ORDER_PRODUCT_FIELDS,
     AddCartItemSerializer,
     CartItemSerializer,
     CartSerializer,
@@ -23,8 +27,38 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+def with_order_items(queryset):
+    """Prefetch order lines and their slim product in a single extra query."""
+    items = OrderItem.objects.select_related("product").only(
+        "id",
+        "order_id",
+        "quantity",
+        "unit_price",
+        "line_total",
+        *(f"product__{field}" for field in ORDER_PRODUCT_FIELDS),
+    )
+    return queryset.prefetch_related(Prefetch("items", queryset=items))
+
+
+def with_cart_items(cart: Cart) -> Cart:
+    """Load cart lines with their products and catalog relations up front."""
+    items = with_catalog_relations(
+        CartItem.objects.select_related("product").defer(
+            "product__search_vector", "product__catalog_projection"
+        ),
+        prefix="product__",
+    )
+    prefetch_related_objects([cart], Prefetch("items", queryset=items))
+    return cart
+
+
+class OrderHistoryPagination(KeysetPagination):
+    page_size = 20
+    ordering = ("-ordered_at", "-id")
+
+
 class OrderViewSet(TenantScopedViewSet):
-    queryset = Order.objects.all()
+    queryset = with_order_items(Order.objects.all())
     serializer_class = OrderSerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -38,7 +72,7 @@ class CartView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        cart = _get_or_create_cart(request.user)
+        cart = with_cart_items(_get_or_create_cart(request.user))
         return Response(CartSerializer(cart).data)
 
     def post(self, request):
@@ -104,7 +138,7 @@ class CheckoutView(APIView):
         order = Order.objects.create(
             user=request.user, total=cart.total, status=OrderStatus.PENDING
         )
-        for ci in cart.items.all():
+        for ci in cart.items.select_related("product"):
             OrderItem.objects.create(
                 order=order,
                 product=ci.product,
@@ -121,6 +155,7 @@ class CheckoutView(APIView):
         if not success:
             logger.warning(f"Payment failed for order {order.id}")
 
+        order = with_order_items(Order.objects.filter(pk=order.pk)).get()
         return Response(
             {
                 "order": OrderSerializer(order).data,
@@ -134,8 +169,10 @@ class MyOrdersView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        orders = Order.objects.filter(user=request.user).order_by("-ordered_at")
-        return Response([OrderSerializer(o).data for o in orders])
+        orders = with_order_items(Order.objects.filter(user=request.user))
+        paginator = OrderHistoryPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        return paginator.get_paginated_response(OrderSerializer(page, many=True).data)
 
 
 class WebhookView(APIView):
@@ -27,6 +27,12 @@ class Order(models.Model):
 
     class Meta:
         ordering = ("-ordered_at",)
+        indexes = [
+            # Backs keyset pagination of a user's order history
+            models.Index(
+                fields=["user", "-ordered_at", "-id"], name="order_user_history_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Order #{self.pk} - {self.user}"
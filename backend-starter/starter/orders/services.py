@@ -4,7 +4,7 @@ from typing import Tuple
 
 from django.db import transaction
 
-from ..models import (
+from .models import (
     Order,
     OrderStatus,
     PaymentProvider,
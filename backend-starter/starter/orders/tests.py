@@ -1,12 +1,16 @@
 import secrets
+from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from starter.orders.models import (
     Cart,
     Order,
+    OrderItem,
     OrderStatus,
     PaymentStatus,
     PaymentTransaction,
@@ -74,7 +78,7 @@ class OrdersFlowTests(TestCase):
         history_url = reverse("orders-me")
         res_hist = self.client.get(history_url)
         self.assertEqual(res_hist.status_code, 200)
-        self.assertTrue(any(o["id"] == order_id for o in res_hist.data))
+        self.assertTrue(any(o["id"] == order_id for o in res_hist.data["results"]))
 
     def test_checkout_empty_cart_fails(self):
         checkout_url = reverse("orders-checkout")
@@ -138,3 +142,73 @@ class OrdersFlowTests(TestCase):
         self.assertEqual(order.status, OrderStatus.CANCELED)
         payment = PaymentTransaction.objects.get(order=order)
         self.assertEqual(payment.status, PaymentStatus.FAILED)
+
+
+class OrderHistoryTests(TestCase):
+    # orders page + prefetched items (with products), plus savepoints
+    HISTORY_QUERY_BUDGET = 4
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="history@example.com",
+            password=secrets.token_urlsafe(16) + "A1!",
+            role="cliente",
+        )
+        self.products = [
+            Product.objects.create(
+                name=f"Hist{i}", price=Decimal("10.00"), is_active=True
+            )
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def _create_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(user=self.user, total=Decimal("30.00"))
+            for product in self.products:
+                OrderItem.objects.create(order=order, product=product, quantity=1)
+
+    def _count_history_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("orders-me"), params or {})
+        self.assertEqual(res.status_code, 200)
+        return len(ctx.captured_queries), res
+
+    def test_history_query_count_does_not_grow_with_orders(self):
+        self._create_orders(1)
+        few, _ = self._count_history_queries()
+        self._create_orders(9)
+        many, res = self._count_history_queries()
+        self.assertEqual(len(res.data["results"]), 10)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, self.HISTORY_QUERY_BUDGET)
+
+    def test_history_items_use_slim_product(self):
+        self._create_orders(1)
+        res = self.client.get(reverse("orders-me"))
+        item = res.data["results"][0]["items"][0]
+        self.assertEqual(set(item["product"]), {"id", "name", "slug", "price"})
+        self.assertEqual(item["unit_price"], "10.00")
+        self.assertEqual(item["line_total"], "10.00")
+
+    def test_history_keyset_pagination(self):
+        self._create_orders(5)
+        expected = list(
+            Order.objects.filter(user=self.user)
+            .order_by("-ordered_at", "-id")
+            .values_list("id", flat=True)
+        )
+        seen = []
+        _, res = self._count_history_queries({"page_size": 2})
+        while True:
+            seen.extend(o["id"] for o in res.data["results"])
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+            self.assertEqual(res.status_code, 200)
+        self.assertEqual(seen, expected)
+
+    def test_history_invalid_cursor(self):
+        res = self.client.get(reverse("orders-me"), {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, 404)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Product, Tag
+from .models import Category, Product, ProductRendition, Tag
 
 
 @admin.register(Category)
@@ -17,9 +17,17 @@ class TagAdmin(admin.ModelAdmin):
     list_filter = ("is_active",)
 
 
+class ProductRenditionInline(admin.TabularInline):
+    model = ProductRendition
+    extra = 0
+    can_delete = False
+    readonly_fields = ("size", "format", "width", "height", "file", "source_hash")
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ("name", "price", "is_active", "created_at")
+    inlines = [ProductRenditionInline]
     list_filter = ("is_active", "categories")
     search_fields = ("name", "description")
     autocomplete_fields = ("categories", "tags")
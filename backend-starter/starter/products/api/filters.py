@@ -1,17 +1,39 @@
 import django_filters
+from django.db.models import Exists, OuterRef
 
 from ..models import Product
 
 
+def _has_active_relation(through, related_field, slug):
+    """EXISTS subquery for an active related row with ``slug``.
+
+    Avoids joining the M2M tables (and the ``DISTINCT`` that the join forces).
+    """
+    related = through.objects.filter(
+        product_id=OuterRef("pk"),
+        **{
+            f"{related_field}__slug__iexact": slug,
+            f"{related_field}__is_active": True,
+        },
+    )
+    return Exists(related)
+
+
 class ProductFilter(django_filters.FilterSet):
     price_min = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
     price_max = django_filters.NumberFilter(field_name="price", lookup_expr="lte")
-    category = django_filters.CharFilter(
-        field_name="categories__slug", lookup_expr="iexact"
-    )
-    tag = django_filters.CharFilter(field_name="tags__slug", lookup_expr="iexact")
+    category = django_filters.CharFilter(method="filter_category")
+    tag = django_filters.CharFilter(method="filter_tag")
     active = django_filters.BooleanFilter(field_name="is_active")
 
     class Meta:
         model = Product
         fields = ["price_min", "price_max", "category", "tag", "active"]
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            _has_active_relation(Product.categories.through, "category", value)
+        )
+
+    def filter_tag(self, queryset, name, value):
+        return queryset.filter(_has_active_relation(Product.tags.through, "tag", value))
@@ -1,3 +1,4 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
 from ..models import Category, Product, Tag
@@ -22,6 +23,7 @@ class ProductSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     image = serializers.ImageField(required=False, allow_null=True)
     image_thumb = serializers.ImageField(read_only=True)
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -32,6 +34,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "description",
             "image",
             "image_thumb",
+            "renditions",
             "price",
             "is_active",
             "categories",
@@ -41,6 +44,43 @@ class ProductSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("id", "slug", "created_at", "updated_at")
 
+    def _media_url(self, name: str) -> str:
+        url = default_storage.url(name)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def get_renditions(self, obj):
+        """``{size: {format: url}}``; list views prefetch ``renditions``."""
+        result = {}
+        for rendition in obj.renditions.all():
+            result.setdefault(rendition.size, {})[rendition.format] = self._media_url(
+                rendition.file.name
+            )
+        return result
+
+
+class ProductProjectionSerializer(ProductSerializer):
+    """``ProductSerializer`` output read from ``Product.catalog_projection``.
+
+    Needs no prefetching: relations come from the denormalized column (see
+    ``starter.products.read_model``).
+    """
+
+    categories = serializers.SerializerMethodField()
+    tags = serializers.SerializerMethodField()
+
+    def get_categories(self, obj):
+        return obj.catalog_projection.get("categories", [])
+
+    def get_tags(self, obj):
+        return obj.catalog_projection.get("tags", [])
+
+    def get_renditions(self, obj):
+        return {
+            size: {fmt: self._media_url(name) for fmt, name in formats.items()}
+            for size, formats in obj.catalog_projection.get("renditions", {}).items()
+        }
+
 
 class ProductWriteSerializer(serializers.ModelSerializer):
     # Allow writing relations by ids
@@ -1,7 +1,14 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CategoryViewSet, ProductPublicViewSet, ProductViewSet, TagViewSet
+from .views import (
+    CategoryViewSet,
+    ProductAutocompleteView,
+    ProductFacetsView,
+    ProductPublicViewSet,
+    ProductViewSet,
+    TagViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"api/products", ProductViewSet, basename="product")
@@ -16,4 +23,14 @@ urlpatterns = [
         ProductPublicViewSet.as_view({"get": "list"}),
         name="public-products",
     ),
+    path(
+        "api/public/products/autocomplete",
+        ProductAutocompleteView.as_view(),
+        name="public-products-autocomplete",
+    ),
+    path(
+        "api/public/products/facets",
+        ProductFacetsView.as_view(),
+        name="public-products-facets",
+    ),
 ]
@@ -1,35 +1,47 @@
-from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from starter.api.cache import VersionedResponseCacheMixin
 from starter.api.permissions import IsAdminOrReadOnly
 from starter.api.views import TenantScopedViewSet
 
+from ..facets import get_facets
 from ..models import Category, Product, Tag
+from ..read_model import use_projection, with_catalog_relations
+from ..search import autocomplete_products, search_products
+from .filters import ProductFilter
 from .serializers import (
     CategorySerializer,
+    ProductProjectionSerializer,
     ProductSerializer,
     ProductWriteSerializer,
     TagSerializer,
 )
 
 
-class CategoryViewSet(TenantScopedViewSet):
+class CategoryViewSet(VersionedResponseCacheMixin, TenantScopedViewSet):
+    cache_models = (Category,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
 
 
-class TagViewSet(TenantScopedViewSet):
+class TagViewSet(VersionedResponseCacheMixin, TenantScopedViewSet):
+    cache_models = (Tag,)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsAdminOrReadOnly]
 
 
 class ProductViewSet(TenantScopedViewSet):
-    queryset = Product.objects.all()
+    # Admins also see inactive categories/tags
+    queryset = with_catalog_relations(
+        Product.objects.defer("catalog_projection"), active_only=False
+    )
     permission_classes = [IsAdminOrReadOnly]
     parser_classes = (MultiPartParser, FormParser)
 
@@ -39,33 +51,47 @@ class ProductViewSet(TenantScopedViewSet):
         return ProductSerializer
 
 
-class ProductPublicViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class ProductPublicViewSet(
+    VersionedResponseCacheMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
+    cache_models = (Product, Category, Tag)
     queryset = Product.objects.filter(is_active=True)
-    serializer_class = ProductSerializer
     permission_classes = [AllowAny]
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        params = self.request.query_params
-        q = params.get("q")
-        category = params.get("category")
-        tag = params.get("tag")
-        price_min = params.get("price_min")
-        price_max = params.get("price_max")
-
-        if q:
-            qs = qs.filter(Q(name__icontains=q) | Q(description__icontains=q))
-        if category:
-            qs = qs.filter(categories__slug=category, categories__is_active=True)
-        if tag:
-            qs = qs.filter(tags__slug=tag, tags__is_active=True)
-        if price_min:
-            qs = qs.filter(price__gte=price_min)
-        if price_max:
-            qs = qs.filter(price__lte=price_max)
-        return qs.distinct()
-
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ["name", "description", "slug"]
     ordering_fields = ["name", "price", "created_at"]
+
+    def get_queryset(self):
+        # category/tag/price are applied by ProductFilter (EXISTS subqueries,
+        # no join, no DISTINCT); free text goes through the search index.
+        qs = super().get_queryset().defer("search_vector")
+        if not use_projection():
+            qs = with_catalog_relations(qs.defer("catalog_projection"))
+        return search_products(qs, self.request.query_params.get("q"))
+
+    def get_serializer_class(self):
+        if use_projection():
+            return ProductProjectionSerializer
+        return ProductSerializer
+
+
+class ProductAutocompleteView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        products = autocomplete_products(
+            Product.objects.filter(is_active=True), request.query_params.get("q")
+        )
+        return Response(
+            [{"id": p.id, "name": p.name, "slug": p.slug} for p in products]
+        )
+
+
+class ProductFacetsView(APIView):
+    """Category, tag and price-bucket counts for the current catalog filters."""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(get_facets(request.query_params))
@@ -4,3 +4,35 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "starter.products"
+
+    def ready(self):
+        from django.db.models.signals import (
+            m2m_changed,
+            post_delete,
+            post_save,
+            pre_delete,
+            pre_migrate,
+        )
+
+        from .models import Category, Product, Tag
+        from .signals import (
+            bump_catalog_version,
+            bump_product_version,
+            ensure_search_extensions,
+            refresh_product_projection,
+            refresh_projections_after_delete,
+            refresh_related_projections,
+            remember_related_products,
+        )
+
+        pre_migrate.connect(ensure_search_extensions, sender=self)
+        for model in (Product, Category, Tag):
+            post_save.connect(bump_catalog_version, sender=model)
+            post_delete.connect(bump_catalog_version, sender=model)
+        for through in (Product.categories.through, Product.tags.through):
+            m2m_changed.connect(bump_product_version, sender=through)
+            m2m_changed.connect(refresh_product_projection, sender=through)
+        for model in (Category, Tag):
+            post_save.connect(refresh_related_projections, sender=model)
+            pre_delete.connect(remember_related_products, sender=model)
+            post_delete.connect(refresh_projections_after_delete, sender=model)
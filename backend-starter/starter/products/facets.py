@@ -0,0 +1,122 @@
+"""Facet counts (categories, tags, price buckets) for the public catalog.
+
+Facets are disjunctive: each dimension is counted with every active filter
+except its own, so selecting a category still shows how many products the
+sibling categories would yield. Category and tag counts come from a single
+``UNION`` of two grouped aggregates and the price histogram from one
+conditional aggregate, i.e. two queries per uncached filter set.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Q, Subquery, Value
+from django_filters.utils import translate_validation
+from starter.api.cache import get_model_versions
+
+from .api.filters import ProductFilter
+from .models import Category, Product, Tag
+from .search import search_products
+
+FACET_PARAMS = ("q", "category", "tag", "price_min", "price_max")
+CACHE_KEY = "starter:catalog-facets:{digest}"
+
+
+def normalize_params(params) -> dict:
+    """Keep only facet-relevant, non-empty params with whitespace stripped.
+
+    Raises ``ValidationError`` (400) for values ``ProductFilter`` rejects, as
+    the list endpoint does, before they reach the cache key.
+    """
+    normalized = {}
+    for name in FACET_PARAMS:
+        value = (params.get(name) or "").strip()
+        if value:
+            normalized[name] = value
+    data = {k: v for k, v in normalized.items() if k != "q"}
+    filterset = ProductFilter(data=data, queryset=Product.objects.none())
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return normalized
+
+
+def _filtered_products(params: dict, exclude: tuple = ()):
+    data = {k: v for k, v in params.items() if k not in exclude and k != "q"}
+    qs = Product.objects.filter(is_active=True)
+    qs = ProductFilter(data=data, queryset=qs).qs
+    return search_products(qs, params.get("q"))
+
+
+def _relation_counts(params: dict) -> dict:
+    def grouped(through, field, facet, exclude):
+        product_ids = _filtered_products(params, exclude=exclude).values("pk")
+        # Clear the search ordering: it is meaningless inside IN (...)
+        product_ids = product_ids.order_by()
+        return (
+            through.objects.filter(
+                product_id__in=Subquery(product_ids),
+                **{f"{field}__is_active": True},
+            )
+            .values(
+                facet=Value(facet, output_field=CharField()),
+                slug=F(f"{field}__slug"),
+                name=F(f"{field}__name"),
+            )
+            .annotate(count=Count("product_id"))
+            .order_by()
+        )
+
+    categories = grouped(
+        Product.categories.through, "category", "category", ("category",)
+    )
+    tags = grouped(Product.tags.through, "tag", "tag", ("tag",))
+
+    result = {"categories": [], "tags": []}
+    for row in categories.union(tags, all=True):
+        bucket = result["categories" if row["facet"] == "category" else "tags"]
+        bucket.append({"slug": row["slug"], "name": row["name"], "count": row["count"]})
+    for bucket in result.values():
+        bucket.sort(key=lambda item: (-item["count"], item["name"]))
+    return result
+
+
+def _price_histogram(params: dict) -> list:
+    edges = list(settings.CATALOG_PRICE_BUCKETS)
+    ranges = [(lo, hi) for lo, hi in zip(edges, edges[1:] + [None], strict=True)]
+    aggregates = {}
+    for index, (lo, hi) in enumerate(ranges):
+        condition = Q(price__gte=lo)
+        if hi is not None:
+            condition &= Q(price__lt=hi)
+        aggregates[f"bucket_{index}"] = Count("pk", filter=condition)
+    qs = _filtered_products(params, exclude=("price_min", "price_max")).order_by()
+    counts = qs.aggregate(**aggregates)
+    return [
+        {
+            "min": str(lo),
+            "max": str(hi) if hi is not None else None,
+            "count": counts[f"bucket_{index}"],
+        }
+        for index, (lo, hi) in enumerate(ranges)
+    ]
+
+
+def compute_facets(params: dict) -> dict:
+    facets = _relation_counts(params)
+    facets["price"] = _price_histogram(params)
+    return facets
+
+
+def get_facets(params) -> dict:
+    """Return facets for ``params``, cached until a catalog model changes."""
+    normalized = normalize_params(params)
+    versions = get_model_versions(Product, Category, Tag)
+    raw = json.dumps([normalized, versions], sort_keys=True)
+    key = CACHE_KEY.format(digest=hashlib.sha256(raw.encode()).hexdigest())
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(normalized)
+        cache.set(key, facets, settings.CATALOG_FACETS_CACHE_SECONDS)
+    return facets
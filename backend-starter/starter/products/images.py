@@ -0,0 +1,99 @@
+"""Product image renditions (multi-size JPEG/WebP derivatives).
+
+Renditions are generated off the request path by
+``starter.products.tasks.generate_product_renditions``. The source image is
+identified by its SHA-256 so re-uploading identical content (for the same or
+another product) reuses the stored files instead of re-encoding them.
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+PIL_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(field_file) -> str:
+    """SHA-256 hex digest of a stored file, read in chunks."""
+    digest = hashlib.sha256()
+    field_file.open("rb")
+    try:
+        for chunk in field_file.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def rendition_specs() -> dict:
+    """``{size_name: (max_width, max_height)}`` from settings."""
+    return dict(settings.PRODUCT_IMAGE_RENDITIONS)
+
+
+def rendition_formats() -> tuple:
+    return tuple(settings.PRODUCT_IMAGE_FORMATS)
+
+
+def _open_source(field_file, largest: tuple) -> Image.Image:
+    field_file.open("rb")
+    try:
+        img = Image.open(field_file)
+        # For JPEG sources, let libjpeg decode at a reduced DCT scale close to
+        # the largest rendition instead of decoding every pixel.
+        img.draft("RGB", largest)
+        img.load()
+    finally:
+        field_file.close()
+    return img.convert("RGB")
+
+
+def build_renditions(field_file, source_hash: str, force: bool = False) -> list:
+    """Encode every configured size/format and save it to storage.
+
+    Returns a list of dicts ready for ``ProductRendition(**row)`` (without the
+    product). Files are named after the source hash, so identical uploads map
+    to identical paths; existing files are kept unless ``force`` is set, which
+    replaces them (e.g. after a quality or format change).
+    """
+    specs = rendition_specs()
+    formats = rendition_formats()
+    largest = max(specs.values(), key=lambda wh: wh[0] * wh[1])
+    source = _open_source(field_file, largest)
+    quality = settings.PRODUCT_IMAGE_QUALITY
+
+    rows = []
+    for size, bounds in specs.items():
+        img = source.copy()
+        img.thumbnail(bounds, Image.LANCZOS)
+        for fmt in formats:
+            buffer = BytesIO()
+            img.save(buffer, format=PIL_FORMATS[fmt], quality=quality, optimize=True)
+            name = os.path.join(
+                "products",
+                "renditions",
+                source_hash[:2],
+                f"{source_hash}_{size}.{EXTENSIONS[fmt]}",
+            )
+            exists = default_storage.exists(name)
+            if exists and force:
+                default_storage.delete(name)
+            if force or not exists:
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            rows.append(
+                {
+                    "source_hash": source_hash,
+                    "size": size,
+                    "format": fmt,
+                    "width": img.width,
+                    "height": img.height,
+                    "file": name,
+                }
+            )
+    return rows
@@ -0,0 +1,62 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from starter.products.models import Product
+from starter.products.tasks import generate_product_renditions
+
+
+def _process(product_id: int, force: bool) -> str:
+    try:
+        return generate_product_renditions(product_id, force=force)
+    except Exception:
+        return "failed"
+
+
+def _close_connections():
+    # Forked workers must not reuse the parent's database sockets
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Generate image renditions for existing products across a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Worker processes (1 = inline)"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-encode even when renditions for the same content exist",
+        )
+        parser.add_argument(
+            "--ids", nargs="*", type=int, help="Only process these product ids"
+        )
+
+    def handle(self, *args, **options):
+        qs = Product.objects.exclude(image="").exclude(image__isnull=True)
+        if options["ids"]:
+            qs = qs.filter(pk__in=options["ids"])
+        ids = list(qs.order_by("pk").values_list("pk", flat=True))
+        force = options["force"]
+        workers = max(1, options["workers"])
+        self.stdout.write(f"Processing {len(ids)} products with {workers} worker(s)")
+
+        results = Counter()
+        if workers == 1:
+            for pk in ids:
+                results[_process(pk, force)] += 1
+        else:
+            _close_connections()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_close_connections
+            ) as pool:
+                for outcome in pool.map(
+                    _process, ids, [force] * len(ids), chunksize=16
+                ):
+                    results[outcome] += 1
+
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(results.items()))
+        self.stdout.write(self.style.SUCCESS(f"Done: {summary or 'nothing to do'}"))
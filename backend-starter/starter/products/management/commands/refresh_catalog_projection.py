@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from starter.api.cache import bump_model_version
+from starter.products.models import Product
+from starter.products.read_model import refresh_projections
+
+
+class Command(BaseCommand):
+    help = "Rebuild Product.catalog_projection (run once after enabling it)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ids", nargs="*", type=int, help="Only refresh these product ids"
+        )
+
+    def handle(self, *args, **options):
+        qs = Product.objects.all()
+        if options["ids"]:
+            qs = qs.filter(pk__in=options["ids"])
+        updated = refresh_projections(qs.values_list("pk", flat=True))
+        bump_model_version(Product)
+        self.stdout.write(self.style.SUCCESS(f"{updated} products refreshed"))
@@ -1,12 +1,12 @@
-import os
 from decimal import Decimal
-from io import BytesIO
 
-from django.core.files.base import ContentFile
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
-from PIL import Image
+
+from .search import product_document
 
 
 class Category(models.Model):
@@ -43,6 +43,10 @@ class Tag(models.Model):
         return self.name
 
 
+def empty_projection() -> dict:
+    return {"categories": [], "tags": [], "renditions": {}}
+
+
 class Product(models.Model):
     name = models.CharField(max_length=200)
     slug = models.SlugField(max_length=220, unique=True, blank=True)
@@ -51,6 +55,8 @@ class Product(models.Model):
     image_thumb = models.ImageField(
         upload_to="products/thumbs/%Y/%m/", blank=True, null=True
     )
+    # SHA-256 of the image the current renditions were generated from
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
     price = models.DecimalField(
         max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal("0"))]
     )
@@ -59,43 +65,68 @@ class Product(models.Model):
     tags = models.ManyToManyField(Tag, related_name="products", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized categories/tags/renditions; see starter.products.read_model
+    catalog_projection = models.JSONField(default=empty_projection, editable=False)
+    # Maintained by the database; see starter.products.search
+    search_vector = models.GeneratedField(
+        expression=product_document(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
+            GinIndex(
+                fields=["name"], name="product_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_image_name = instance.__dict__.get("image")
+        return instance
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        # Save first to ensure image file is available in storage
         super().save(*args, **kwargs)
-        # Generate thumbnail if needed
-        if self.image and (not self.image_thumb or self._thumbnail_needs_update()):
-            try:
-                self._generate_thumbnail()
-            except Exception:
-                # skip thumbnail on errors
-                pass
-
-    def _thumbnail_needs_update(self):
-        # Regenerate if thumb missing or base filename changed
-        if not self.image_thumb:
-            return True
-        base = os.path.splitext(os.path.basename(self.image.name))[0]
-        thumb_base = os.path.splitext(os.path.basename(self.image_thumb.name))[0]
-        return not thumb_base.startswith(base)
-
-    def _generate_thumbnail(self, size=(300, 300)):
-        img = Image.open(self.image)
-        img = img.convert("RGB")
-        img.thumbnail(size, Image.LANCZOS)
-        buffer = BytesIO()
-        img.save(buffer, format="JPEG", quality=85)
-        buffer.seek(0)
-        base = os.path.splitext(os.path.basename(self.image.name))[0]
-        filename = f"{base}_thumb.jpg"
-        content = ContentFile(buffer.read())
-        self.image_thumb.save(filename, content, save=False)
-        super().save(update_fields=["image_thumb"])
+        # Renditions (including image_thumb) are built by a Celery task after
+        # commit; the request never decodes or resizes the upload.
+        if self.image and self.image.name != getattr(self, "_loaded_image_name", None):
+            self._loaded_image_name = self.image.name
+            transaction.on_commit(self._enqueue_renditions)
+
+    def _enqueue_renditions(self):
+        from .tasks import generate_product_renditions
+
+        generate_product_renditions.delay(self.pk)
 
     def __str__(self) -> str:
         return self.name
+
+
+class ProductRendition(models.Model):
+    """One resized/re-encoded derivative of a product image."""
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="renditions"
+    )
+    source_hash = models.CharField(max_length=64, db_index=True)
+    size = models.CharField(max_length=20)
+    format = models.CharField(max_length=10)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.ImageField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "size", "format"], name="product_rendition_unique"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} {self.size}.{self.format}"
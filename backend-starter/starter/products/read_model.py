@@ -0,0 +1,81 @@
+"""Catalog read model: prefetching helpers and the denormalized projection.
+
+List endpoints serialize categories, tags and renditions for every product.
+``with_catalog_relations`` loads them with one query per relation for the
+whole page. ``Product.catalog_projection`` goes further: it stores the
+already-serialized relations on the product row, kept current by the
+``m2m_changed``/``post_save`` handlers in ``starter.products.signals`` and by
+the rendition task, so a page needs no extra queries at all (enable with
+``CATALOG_READ_PROJECTION``).
+"""
+
+from django.conf import settings
+from django.db.models import Prefetch
+
+from .models import Category, Product, Tag
+
+RELATION_FIELDS = ("id", "name", "slug", "is_active")
+REFRESH_BATCH_SIZE = 500
+
+
+def use_projection() -> bool:
+    return settings.CATALOG_READ_PROJECTION
+
+
+def with_catalog_relations(queryset, active_only: bool = True, prefix: str = ""):
+    """Prefetch categories, tags and renditions for a product queryset.
+
+    ``prefix`` allows prefetching through another relation, e.g.
+    ``with_catalog_relations(CartItem.objects.all(), prefix="product__")``.
+    With ``active_only`` inactive categories and tags are left out, as the
+    public catalog never shows them.
+    """
+    categories = Category.objects.only(*RELATION_FIELDS)
+    tags = Tag.objects.only(*RELATION_FIELDS)
+    if active_only:
+        categories = categories.filter(is_active=True)
+        tags = tags.filter(is_active=True)
+    return queryset.prefetch_related(
+        Prefetch(f"{prefix}categories", queryset=categories),
+        Prefetch(f"{prefix}tags", queryset=tags),
+        f"{prefix}renditions",
+    )
+
+
+def _relation_rows(objects) -> list:
+    return [
+        {field: getattr(obj, field) for field in RELATION_FIELDS} for obj in objects
+    ]
+
+
+def build_projection(product) -> dict:
+    """Serialize ``product``'s (prefetched) relations into a JSON document.
+
+    Renditions keep storage names, not URLs, so the projection never goes
+    stale when ``MEDIA_URL`` or the storage domain changes.
+    """
+    renditions = {}
+    for rendition in product.renditions.all():
+        renditions.setdefault(rendition.size, {})[
+            rendition.format
+        ] = rendition.file.name
+    return {
+        "categories": _relation_rows(product.categories.all()),
+        "tags": _relation_rows(product.tags.all()),
+        "renditions": renditions,
+    }
+
+
+def refresh_projections(product_ids) -> int:
+    """Rebuild ``catalog_projection`` for ``product_ids``; returns rows updated."""
+    product_ids = sorted(set(product_ids))
+    updated = 0
+    for start in range(0, len(product_ids), REFRESH_BATCH_SIZE):
+        batch = product_ids[start : start + REFRESH_BATCH_SIZE]
+        products = list(
+            with_catalog_relations(Product.objects.filter(pk__in=batch).only("id"))
+        )
+        for product in products:
+            product.catalog_projection = build_projection(product)
+        updated += Product.objects.bulk_update(products, ["catalog_projection"])
+    return updated
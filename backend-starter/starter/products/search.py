@@ -0,0 +1,106 @@
+"""Catalog search backed by PostgreSQL full-text and trigram indexes.
+
+``Product.search_vector`` is a stored generated ``tsvector`` column (GIN
+indexed) and ``Product.name`` carries a ``gin_trgm_ops`` index, so matching
+and ranking never fall back to sequential ``ILIKE`` scans. On other database
+vendors (e.g. SQLite in local test runs) the helpers degrade to plain
+``icontains``/``istartswith`` lookups.
+"""
+
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+SEARCH_CONFIG = "portuguese"
+AUTOCOMPLETE_LIMIT = 10
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class DocumentVector(SearchVector):
+    """``SearchVector`` usable in a ``GeneratedField`` on any vendor.
+
+    PostgreSQL gets the real ``to_tsvector``; SQLite has no text-search type,
+    so the column just stores the source text to keep the schema portable.
+    """
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        (expression,) = self.get_source_expressions()
+        return compiler.compile(Coalesce(expression, Value("")))
+
+
+def product_document():
+    """Expression stored in ``Product.search_vector`` (name weighs most)."""
+    return (
+        DocumentVector("name", config=SEARCH_CONFIG, weight="A")
+        + DocumentVector("slug", config=SEARCH_CONFIG, weight="B")
+        + DocumentVector("description", config=SEARCH_CONFIG, weight="C")
+    )
+
+
+def _is_postgres() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def prefix_query(term: str):
+    """Build a ``to_tsquery`` matching every word of ``term`` as a prefix.
+
+    Returns ``None`` when the term has no searchable tokens.
+    """
+    tokens = _TOKEN_RE.findall(term.lower())
+    if not tokens:
+        return None
+    raw = " & ".join(f"{token}:*" for token in tokens)
+    return SearchQuery(raw, config=SEARCH_CONFIG, search_type="raw")
+
+
+def search_products(queryset, term: str):
+    """Filter and rank ``queryset`` by ``term``.
+
+    Full-text prefix matches rank first (``SearchRank``); names that only
+    resemble the term (typos) are still returned through the index-backed
+    trigram word-similarity operator (``pg_trgm.word_similarity_threshold``).
+    """
+    term = (term or "").strip()
+    if not term:
+        return queryset
+    if not _is_postgres():
+        return queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+
+    query = prefix_query(term)
+    if query is None:
+        return queryset.none()
+    return (
+        queryset.annotate(
+            search_rank=SearchRank(F("search_vector"), query),
+            name_similarity=TrigramWordSimilarity(term, "name"),
+        )
+        .filter(Q(search_vector=query) | Q(name__trigram_word_similar=term))
+        .order_by("-search_rank", "-name_similarity", "name")
+    )
+
+
+def autocomplete_products(queryset, term: str, limit: int = AUTOCOMPLETE_LIMIT):
+    """Return up to ``limit`` products with words starting with ``term``'s words."""
+    term = (term or "").strip()
+    if not term:
+        return queryset.none()
+    if not _is_postgres():
+        return queryset.filter(name__istartswith=term).order_by("name")[:limit]
+
+    query = prefix_query(term)
+    if query is None:
+        return queryset.none()
+    return (
+        queryset.annotate(search_rank=SearchRank(F("search_vector"), query))
+        .filter(search_vector=query)
+        .order_by("-search_rank", "name")[:limit]
+    )
@@ -0,0 +1,64 @@
+from django.db import connections
+from starter.api.cache import bump_model_version
+
+from .models import Product
+from .read_model import refresh_projections
+
+
+def ensure_search_extensions(sender, using="default", **kwargs):
+    """Create ``pg_trgm`` before tables are synced.
+
+    The trigram index on ``Product.name`` needs the operator class to exist
+    when the table is created, so this runs on ``pre_migrate``.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def bump_catalog_version(sender, **kwargs):
+    """Invalidate cached catalog data derived from ``sender``."""
+    bump_model_version(sender)
+
+
+def bump_product_version(sender, **kwargs):
+    # m2m_changed is sent by the through model; categories/tags belong to Product
+    bump_model_version(Product)
+
+
+def refresh_product_projection(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep ``Product.catalog_projection`` in sync with category/tag links."""
+    if action == "pre_clear" and reverse:
+        # pk_set is None on clear; remember the affected products first
+        instance._projection_product_ids = list(
+            instance.products.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        product_ids = [instance.pk]
+    elif action == "post_clear":
+        product_ids = instance.__dict__.pop("_projection_product_ids", [])
+    else:
+        product_ids = pk_set
+    refresh_projections(product_ids)
+
+
+def refresh_related_projections(sender, instance, created=False, **kwargs):
+    """A category/tag was renamed or (de)activated: rebuild its products."""
+    if not created:
+        refresh_projections(instance.products.values_list("pk", flat=True))
+
+
+def remember_related_products(sender, instance, **kwargs):
+    # The link rows are gone by post_delete, so collect the products now
+    instance._projection_product_ids = list(
+        instance.products.values_list("pk", flat=True)
+    )
+
+
+def refresh_projections_after_delete(sender, instance, **kwargs):
+    refresh_projections(instance.__dict__.pop("_projection_product_ids", []))
@@ -0,0 +1,66 @@
+from celery import shared_task
+from django.db import transaction
+from starter.api.cache import bump_model_version
+
+from .images import build_renditions, content_hash
+from .models import Product, ProductRendition
+from .read_model import refresh_projections
+
+THUMB_SIZE = "thumb"
+THUMB_FORMAT = "jpeg"
+
+
+@shared_task
+def generate_product_renditions(product_id: int, force: bool = False) -> str:
+    """Build (or reuse) every rendition of a product's current image.
+
+    Returns ``"generated"``, ``"reused"``, ``"skipped"`` or ``"no_image"``.
+    """
+    product = Product.objects.filter(pk=product_id).only("id", "image", "image_hash")
+    product = product.first()
+    if product is None or not product.image:
+        return "no_image"
+
+    digest = content_hash(product.image)
+    if not force and digest == product.image_hash and product.renditions.exists():
+        return "skipped"
+
+    rows = []
+    if not force:
+        # Identical content already processed (any product): reuse its files
+        donor = (
+            ProductRendition.objects.filter(source_hash=digest)
+            .values_list("product_id", flat=True)
+            .first()
+        )
+        if donor is not None:
+            rows = list(
+                ProductRendition.objects.filter(
+                    product_id=donor, source_hash=digest
+                ).values("source_hash", "size", "format", "width", "height", "file")
+            )
+    outcome = "reused" if rows else "generated"
+    if not rows:
+        rows = build_renditions(product.image, digest, force=force)
+
+    thumb = next(
+        (
+            r["file"]
+            for r in rows
+            if (r["size"], r["format"]) == (THUMB_SIZE, THUMB_FORMAT)
+        ),
+        None,
+    )
+    with transaction.atomic():
+        ProductRendition.objects.filter(product_id=product_id).delete()
+        ProductRendition.objects.bulk_create(
+            ProductRendition(product_id=product_id, **row) for row in rows
+        )
+        # .update() skips Product.save(): no re-enqueue and a single write
+        fields = {"image_hash": digest}
+        if thumb:
+            fields["image_thumb"] = thumb
+        Product.objects.filter(pk=product_id).update(**fields)
+        refresh_projections([product_id])
+        transaction.on_commit(lambda: bump_model_version(Product))
+    return outcome
@@ -1,10 +1,21 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
 from secrets import token_urlsafe
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from PIL import Image
 from rest_framework.test import APIClient
-from starter.products.models import Category, Product, Tag
+from starter.products.models import Category, Product, ProductRendition, Tag
+from starter.products.tasks import generate_product_renditions
 
 User = get_user_model()
 
@@ -117,6 +128,36 @@ class ProductModuleTests(TestCase):
         names_inactive = [item["name"] for item in data_inactive]
         self.assertNotIn("InactiveOne", names_inactive)
 
+    def test_public_category_filter_ignores_inactive_category(self):
+        hidden = Category.objects.create(name="Hidden", is_active=False)
+        product = Product.objects.create(
+            name="Hideout", description="Desc", price="10.00", is_active=True
+        )
+        product.categories.add(hidden, self.category)
+        url = reverse("public-products")
+        res_hidden = self.client.get(url, {"category": hidden.slug})
+        self.assertEqual(res_hidden.data["count"], 0)
+        res_visible = self.client.get(url, {"category": self.category.slug})
+        self.assertEqual(
+            [item["name"] for item in res_visible.data["results"]], ["Hideout"]
+        )
+
+    def test_public_autocomplete(self):
+        Product.objects.create(
+            name="Chatbot Pro", description="Desc", price="10.00", is_active=True
+        )
+        Product.objects.create(
+            name="Chatter", description="Desc", price="10.00", is_active=False
+        )
+        Product.objects.create(
+            name="Mailer", description="Desc", price="10.00", is_active=True
+        )
+        res = self.client.get(reverse("public-products-autocomplete"), {"q": "chat"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([item["name"] for item in res.data], ["Chatbot Pro"])
+        res_empty = self.client.get(reverse("public-products-autocomplete"))
+        self.assertEqual(res_empty.data, [])
+
     def test_admin_can_create_product_with_category(self):
         url = reverse("product-list")
         data = {
@@ -158,3 +199,250 @@ class ProductModuleTests(TestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
         res_create = self.client.post(url, data, format="json")
         self.assertEqual(res_create.status_code, 403)
+
+
+class ProductFacetsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.chatbots = Category.objects.create(name="Chatbots")
+        self.email = Category.objects.create(name="Email")
+        self.ai = Tag.objects.create(name="AI")
+        cheap = Product.objects.create(name="Cheap", price="20.00")
+        mid = Product.objects.create(name="Mid", price="120.00")
+        pricey = Product.objects.create(name="Pricey", price="2000.00")
+        Product.objects.create(name="Hidden", price="20.00", is_active=False)
+        cheap.categories.add(self.chatbots)
+        mid.categories.add(self.chatbots, self.email)
+        pricey.categories.add(self.email)
+        mid.tags.add(self.ai)
+        self.url = reverse("public-products-facets")
+
+    @staticmethod
+    def _counts(rows):
+        return {row["slug"]: row["count"] for row in rows}
+
+    def test_facets_count_active_products(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            self._counts(res.data["categories"]), {"chatbots": 2, "email": 2}
+        )
+        self.assertEqual(self._counts(res.data["tags"]), {"ai": 1})
+        price = {row["min"]: row["count"] for row in res.data["price"]}
+        self.assertEqual(price["0"], 1)
+        self.assertEqual(price["100"], 1)
+        self.assertEqual(price["1000"], 1)
+        self.assertIsNone(res.data["price"][-1]["max"])
+
+    def test_facets_exclude_own_dimension(self):
+        res = self.client.get(self.url, {"category": "chatbots", "price_max": "100"})
+        # category counts ignore the category filter but honour the price one
+        self.assertEqual(self._counts(res.data["categories"]), {"chatbots": 1})
+        # price buckets ignore price filters but honour the category one
+        price = {row["min"]: row["count"] for row in res.data["price"]}
+        self.assertEqual(price["0"], 1)
+        self.assertEqual(price["100"], 1)
+
+    def test_facets_are_cached_until_catalog_changes(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        # only the ATOMIC_REQUESTS savepoint statements remain
+        sql = [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(sql, [])
+        Product.objects.get(name="Pricey").tags.add(self.ai)
+        res = self.client.get(self.url)
+        self.assertEqual(self._counts(res.data["tags"]), {"ai": 2})
+
+    def test_invalid_price_is_rejected_like_the_list(self):
+        params = {"price_min": "cheap"}
+        listed = self.client.get(reverse("public-products"), params)
+        res = self.client.get(self.url, params)
+        self.assertEqual(listed.status_code, 400)
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data, listed.data)
+
+
+class CatalogResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Product.objects.create(name="Cached", price="10.00")
+        self.url = reverse("public-products")
+
+    def _db_queries(self, ctx):
+        return [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+
+    def test_etag_short_circuits_to_304(self):
+        first = self.client.get(self.url, {"q": "cach"})
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.url, {"q": "cach"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(self._db_queries(ctx), [])
+
+    def test_cached_body_is_served_without_queries(self):
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(self.url)
+        self.assertEqual(self._db_queries(ctx), [])
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_writes_invalidate_cached_responses(self):
+        first = self.client.get(self.url)
+        Product.objects.create(name="Fresh", price="12.00")
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+        self.assertEqual(res.data["count"], 2)
+
+
+def _jpeg_upload(name="photo.jpg", color="red", size=(1200, 900)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class ProductRenditionTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _product(self, name, upload):
+        with mock.patch(
+            "starter.products.tasks.generate_product_renditions.delay"
+        ) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                product = Product.objects.create(name=name, price="1.00", image=upload)
+        delay.assert_called_once_with(product.pk)
+        return product
+
+    def test_save_enqueues_instead_of_resizing_inline(self):
+        product = self._product("Photo", _jpeg_upload())
+        product.refresh_from_db()
+        self.assertFalse(product.image_thumb)
+        self.assertFalse(product.renditions.exists())
+        # saving again without a new upload does not enqueue
+        with mock.patch(
+            "starter.products.tasks.generate_product_renditions.delay"
+        ) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.name = "Renamed"
+                product.save()
+        delay.assert_not_called()
+
+    def test_task_generates_sizes_and_formats(self):
+        product = self._product("Photo", _jpeg_upload())
+        self.assertEqual(generate_product_renditions(product.pk), "generated")
+        product.refresh_from_db()
+        renditions = {(r.size, r.format): r for r in product.renditions.all()}
+        self.assertEqual(len(renditions), 6)
+        self.assertEqual(renditions[("thumb", "webp")].width, 300)
+        self.assertEqual(renditions[("medium", "jpeg")].height, 600)
+        self.assertTrue(product.image_thumb.name.endswith("_thumb.jpg"))
+        self.assertEqual(len(product.image_hash), 64)
+        # same content again is skipped
+        self.assertEqual(generate_product_renditions(product.pk), "skipped")
+
+    def test_identical_upload_reuses_files(self):
+        first = self._product("First", _jpeg_upload("a.jpg"))
+        generate_product_renditions(first.pk)
+        second = self._product("Second", _jpeg_upload("b.jpg"))
+        self.assertEqual(generate_product_renditions(second.pk), "reused")
+
+        def files(product):
+            return set(
+                ProductRendition.objects.filter(product=product).values_list(
+                    "file", flat=True
+                )
+            )
+
+        self.assertEqual(files(first), files(second))
+
+    def test_force_reencodes_existing_files(self):
+        product = self._product("Photo", _jpeg_upload(color="green"))
+        generate_product_renditions(product.pk)
+        rendition = product.renditions.get(size="large", format="jpeg")
+        name, before = rendition.file.name, rendition.file.read()
+        rendition.file.close()
+
+        with override_settings(PRODUCT_IMAGE_QUALITY=10):
+            self.assertEqual(
+                generate_product_renditions(product.pk, force=True), "generated"
+            )
+        rendition = product.renditions.get(size="large", format="jpeg")
+        # Same hash-based name, new content
+        self.assertEqual(rendition.file.name, name)
+        after = rendition.file.read()
+        rendition.file.close()
+        self.assertNotEqual(after, before)
+
+    def test_backfill_command_inline(self):
+        product = self._product("Backfill", _jpeg_upload(color="blue"))
+        call_command("backfill_product_renditions", workers=1, stdout=StringIO())
+        self.assertEqual(product.renditions.count(), 6)
+
+
+@override_settings(API_RESPONSE_CACHE_SECONDS=0)
+class CatalogReadModelTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("public-products")
+        self.chatbots = Category.objects.create(name="Chatbots")
+        self.retired = Category.objects.create(name="Retired", is_active=False)
+        self.ai = Tag.objects.create(name="AI")
+        for i in range(12):
+            product = Product.objects.create(name=f"Product {i:02}", price="5.00")
+            product.categories.add(self.chatbots, self.retired)
+            product.tags.add(self.ai)
+
+    def _db_queries(self, ctx):
+        return [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+
+    def test_list_query_count_does_not_grow_with_page(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        # count + page + categories + tags + renditions
+        self.assertEqual(len(self._db_queries(ctx)), 5)
+        first = res.data["results"][0]
+        self.assertEqual([c["slug"] for c in first["categories"]], ["chatbots"])
+        self.assertEqual([t["slug"] for t in first["tags"]], ["ai"])
+
+    def test_projection_serves_same_payload_without_joins(self):
+        expected = self.client.get(self.url).data
+        with override_settings(CATALOG_READ_PROJECTION=True):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get(self.url)
+        self.assertEqual(len(self._db_queries(ctx)), 2)
+        self.assertEqual(res.data, expected)
+
+    def test_projection_follows_relation_changes(self):
+        product = Product.objects.get(name="Product 00")
+        email = Category.objects.create(name="Email")
+        product.categories.add(email)
+        product.refresh_from_db()
+        self.assertEqual(
+            [c["slug"] for c in product.catalog_projection["categories"]],
+            ["chatbots", "email"],
+        )
+
+        self.chatbots.name = "Bots"
+        self.chatbots.save()
+        product.refresh_from_db()
+        self.assertEqual(product.catalog_projection["categories"][0]["name"], "Bots")
+
+        self.ai.products.clear()
+        email.delete()
+        product.refresh_from_db()
+        self.assertEqual(
+            [c["slug"] for c in product.catalog_projection["categories"]],
+            ["chatbots"],
+        )
+        self.assertEqual(product.catalog_projection["tags"], [])
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
 
 import dj_database_url
@@ -18,6 +19,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 THIRD_PARTY_APPS = [
@@ -125,6 +127,16 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Product image renditions generated by starter.products.tasks
+# (size name -> max bounding box); "thumb" JPEG also backs Product.image_thumb
+PRODUCT_IMAGE_RENDITIONS = {
+    "thumb": (300, 300),
+    "medium": (800, 800),
+    "large": (1600, 1600),
+}
+PRODUCT_IMAGE_FORMATS = ("jpeg", "webp")
+PRODUCT_IMAGE_QUALITY = config("PRODUCT_IMAGE_QUALITY", cast=int, default=85)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
@@ -228,6 +240,21 @@ else:
         }
     }
 
+# Public catalog facets: price histogram edges and cache TTL (entries are also
+# invalidated on any Product/Category/Tag write)
+CATALOG_PRICE_BUCKETS = config(
+    "CATALOG_PRICE_BUCKETS", cast=Csv(cast=Decimal), default="0,50,100,250,500,1000"
+)
+CATALOG_FACETS_CACHE_SECONDS = config(
+    "CATALOG_FACETS_CACHE_SECONDS", cast=int, default=300
+)
+# Serve public product lists from the denormalized Product.catalog_projection
+CATALOG_READ_PROJECTION = config("CATALOG_READ_PROJECTION", cast=bool, default=False)
+
+# Versioned response cache for read-heavy catalog endpoints (0 disables);
+# entries are invalidated by model writes, the TTL only bounds memory
+API_RESPONSE_CACHE_SECONDS = config("API_RESPONSE_CACHE_SECONDS", cast=int, default=600)
+
 # Cache middleware TTL (set >0 to enable Update/Fetch middleware pair in MIDDLEWARE)
 CACHE_MIDDLEWARE_SECONDS = config("CACHE_MIDDLEWARE_SECONDS", cast=int, default=0)
 CACHE_MIDDLEWARE_KEY_PREFIX = "starter"
@@ -0,0 +1,29 @@
+"""Settings for ``benchmarks/run.py``.
+
+Dev settings with the database from ``DATABASE_URL`` (a local Postgres for
+representative search numbers) and the cache picked by ``BENCH_CACHE``:
+``redis`` (``REDIS_URL``), ``fakeredis`` (in-process server behind the
+same Redis client) or ``locmem``.
+"""
+
+from decouple import config
+
+from .dev import *  # noqa
+
+# DEBUG keeps every query in connection.queries
+DEBUG = False
+
+BENCH_CACHE = config("BENCH_CACHE", default="redis")
+if BENCH_CACHE == "locmem":
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": config("REDIS_URL", default="redis://localhost:6379/0"),
+        }
+    }
+    if BENCH_CACHE == "fakeredis":
+        import fakeredis
+
+        CACHES["default"]["OPTIONS"] = {"connection_class": fakeredis.FakeConnection}
@@ -1,3 +1,5 @@
+from apps.core import fair_queue
+from apps.core.async_views import AsyncAPIView
 from apps.rbac.permissions import HasPermission
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -25,7 +27,7 @@ class AiStatusView(APIView):
         return Response({"service": "ai", "status": "ok"})
 
 
-class AiInferView(APIView):
+class AiInferView(AsyncAPIView):
     required_permission = "ai_infer"
     permission_classes = [IsAuthenticated, HasPermission]
     throttle_scope = "ai_infer"
@@ -52,11 +54,16 @@ class AiInferView(APIView):
         },
         tags=["ai"],
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = AiInferSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        task = run_ai_inference.delay(data["model"], data["prompt"])
+        task = await fair_queue.aenqueue(
+            getattr(request, "tenant", None),
+            run_ai_inference,
+            data["model"],
+            data["prompt"],
+        )
         return Response(
             {"id": task.id, "status": "queued"}, status=status.HTTP_201_CREATED
         )
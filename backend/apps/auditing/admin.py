@@ -1,15 +1,26 @@
 import csv
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
 
+from apps.core import profiling
 from django.conf import settings
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin import SimpleListFilter
-from django.http import HttpResponse
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils import timezone
 from django.utils.html import format_html
 
 from .models import AuditLog, AuditRetentionPolicy
 
 
+def _from_timestamp(value):
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = (
@@ -42,6 +53,87 @@ class AuditLogAdmin(admin.ModelAdmin):
     )
     actions = ["export_selected_as_csv", "requeue_selected_dlq", "purge_old_dlq"]
 
+    def get_urls(self):
+        # Profiles (apps.core.profiling) live next to the audit logs
+        view = self.admin_site.admin_view
+        return [
+            path(
+                "profiles/",
+                view(self.profiles_view),
+                name="auditing_auditlog_profiles",
+            ),
+            path(
+                "profiles/<str:name>",
+                view(self.profile_download_view),
+                name="auditing_auditlog_profile_download",
+            ),
+        ] + super().get_urls()
+
+    def profiles_view(self, request):
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        token = None
+        if request.method == "POST":
+            action = request.POST.get("action")
+            if action == "token":
+                token = profiling.profiling_token(request.user)
+            elif action == "add_rule":
+                try:
+                    rate = float(request.POST.get("rate") or 0)
+                    minutes = int(request.POST.get("minutes") or 0)
+                except ValueError:
+                    rate = minutes = 0
+                if not 0 < rate <= 1 or minutes <= 0:
+                    messages.error(request, "Rate must be in (0, 1] and minutes > 0")
+                else:
+                    rule = {
+                        key: request.POST.get(key, "").strip()
+                        for key in ("tenant", "path", "task")
+                    }
+                    rule.update(rate=rate, expires_at=time.time() + minutes * 60)
+                    profiling.set_rules(profiling.get_rules() + [rule])
+                    return HttpResponseRedirect(request.path)
+            elif action == "clear_rules":
+                profiling.set_rules([])
+                return HttpResponseRedirect(request.path)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Profiles",
+            "token": token,
+            "token_header": profiling.TOKEN_HEADER,
+            "token_max_age": settings.PROFILING_TOKEN_MAX_AGE,
+            "rules": [
+                {**rule, "expires": _from_timestamp(rule["expires_at"])}
+                for rule in profiling.get_rules()
+            ],
+            "profiles": [
+                {**meta, "created": _from_timestamp(meta["created_at"])}
+                for meta in profiling.list_profiles()
+            ],
+        }
+        return TemplateResponse(request, "admin/auditing/profiles.html", context)
+
+    def profile_download_view(self, request, name):
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        profile = profiling.profile_path(name)
+        if profile is None:
+            raise Http404
+        return FileResponse(
+            profile.open("rb"),
+            as_attachment=True,
+            filename=name,
+            content_type="application/gzip",
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            "profiles_url": reverse("admin:auditing_auditlog_profiles"),
+        }
+        return super().changelist_view(request, extra_context)
+
     @admin.action(description="Export selected as CSV")
     def export_selected_as_csv(self, request, queryset):
         response = HttpResponse(content_type="text/csv")
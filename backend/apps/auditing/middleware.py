@@ -1,14 +1,33 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
 from .models import AuditLog
 from .utils import get_client_ip
 
 
 class AuditMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         response = self.get_response(request)
+        self.record(request, response)
+        return response
 
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        # request.user may be lazy (session lookup) and the row is written on
+        # the tenant's connection: both belong to the request's ORM thread
+        await sync_to_async(self.record)(request, response)
+        return response
+
+    def record(self, request, response):
         try:
             user = getattr(request, "user", None)
             tenant = getattr(request, "tenant", None)
@@ -27,8 +46,9 @@ class AuditMiddleware:
                 action = "error"
 
             AuditLog.objects.create(
-                user=(
-                    user
+                # user_id also covers stateless (claims-only) principals
+                user_id=(
+                    user.pk
                     if (user and getattr(user, "is_authenticated", False))
                     else None
                 ),
@@ -44,5 +64,3 @@ class AuditMiddleware:
         except Exception:
             # Never block the request due to auditing failures
             pass
-
-        return response
@@ -1,3 +1,4 @@
+from apps.core.db_router import non_atomic_view
 from apps.rbac.permissions import HasPermission
 from django.http import JsonResponse
 from django.utils.dateparse import parse_datetime
@@ -15,6 +16,7 @@ from .models import AuditLog, AuditRetentionPolicy
 from .serializers import AuditLogSerializer, AuditRetentionPolicySerializer
 
 
+@non_atomic_view
 class AuditLogListView(ListAPIView):
     # Require explicit RBAC permission to view audit logs in APIs.
     required_permission = "view_audit_logs"
@@ -24,6 +26,7 @@ class AuditLogListView(ListAPIView):
     filter_backends = [OrderingFilter]
     ordering_fields = ["created_at", "method", "path", "user"]
     ordering = ["-created_at"]
+    query_budget = 15
 
     @swagger_auto_schema(
         operation_summary="List audit logs",
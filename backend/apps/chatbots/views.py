@@ -1,3 +1,5 @@
+from apps.core import fair_queue
+from apps.core.async_views import AsyncAPIView
 from apps.rbac.permissions import HasPermission
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -25,7 +27,7 @@ class ChatbotsStatusView(APIView):
         return Response({"service": "chatbots", "status": "ok"})
 
 
-class ChatbotSendMessageView(APIView):
+class ChatbotSendMessageView(AsyncAPIView):
     required_permission = "chatbots_send"
     permission_classes = [IsAuthenticated, HasPermission]
     throttle_scope = "chatbots_send"
@@ -54,12 +56,16 @@ class ChatbotSendMessageView(APIView):
         },
         tags=["chatbots"],
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = ChatbotMessageSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        task = send_chatbot_message.delay(
-            data["bot_id"], data["message"], data.get("session_id")
+        task = await fair_queue.aenqueue(
+            getattr(request, "tenant", None),
+            send_chatbot_message,
+            data["bot_id"],
+            data["message"],
+            data.get("session_id"),
         )
         return Response(
             {"id": task.id, "status": "queued"}, status=status.HTTP_201_CREATED
@@ -0,0 +1,132 @@
+"""Helpers for the async (ASGI) request path.
+
+Under ASGI, async middlewares and views (``apps.core.async_views``) run on
+the event loop. The ORM still runs in the thread ``sync_to_async`` gives
+each request, so:
+
+- ``aexecute_wrapper`` installs ``connection.execute_wrapper`` hooks in that
+  thread, where the request's queries actually run;
+- ``aenqueue`` publishes a Celery task from a worker thread, keeping the
+  broker round-trip off the loop (eager tasks stay on the request thread,
+  as they may use the ORM).
+
+Counters (plan limits, throttles, idempotency marks) go to Redis through a
+native ``redis.asyncio`` client, one per event loop, sharing the default
+cache's server and key prefix. Values are stored as plain integers, as
+django-redis does, so the sync path (``cache.get``/``cache.incr``) reads
+and updates the same keys. Other cache backends (locmem in tests) fall
+back to Django's async cache API.
+"""
+
+import asyncio
+import time
+import weakref
+from contextlib import ExitStack, asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connections
+from django_redis.cache import RedisCache
+
+from . import metrics
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis-py < 4.2; the async cache API is used instead
+    aioredis = None
+
+# event loop -> redis.asyncio.Redis (a client is bound to the loop it runs on)
+_clients = weakref.WeakKeyDictionary()
+
+
+def redis_client():
+    """Async client on the default cache's server, or None for other backends."""
+    backend = caches["default"]
+    if aioredis is None or not isinstance(backend, RedisCache):
+        return None
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        server = backend._server
+        if isinstance(server, str):
+            server = server.split(",")
+        # The first server is the primary, which django-redis writes to
+        client = _clients[loop] = aioredis.Redis.from_url(server[0])
+    return client
+
+
+@asynccontextmanager
+async def _timed(operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics.ENABLED:
+            metrics.record_cache_op(operation, time.perf_counter() - started)
+
+
+async def acount(key: str) -> int:
+    """Current value of the counter ``key`` (0 when missing)."""
+    client = redis_client()
+    if client is None:
+        return int(await cache.aget(key, 0) or 0)
+    async with _timed("get"):
+        value = await client.get(cache.make_key(key))
+    return int(value or 0)
+
+
+async def aincr(key: str, timeout: int) -> int:
+    """Increment ``key``, created with a ``timeout`` TTL; returns the new value."""
+    client = redis_client()
+    if client is None:
+        if await cache.aadd(key, 1, timeout=timeout):
+            return 1
+        try:
+            return await cache.aincr(key)
+        except ValueError:
+            # Expired between add and incr
+            await cache.aset(key, 1, timeout=timeout)
+            return 1
+    redis_key = cache.make_key(key)
+    # One MULTI/EXEC: a request cancelled between the two commands must not
+    # leave a counter without TTL (a tenant limited forever)
+    async with _timed("incr"):
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(redis_key)
+            pipe.expire(redis_key, timeout, nx=True)
+            value, _ = await pipe.execute()
+    return value
+
+
+async def aadd(key: str, value: int, timeout: int) -> bool:
+    """Set ``key`` unless it exists (``SET NX EX``); True when it was set."""
+    client = redis_client()
+    if client is None:
+        return await cache.aadd(key, value, timeout=timeout)
+    async with _timed("add"):
+        return bool(
+            await client.set(cache.make_key(key), int(value), ex=timeout, nx=True)
+        )
+
+
+def _enter_wrappers(stack: ExitStack, wrapper) -> None:
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+@asynccontextmanager
+async def aexecute_wrapper(wrapper):
+    """``connection.execute_wrapper(wrapper)`` on every alias, in the ORM thread."""
+    stack = ExitStack()
+    await sync_to_async(_enter_wrappers)(stack, wrapper)
+    try:
+        yield
+    finally:
+        await sync_to_async(stack.close)()
+
+
+async def aenqueue(task, *args, **kwargs):
+    """``task.delay(*args, **kwargs)`` without blocking the event loop."""
+    eager = getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False)
+    return await sync_to_async(task.delay, thread_sensitive=eager)(*args, **kwargs)
@@ -1,43 +1,261 @@
+"""Server-side analytics: GA4 Measurement Protocol events, off the request thread.
+
+``track_event`` only puts the event on a bounded in-process queue; an
+``AnalyticsPipeline`` flusher thread takes what arrives within
+``ANALYTICS_FLUSH_INTERVAL`` (up to ``ANALYTICS_BATCH_SIZE`` events, the
+Measurement Protocol allows 25 per request) and posts it over one pooled
+``requests.Session``, so collector slowness never becomes request latency.
+
+Events of one request share a ``client_id`` (and ``user_id``), so a batch
+is split by those. Connection errors, 429 and 5xx responses are retried
+with exponential backoff up to ``ANALYTICS_MAX_RETRIES`` times; other 4xx
+responses are not. Outcomes are counted in ``AnalyticsPipeline.stats`` and
+in ``analytics_events_total{outcome}``: ``sent``, ``dropped`` (queue full)
+and ``failed`` (rejected or out of retries); retries in
+``analytics_retries_total``.
+
+The flusher starts with the first event, starts again in forked children
+(gunicorn, Celery) and gets a short grace period to flush at exit. Without
+``GA_MEASUREMENT_ID``/``GA_API_SECRET`` events are only logged.
+"""
+
+import atexit
 import json
 import logging
+import os
+import queue
+import threading
+import time
 
 from django.conf import settings
 
+from . import metrics
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # optional; events are logged and dropped without it
+    requests = None
+
 logger = logging.getLogger(__name__)
 
+# Measurement Protocol limit on events per request
+MAX_BATCH_SIZE = 25
+_STOP = object()
+
+
+class AnalyticsPipeline:
+    """Bounded queue of events posted in batches by a flusher thread."""
+
+    def __init__(
+        self,
+        endpoint,
+        measurement_id,
+        api_secret,
+        maxsize=10000,
+        batch_size=MAX_BATCH_SIZE,
+        flush_interval=1.0,
+        max_retries=3,
+        timeout=5.0,
+        backoff=0.5,
+    ):
+        self.endpoint = endpoint
+        self.credentials = {"measurement_id": measurement_id, "api_secret": api_secret}
+        self.maxsize = maxsize
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self._closed = False
+        self._reset()
+        atexit.register(self.close)
+        if hasattr(os, "register_at_fork"):
+            # The flusher thread does not survive fork (gunicorn, Celery)
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.stats = {"sent": 0, "dropped": 0, "failed": 0, "retried": 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self.session = None
+
+    def _count(self, outcome: str, count: int = 1) -> None:
+        with self._lock:
+            self.stats[outcome] += count
+        if outcome == "retried":
+            metrics.record_analytics_retry()
+        else:
+            metrics.record_analytics_events(outcome, count)
+
+    def submit(self, event: dict) -> bool:
+        """Queue ``event``; False when it was dropped."""
+        if self._thread is None and not self._closed:
+            self._start()
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        return True
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.session = requests.Session()
+            # One flusher thread: one kept-alive connection is enough
+            self.session.mount("https://", HTTPAdapter(pool_maxsize=1))
+            self.session.mount("http://", HTTPAdapter(pool_maxsize=1))
+            self._thread = threading.Thread(
+                target=self._run, name="analytics-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._next_batch()
+            try:
+                if batch:
+                    self._deliver(batch)
+            except Exception:
+                logger.exception("Analytics flush failed")
+                self._count("failed", len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _next_batch(self):
+        """Up to ``batch_size`` events, or those arriving within ``flush_interval``."""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                event = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if event is _STOP:
+                self.queue.task_done()
+                self._stopping = True
+                break
+            batch.append(event)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _deliver(self, batch):
+        groups = {}
+        for event in batch:
+            identity = (event["client_id"], event.get("user_id"))
+            groups.setdefault(identity, []).append(
+                {"name": event["name"], "params": event["params"]}
+            )
+        for (client_id, user_id), events in groups.items():
+            body = {"client_id": client_id, "events": events}
+            if user_id is not None:
+                body["user_id"] = str(user_id)
+            self._post(body, len(events))
+
+    def _post(self, body, count):
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retried")
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self.session.post(
+                    self.endpoint,
+                    params=self.credentials,
+                    json=body,
+                    timeout=self.timeout,
+                )
+            except requests.RequestException as exc:
+                error = exc
+                continue
+            if response.status_code < 400:
+                self._count("sent", count)
+                return
+            error = f"{response.status_code} {response.text[:200]}"
+            if response.status_code != 429 and response.status_code < 500:
+                break
+        logger.warning("Dropped %d analytics events: %s", count, error)
+        self._count("failed", count)
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until every queued event is delivered (or failed)."""
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(
+                lambda: not self.queue.unfinished_tasks, timeout
+            )
+
+    def close(self, timeout=2.0):
+        self._closed = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline():
+    """The process-wide pipeline, or None when GA or ``requests`` is missing."""
+    global _pipeline
+    measurement_id = getattr(settings, "GA_MEASUREMENT_ID", None)
+    api_secret = getattr(settings, "GA_API_SECRET", None)
+    if not (measurement_id and api_secret) or requests is None:
+        return None
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = AnalyticsPipeline(
+                    settings.ANALYTICS_ENDPOINT,
+                    measurement_id,
+                    api_secret,
+                    maxsize=settings.ANALYTICS_QUEUE_SIZE,
+                    batch_size=settings.ANALYTICS_BATCH_SIZE,
+                    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL,
+                    max_retries=settings.ANALYTICS_MAX_RETRIES,
+                    timeout=settings.ANALYTICS_TIMEOUT,
+                )
+    return _pipeline
+
 
 def track_event(event_name: str, user=None, params: dict = None):
     """Simple analytics helper.
 
-    - If GA_MEASUREMENT_ID and GA_API_SECRET are configured, attempts to send a
-      Measurement Protocol event to GA4 (best-effort).
+    - If GA_MEASUREMENT_ID and GA_API_SECRET are configured, queues a
+      Measurement Protocol event for GA4 (best-effort, see the module
+      docstring).
     - Otherwise logs the event for observability.
     """
     params = params or {}
-    payload = {
-        "event_name": event_name,
-        "user": getattr(user, "id", None) if user else None,
-        "params": params,
-    }
-
-    measurement_id = getattr(settings, "GA_MEASUREMENT_ID", None)
-    api_secret = getattr(settings, "GA_API_SECRET", None)
-
-    if measurement_id and api_secret:
-        try:
-            import requests
-
-            url = f"https://www.google-analytics.com/mp/collect?measurement_id={measurement_id}&api_secret={api_secret}"
-            body = {
-                "client_id": params.get("client_id", "server"),
-                "events": [{"name": event_name, "params": params}],
-            }
-            resp = requests.post(url, json=body, timeout=5)
-            if resp.status_code >= 400:
-                logger.warning(
-                    "GA track_event failed: %s %s", resp.status_code, resp.text
-                )
-        except Exception as e:
-            logger.exception("Failed to send GA event: %s", e)
-    else:
+    pipeline = get_pipeline()
+    if pipeline is None:
+        payload = {
+            "event_name": event_name,
+            "user": getattr(user, "id", None) if user else None,
+            "params": params,
+        }
         logger.info("track_event: %s", json.dumps(payload))
+        return
+    pipeline.submit(
+        {
+            "client_id": params.get("client_id", "server"),
+            "user_id": getattr(user, "id", None) if user else None,
+            "name": event_name,
+            # Sent later, from the flusher thread
+            "params": dict(params),
+        }
+    )
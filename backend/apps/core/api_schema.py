@@ -0,0 +1,256 @@
+"""Precompiled OpenAPI schemas.
+
+drf-spectacular (``api/schema/``) and drf-yasg (``api/swagger.json|.yaml``)
+introspect every view on each request, and importing them adds to worker
+boot. ``manage.py compile_api_schema`` runs both generators once, at build
+time, and writes JSON and YAML artifacts plus a ``manifest.json`` (content
+hashes) under ``API_SCHEMA_DIR/<version>/``.
+
+Outside ``API_SCHEMA_LIVE`` (by default, outside ``DEBUG``) the schema
+endpoints serve those files from memory with a strong ``ETag`` and answer
+``If-None-Match`` with 304; the documentation pages are plain Swagger
+UI/ReDoc templates pointed at the compiled files. Neither generator is
+imported in that mode. With ``API_SCHEMA_LIVE`` the original views are
+mounted and schemas are generated per request, as before.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.urls import path, re_path, reverse
+from django.utils import timezone
+from django.views import View
+
+API_TITLE = "SaaS Automacoes API"
+MANIFEST = "manifest.json"
+GENERATOR_CHOICES = ("spectacular", "yasg")
+# Generator -> artifact base name
+ARTIFACTS = {"spectacular": "openapi", "yasg": "swagger"}
+FORMATS = {
+    "json": "application/json",
+    "yaml": "application/yaml",
+}
+
+# (version, artifact, format) -> (content, etag, content_type)
+_loaded = {}
+
+
+def schema_version() -> str:
+    return settings.SPECTACULAR_SETTINGS.get("VERSION", "v1")
+
+
+def artifact_dir(version=None) -> Path:
+    return Path(settings.API_SCHEMA_DIR) / (version or schema_version())
+
+
+def _yasg_info(description):
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title=API_TITLE, default_version=schema_version(), description=description
+    )
+
+
+def generate(generator: str) -> dict:
+    """Run one generator; returns ``{format: bytes}``."""
+    if generator == "spectacular":
+        from drf_spectacular.generators import SchemaGenerator
+        from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+        schema = SchemaGenerator(api_version=schema_version()).get_schema(
+            request=None, public=True
+        )
+        return {
+            "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+            "yaml": OpenApiYamlRenderer().render(schema, renderer_context={}),
+        }
+    if generator == "yasg":
+        from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+        from drf_yasg.generators import OpenAPISchemaGenerator
+
+        schema = OpenAPISchemaGenerator(
+            _yasg_info("Documentação Swagger gerada por drf-yasg"),
+            version=schema_version(),
+        ).get_schema(request=None, public=True)
+        return {
+            "json": OpenAPICodecJson(validators=[]).encode(schema),
+            "yaml": OpenAPICodecYaml(validators=[]).encode(schema),
+        }
+    raise ValueError(f"Unknown schema generator: {generator}")
+
+
+def write_artifacts(generator: str, contents: dict, version=None) -> dict:
+    """Write one generator's artifacts and record their hashes in the manifest."""
+    directory = artifact_dir(version)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    manifest["version"] = version or schema_version()
+    files = manifest.setdefault("files", {})
+    for fmt, content in contents.items():
+        name = f"{ARTIFACTS[generator]}.{fmt}"
+        (directory / name).write_bytes(content)
+        files[name] = {
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "generated_at": timezone.now().isoformat(),
+        }
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    clear_loaded()
+    return manifest
+
+
+def clear_loaded() -> None:
+    _loaded.clear()
+
+
+def load_artifact(artifact: str, fmt: str, version=None):
+    """``(content, etag, content_type)`` of a compiled file, or ``None``."""
+    version = version or schema_version()
+    key = (version, artifact, fmt)
+    if key not in _loaded:
+        name = f"{artifact}.{fmt}"
+        try:
+            content = (artifact_dir(version) / name).read_bytes()
+        except OSError:
+            return None
+        digest = hashlib.sha256(content).hexdigest()
+        _loaded[key] = (content, f'"{digest}"', FORMATS[fmt])
+    return _loaded[key]
+
+
+class CompiledSchemaView(View):
+    """Serve a compiled schema artifact from memory, with ETag revalidation."""
+
+    http_method_names = ["get", "head", "options"]
+    artifact = ARTIFACTS["spectacular"]
+    default_format = "json"
+
+    def get(self, request, format=None):
+        fmt = (format or request.GET.get("format") or self.default_format).lstrip(".")
+        if fmt not in FORMATS:
+            fmt = self.default_format
+        loaded = load_artifact(self.artifact, fmt)
+        if loaded is None:
+            return JsonResponse(
+                {
+                    "detail": "Schema da API não compilado; execute "
+                    "`python manage.py compile_api_schema`."
+                },
+                status=503,
+            )
+        content, etag, content_type = loaded
+        if etag in _etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = (
+            f"public, max-age={settings.API_SCHEMA_MAX_AGE}, must-revalidate"
+        )
+        return response
+
+
+def _etags(header: str) -> set:
+    if header.strip() == "*":
+        return {"*"}
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag}
+
+
+def _lazy_view(factory):
+    """Build the real view on first request, so its imports stay off boot."""
+    view = None
+
+    def lazy_view(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = factory()
+        return view(request, *args, **kwargs)
+
+    return lazy_view
+
+
+def _docs_page(ui, url_name, **reverse_kwargs):
+    def factory():
+        from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+        view_class = SpectacularSwaggerView if ui == "swagger" else SpectacularRedocView
+        return view_class.as_view(url=reverse(url_name, kwargs=reverse_kwargs or None))
+
+    return _lazy_view(factory)
+
+
+def _compiled_urlpatterns():
+    return [
+        path(
+            "api/schema/",
+            CompiledSchemaView.as_view(artifact=ARTIFACTS["spectacular"]),
+            name="schema",
+        ),
+        path("api/docs/", _docs_page("swagger", "schema"), name="swagger-ui"),
+        re_path(
+            r"^api/swagger(?P<format>\.json|\.yaml)$",
+            CompiledSchemaView.as_view(artifact=ARTIFACTS["yasg"]),
+            name="yasg-schema-json",
+        ),
+        path(
+            "api/swagger/",
+            _docs_page("swagger", "yasg-schema-json", format=".json"),
+            name="yasg-swagger-ui",
+        ),
+        path(
+            "api/redoc/",
+            _docs_page("redoc", "yasg-schema-json", format=".json"),
+            name="yasg-redoc",
+        ),
+    ]
+
+
+def _live_urlpatterns():
+    from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+    from drf_yasg.views import get_schema_view as get_yasg_schema_view
+    from rest_framework.permissions import AllowAny
+
+    def yasg_view(description):
+        return get_yasg_schema_view(
+            _yasg_info(description),
+            public=True,
+            permission_classes=(AllowAny,),
+        )
+
+    swagger = yasg_view("Documentação Swagger gerada por drf-yasg")
+    redoc = yasg_view("Documentação ReDoc gerada por drf-yasg")
+    return [
+        path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+        path(
+            "api/docs/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        re_path(
+            r"^api/swagger(?P<format>\.json|\.yaml)$",
+            swagger.without_ui(cache_timeout=0),
+            name="yasg-schema-json",
+        ),
+        path(
+            "api/swagger/",
+            swagger.with_ui("swagger", cache_timeout=0),
+            name="yasg-swagger-ui",
+        ),
+        path(
+            "api/redoc/",
+            redoc.with_ui("redoc", cache_timeout=0),
+            name="yasg-redoc",
+        ),
+    ]
+
+
+def schema_urlpatterns():
+    if settings.API_SCHEMA_LIVE:
+        return _live_urlpatterns()
+    return _compiled_urlpatterns()
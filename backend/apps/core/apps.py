@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = "apps.core"
     label = "core"
+
+    def ready(self):
+        from .fair_queue import BacklogCollector
+        from .metrics import connect_task_signals, register_scrape_collector
+        from .profiling import connect_profiling_signals
+
+        # Celery task timings for /metrics (no-op without prometheus_client)
+        connect_task_signals()
+        # Sampled task profiles (apps.core.profiling)
+        connect_profiling_signals()
+        # Per-tenant fair queue backlogs, read from Redis at scrape time
+        register_scrape_collector(BacklogCollector())
@@ -0,0 +1,86 @@
+"""DRF views whose handlers are coroutines.
+
+``AsyncAPIView`` keeps ``APIView``'s contract (authentication, permissions,
+throttles, exception handling, renderers) with an async ``dispatch``:
+
+- authentication and permissions may query the database, so they run in one
+  ``sync_to_async`` hop to the request's ORM thread;
+- throttles with ``aallow_request`` (``apps.core.throttling``) are awaited,
+  others run in the ORM thread;
+- ``async def`` handlers run on the event loop; ``apps.core.aio.aenqueue``
+  publishes Celery tasks without blocking it.
+
+Django refuses ``ATOMIC_REQUESTS`` for async views, so these views run
+outside the request transaction (as ``non_atomic_view`` does for sync ones):
+each write commits on its own.
+
+Under WSGI, Django runs these views through ``async_to_sync``; behaviour is
+the same, only the concurrency gain is lost.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view._non_atomic_requests = set(connections.settings)
+        return view
+
+    def initial(self, request, *args, **kwargs):
+        """``APIView.initial`` without the throttles (see ``acheck_throttles``)."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        self.perform_authentication(request)
+        self.check_permissions(request)
+
+    async def acheck_throttles(self, request):
+        durations = []
+        for throttle in self.get_throttles():
+            if hasattr(throttle, "aallow_request"):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(request, self)
+            if not allowed:
+                durations.append(throttle.wait())
+        if durations:
+            durations = [duration for duration in durations if duration is not None]
+            self.throttled(request, max(durations, default=None))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            await self.acheck_throttles(request)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # options() and http_method_not_allowed() stay sync
+            if hasattr(response, "__await__"):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
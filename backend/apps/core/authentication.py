@@ -1,8 +1,169 @@
+"""JWT authentication with a cached user principal.
+
+SimpleJWT loads the ``User`` row for every authenticated request. Here the
+loaded user is cached per process (``AUTH_PRINCIPAL_LOCAL_TTL`` seconds) and
+in the shared cache (``AUTH_PRINCIPAL_CACHE_TTL``) under
+``(user_id, token_version)``, where the token version is SimpleJWT's revoke
+claim (a hash of the password hash, see ``CHECK_REVOKE_TOKEN``). A warm
+request therefore runs no auth query at all.
+
+Saving or deleting a user drops its shared entry (``invalidate_principal``,
+connected in ``apps.users``); other processes may keep serving their local
+copy for at most ``AUTH_PRINCIPAL_LOCAL_TTL`` seconds. A password change
+also changes the version, so tokens issued before it stop resolving.
+
+With ``AUTH_JWT_STATELESS`` no user is loaded: the principal is built from
+the signed ``is_staff``/``is_superuser`` claims added by ``principal_claims``.
+Those claims are re-derived from the user row at every refresh, which also
+rejects refresh tokens of deleted or inactive users and, with
+``CHECK_REVOKE_TOKEN``, of an older password. A demotion or password change
+therefore reaches stateless requests within ``ACCESS_TOKEN_LIFETIME``; only
+logout revocation applies immediately. Tenant roles are not claims: rbac
+always reads them from ``UserRole``.
+
+Access tokens revoked at logout are rejected through
+``apps.core.revocation``, which answers most checks from memory.
+"""
+
+import copy
+import time
+
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+PRINCIPAL_KEY = "auth:principal:{user_id}"
+LOCAL_MAX_ENTRIES = 1024
+
+# (user_id, token_version) -> (expires_at, user)
+_local_principals = {}
+
+
+def token_version(user) -> str:
+    return get_md5_hash_password(user.password)
+
+
+def principal_claims(user) -> dict:
+    """Claims added to issued and refreshed tokens (version and staff flags)."""
+    return {
+        api_settings.REVOKE_TOKEN_CLAIM: token_version(user),
+        "is_staff": bool(user.is_staff),
+        "is_superuser": bool(user.is_superuser),
+    }
+
+
+def refresh_principal(refresh) -> None:
+    """Re-derive ``principal_claims`` on a refresh token from the user row.
+
+    Raises ``AuthenticationFailed`` like ``JWTAuthentication.get_user`` when
+    the user is gone, inactive or (``CHECK_REVOKE_TOKEN``) changed password.
+    """
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    try:
+        user = User.objects.get(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        )
+    except (KeyError, User.DoesNotExist):
+        raise AuthenticationFailed(_("User not found"), code="user_not_found") from None
+    if not api_settings.USER_AUTHENTICATION_RULE(user):
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    claims = principal_claims(user)
+    version = claims[api_settings.REVOKE_TOKEN_CLAIM]
+    if (
+        api_settings.CHECK_REVOKE_TOKEN
+        and refresh.get(api_settings.REVOKE_TOKEN_CLAIM) != version
+    ):
+        raise AuthenticationFailed(
+            _("The user's password has been changed."), code="password_changed"
+        )
+    for claim, value in claims.items():
+        refresh[claim] = value
+
+
+def cached_principal(user_id, version):
+    now = time.monotonic()
+    entry = _local_principals.get((user_id, version))
+    if entry and entry[0] > now:
+        return copy.copy(entry[1])
+    try:
+        shared = cache.get(PRINCIPAL_KEY.format(user_id=user_id))
+    except Exception:
+        shared = None
+    if not shared or shared[0] != version:
+        return None
+    _remember_locally(user_id, version, shared[1])
+    return copy.copy(shared[1])
+
+
+def cache_principal(user, version) -> None:
+    _remember_locally(user.pk, version, user)
+    try:
+        cache.set(
+            PRINCIPAL_KEY.format(user_id=user.pk),
+            (version, user),
+            settings.AUTH_PRINCIPAL_CACHE_TTL,
+        )
+    except Exception:
+        # The cache is an optimization; authentication still works without it
+        pass
+
+
+def _remember_locally(user_id, version, user) -> None:
+    if len(_local_principals) >= LOCAL_MAX_ENTRIES:
+        _local_principals.clear()
+    expires_at = time.monotonic() + settings.AUTH_PRINCIPAL_LOCAL_TTL
+    _local_principals[(user_id, version)] = (expires_at, copy.copy(user))
+
+
+def invalidate_principal(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for the user model."""
+    for key in [key for key in _local_principals if key[0] == instance.pk]:
+        _local_principals.pop(key, None)
+    try:
+        cache.delete(PRINCIPAL_KEY.format(user_id=instance.pk))
+    except Exception:
+        pass
+
+
+class ClaimsUser(TokenUser):
+    """Stateless principal: staff flags from the signed claims."""
+
+    is_active = True
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        from .revocation import is_revoked
+
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token is blacklisted"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        if settings.AUTH_JWT_STATELESS:
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                return super().get_user(validated_token)  # raises InvalidToken
+            return ClaimsUser(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM, "")
+        user = cached_principal(user_id, version) if user_id is not None else None
+        if user is None:
+            # Also enforces is_active and, with CHECK_REVOKE_TOKEN, the version
+            user = super().get_user(validated_token)
+            cache_principal(user, version)
+        return user
 
 
-class CookieJWTAuthentication(JWTAuthentication):
+class CookieJWTAuthentication(CachedJWTAuthentication):
     def authenticate(self, request):
         header = self.get_header(request)
         if header is not None:
@@ -0,0 +1,130 @@
+"""django-tenants PostgreSQL backend that only sends ``search_path`` when it changes.
+
+The stock backend forgets the applied path on every ``set_tenant`` and issues
+``SET search_path`` again for the next cursor, so the schema flips done by the
+tenant middlewares, ``Domain.save`` or ``schema_context`` each cost a
+round-trip even when they end where they started. This backend tracks what
+the server actually has:
+
+- outside a transaction, a session ``SET`` is sent only when the wanted path
+  differs from the one already set on the connection;
+- inside a transaction (``ATOMIC_REQUESTS``, ``transaction.atomic``) it uses
+  ``SET LOCAL``, which Postgres discards at commit/rollback, so a tenant path
+  never outlives the transaction that needed it;
+- a rollback to a savepoint may have reverted a ``SET LOCAL`` issued after
+  it, leaving an outer one in effect: the path is sent again on the next
+  cursor;
+- a reconnect, including a connection handed out by a pool, forgets
+  everything, since the server state is unknown.
+
+As in django-tenants, a failed ``SET`` (in a transaction already aborted,
+e.g. while Django rolls back to a savepoint) is ignored; the tracked state
+is dropped so the path is sent again once the transaction recovers.
+
+With ``TENANT_TRANSACTION_POOLING`` (PgBouncer in transaction mode) session
+state can't be trusted between statements: outside transactions the path is
+sent for every cursor, as django-tenants does, and inside transactions only
+``SET LOCAL`` is used, so nothing leaks to other clients.
+
+``search_path_changes`` counts the statements sent, for tests and metrics.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django_tenants.postgresql_backend import base as tenants_base
+
+# Local path after a savepoint rollback: whatever an outer SET LOCAL left
+_UNKNOWN = object()
+
+
+class DatabaseWrapper(tenants_base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        self._session_search_path = None
+        self._local_search_path = None
+        self.search_path_changes = 0
+        super().__init__(*args, **kwargs)
+        self.transaction_pooling = getattr(
+            settings, "TENANT_TRANSACTION_POOLING", False
+        )
+
+    def set_tenant(self, tenant, include_public=True):
+        if (
+            self.tenant is not None
+            and tenant.schema_name == self.schema_name
+            and include_public == self.include_public_schema
+        ):
+            # Same search_path: keep the tracked state (and ContentType cache)
+            self.tenant = tenant
+            return
+        super().set_tenant(tenant, include_public)
+
+    def _cursor(self, name=None):
+        # Skip django-tenants' _cursor, which sets the path unconditionally
+        cursor = tenants_base.original_backend.DatabaseWrapper._cursor(self, name)
+        self._apply_search_path()
+        return cursor
+
+    def _apply_search_path(self):
+        if not self.schema_name:
+            raise ImproperlyConfigured(
+                "Database schema not set. Did you forget to call set_schema() "
+                "or set_tenant()?"
+            )
+        wanted = tuple(self._get_cursor_search_paths())
+        if self.autocommit:
+            if self.transaction_pooling or wanted != self._session_search_path:
+                if self._send_search_path(wanted, local=False):
+                    self._session_search_path = (
+                        None if self.transaction_pooling else wanted
+                    )
+            return
+        current = self._local_search_path
+        if current is None and not self.transaction_pooling:
+            current = self._session_search_path
+        if wanted != current and self._send_search_path(wanted, local=True):
+            self._local_search_path = wanted
+
+    def _send_search_path(self, schemas, local):
+        statement = "SET LOCAL search_path = " if local else "SET search_path = "
+        paths = ", ".join(self.ops.quote_name(schema) for schema in schemas)
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(statement + paths)
+        except (tenants_base.DatabaseError, tenants_base.psycopg.DatabaseError):
+            # Aborted transaction: send it again after the rollback
+            if local:
+                self._local_search_path = _UNKNOWN
+            else:
+                self._session_search_path = None
+            return False
+        self.search_path_changes += 1
+        return True
+
+    def _forget_search_path(self):
+        self._session_search_path = self._local_search_path = None
+
+    def connect(self):
+        self._forget_search_path()
+        super().connect()
+
+    def close(self):
+        self._forget_search_path()
+        super().close()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._local_search_path = None
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._local_search_path = None
+
+    def _savepoint_rollback(self, sid):
+        super()._savepoint_rollback(sid)
+        # May have reverted a SET LOCAL issued after the savepoint, back to
+        # an outer one (not to the session path)
+        self._local_search_path = _UNKNOWN
@@ -0,0 +1,163 @@
+"""Read-replica routing that keeps the django-tenants search_path.
+
+``ReplicaRoutingMiddleware`` opens a routing context per request. Inside it,
+``ReplicaRouter`` sends reads of safe (GET/HEAD/OPTIONS) requests to one of
+``DATABASE_REPLICAS``; everything else stays on ``default``:
+
+- unsafe requests are pinned to the primary from the start;
+- the first write of any request pins its remaining reads to the primary;
+- a request that wrote sets a short-lived cookie
+  (``DATABASE_REPLICA_STICKY_SECONDS``) that pins the same client's next
+  requests, so it reads its own writes while replicas catch up;
+- code outside a request (Celery tasks, commands, migrations) never uses
+  replicas.
+
+Each replica connection is a separate ``DatabaseWrapper``; before routing a
+read the router copies the tenant set on ``default`` by
+``TenantMainMiddleware`` onto it, so the replica resolves the same
+search_path.
+
+Pure-read views can drop the ``ATOMIC_REQUESTS`` transaction on the primary
+with ``@non_atomic_view``.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.decorators import method_decorator
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_routing = contextvars.ContextVar("db_routing", default=None)
+
+
+class RoutingState:
+    __slots__ = ("replica", "pinned", "wrote")
+
+    def __init__(self, replica=None, pinned=False):
+        self.replica = replica
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_aliases() -> tuple:
+    return tuple(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+@contextmanager
+def replica_reads(pinned: bool = False):
+    """Route reads in this block to a replica (one per block, for consistency)."""
+    aliases = replica_aliases()
+    state = RoutingState(random.choice(aliases) if aliases else None, pinned)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Force reads in this block to the primary (e.g. right after a write)."""
+    state = _routing.get()
+    if state is None or state.pinned:
+        yield
+        return
+    state.pinned = True
+    try:
+        yield
+    finally:
+        state.pinned = False
+
+
+def _sync_tenant(alias: str) -> None:
+    primary = connections[DEFAULT_DB_ALIAS]
+    replica = connections[alias]
+    tenant = getattr(primary, "tenant", None)
+    if tenant is None or not hasattr(replica, "set_tenant"):
+        return
+    if (
+        replica.schema_name != primary.schema_name
+        or replica.include_public_schema != primary.include_public_schema
+    ):
+        replica.set_tenant(tenant, include_public=primary.include_public_schema)
+
+
+class ReplicaRouter:
+    """Listed before ``TenantSyncRouter``, which keeps deciding migrations."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.pinned or state.replica is None:
+            return DEFAULT_DB_ALIAS
+        _sync_tenant(state.replica)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        with replica_reads(pinned=self._pinned(request)) as state:
+            response = self.get_response(request)
+        return self._process_response(request, response, state)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        # The routing state is a contextvar, seen by the ORM thread too
+        with replica_reads(pinned=self._pinned(request)) as state:
+            response = await self.get_response(request)
+        return self._process_response(request, response, state)
+
+    @staticmethod
+    def _pinned(request) -> bool:
+        cookie = settings.DATABASE_REPLICA_PIN_COOKIE
+        return request.method not in SAFE_METHODS or cookie in request.COOKIES
+
+    @staticmethod
+    def _process_response(request, response, state):
+        cookie = settings.DATABASE_REPLICA_PIN_COOKIE
+        if state.wrote and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                cookie,
+                "1",
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def non_atomic_view(view_class):
+    """Class decorator: run a pure-read API view outside ``ATOMIC_REQUESTS``."""
+    return method_decorator(transaction.non_atomic_requests, name="dispatch")(
+        view_class
+    )
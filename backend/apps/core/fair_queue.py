@@ -0,0 +1,395 @@
+"""Per-tenant fair-share queueing for tenant-triggered Celery tasks.
+
+Tasks published straight to the shared Celery queue are served in arrival
+order, so a tenant bursting thousands of messages delays every other tenant
+behind it. Instead, ``enqueue``/``aenqueue`` push each task to a Redis list
+of its own tenant (``fairq:tenant:<schema>``), and the ``fair_dispatcher``
+command moves tasks from those lists to Celery with deficit round-robin:
+each pass gives every tenant with a backlog a quantum of its plan's weight
+(``FAIR_QUEUE_WEIGHTS``), so a small tenant waits at most one pass however
+long the others' backlogs are.
+
+The dispatcher only keeps ``FAIR_QUEUE_MAX_INFLIGHT`` tasks waiting in the
+Celery queue; the backlog stays in the tenant lists, where the order can
+still change as new tenants arrive.
+
+Tasks go to the tenant lists only while a dispatcher holds its lock (a Redis
+key with a TTL, renewed as it runs); the check and the push are one Lua
+script. Without a live dispatcher, or with a non-Redis cache, eager tasks or
+``FAIR_QUEUE_ENABLED = False``, tasks are published directly as before.
+A dispatcher that stops releases the lock and then drains what is left.
+
+Each batch is moved, atomically, from a tenant list to the dispatcher's own
+processing list (``fairq:processing:<id>``) before it is published, and
+cleared once published; a dispatcher killed mid-batch thus leaves its tasks
+there, and the next dispatcher publishes them before its first batch. Tasks
+published just before the kill are published again (at least once).
+
+Backlogs per tenant are exported at scrape time (``BacklogCollector``) and
+queueing delays in ``fair_queue_wait_seconds``, labelled by plan.
+"""
+
+import bisect
+import json
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django_redis import get_redis_connection
+from redis.exceptions import LockError
+from saas_backend.celery import app as celery_app
+
+from . import aio, metrics
+
+logger = logging.getLogger(__name__)
+
+TENANT_KEY = "fairq:tenant:{}"
+ACTIVE_KEY = "fairq:active"
+PLANS_KEY = "fairq:plans"
+DISPATCHER_KEY = "fairq:dispatcher"
+PROCESSING_KEY = "fairq:processing:{}"
+# Ids of dispatchers that may have a processing list
+DISPATCHERS_KEY = "fairq:dispatchers"
+# Seconds a dispatcher lock outlives its last renewal
+LOCK_TIMEOUT = 10
+
+# KEYS: dispatcher lock, tenant list, active set, plans hash
+# ARGV: message, schema, plan
+ENQUEUE_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+redis.call("RPUSH", KEYS[2], ARGV[1])
+redis.call("SADD", KEYS[3], ARGV[2])
+redis.call("HSET", KEYS[4], ARGV[2], ARGV[3])
+return 1
+"""
+
+# Moves the first ARGV[1] items (0: all) of a list to a processing list
+# KEYS: source list, processing list, dispatchers set; ARGV: count, dispatcher id
+MOVE_SCRIPT = """
+local items = redis.call("LRANGE", KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call("RPUSH", KEYS[2], unpack(items))
+    redis.call("LTRIM", KEYS[1], #items, -1)
+    redis.call("SADD", KEYS[3], ARGV[2])
+end
+return items
+"""
+
+# KEYS: tenant list, active set, plans hash; ARGV: schema
+RETIRE_SCRIPT = """
+if redis.call("LLEN", KEYS[1]) == 0 then
+    redis.call("SREM", KEYS[2], ARGV[1])
+    redis.call("HDEL", KEYS[3], ARGV[1])
+end
+return 0
+"""
+
+
+def _enabled() -> bool:
+    return getattr(settings, "FAIR_QUEUE_ENABLED", True) and not getattr(
+        settings, "CELERY_TASK_ALWAYS_EAGER", False
+    )
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _prepare(tenant, task, args, kwargs):
+    schema = getattr(tenant, "schema_name", None) or "public"
+    # The ``plan`` field, not ``plan_ref``: this may run on the event loop,
+    # where a relation lookup would query the database
+    plan = getattr(tenant, "plan", None) or ""
+    task_id = str(uuid.uuid4())
+    message = json.dumps(
+        {
+            "id": task_id,
+            "task": task.name,
+            "args": list(args),
+            "kwargs": kwargs,
+            "enqueued_at": time.time(),
+        }
+    )
+    keys = (DISPATCHER_KEY, TENANT_KEY.format(schema), ACTIVE_KEY, PLANS_KEY)
+    return task_id, (*keys, message, schema, plan)
+
+
+def enqueue(tenant, task, *args, **kwargs):
+    """``task.delay(*args, **kwargs)`` through the tenant's fair queue."""
+    if not _enabled():
+        return task.delay(*args, **kwargs)
+    try:
+        conn = get_redis_connection("default")
+    except NotImplementedError:
+        return task.delay(*args, **kwargs)
+    task_id, script_args = _prepare(tenant, task, args, kwargs)
+    if not conn.eval(ENQUEUE_SCRIPT, 4, *script_args):
+        return task.delay(*args, **kwargs)
+    return task.AsyncResult(task_id)
+
+
+async def aenqueue(tenant, task, *args, **kwargs):
+    """``enqueue`` for async views (see ``apps.core.aio``)."""
+    client = aio.redis_client() if _enabled() else None
+    if client is None:
+        return await aio.aenqueue(task, *args, **kwargs)
+    task_id, script_args = _prepare(tenant, task, args, kwargs)
+    if not await client.eval(ENQUEUE_SCRIPT, 4, *script_args):
+        return await aio.aenqueue(task, *args, **kwargs)
+    return task.AsyncResult(task_id)
+
+
+def backlogs(conn):
+    """``({schema: queued tasks}, {schema: plan})`` for tenants with a backlog."""
+    plans = {_text(k): _text(v) for k, v in conn.hgetall(PLANS_KEY).items()}
+    schemas = sorted(_text(schema) for schema in conn.smembers(ACTIVE_KEY))
+    pipe = conn.pipeline(transaction=False)
+    for schema in schemas:
+        pipe.llen(TENANT_KEY.format(schema))
+    return dict(zip(schemas, pipe.execute(), strict=True)), plans
+
+
+class DeficitRoundRobin:
+    """Splits a dispatch budget among tenants in proportion to plan weights.
+
+    Unused quanta carry over while a tenant keeps a backlog (so fractional
+    weights work) and are dropped once it empties; each call resumes after
+    the last tenant served, so small budgets still rotate through everyone.
+    """
+
+    def __init__(self, weights, default_weight=1):
+        for plan, weight in {**weights, None: default_weight}.items():
+            if weight <= 0:
+                raise ImproperlyConfigured(
+                    f"Fair queue weight for plan {plan!r} must be positive"
+                )
+        self.weights = dict(weights)
+        self.default_weight = default_weight
+        self._deficits = {}
+        self._last = None
+
+    def weight(self, plan) -> float:
+        return self.weights.get(plan, self.default_weight)
+
+    def plan(self, backlogs, plans, budget):
+        """``[(schema, count)]`` to dispatch now, at most ``budget`` in total."""
+        pending = {schema: size for schema, size in backlogs.items() if size > 0}
+        for schema in set(self._deficits) - set(pending):
+            del self._deficits[schema]
+        order = sorted(pending)
+        if self._last is not None:
+            start = bisect.bisect_right(order, self._last)
+            order = order[start:] + order[:start]
+
+        grants = {}
+        while budget > 0 and pending:
+            for schema in order:
+                left = pending.get(schema)
+                if not left:
+                    continue
+                deficit = self._deficits.get(schema, 0) + self.weight(plans.get(schema))
+                count = min(int(deficit), left, budget)
+                if count:
+                    grants[schema] = grants.get(schema, 0) + count
+                budget -= count
+                self._last = schema
+                if left > count:
+                    pending[schema] = left - count
+                    self._deficits[schema] = deficit - count
+                else:
+                    del pending[schema]
+                    self._deficits.pop(schema, None)
+                if budget <= 0:
+                    break
+        return list(grants.items())
+
+
+def publish(message) -> None:
+    celery_app.send_task(
+        message["task"],
+        args=message["args"],
+        kwargs=message["kwargs"],
+        task_id=message["id"],
+        queue=settings.FAIR_QUEUE_CELERY_QUEUE,
+    )
+
+
+class FairDispatcher:
+    """Moves tasks from the tenant lists to Celery (see the module docstring)."""
+
+    def __init__(self, conn=None, publish=publish, weights=None):
+        self.conn = conn or get_redis_connection("default")
+        self.publish = publish
+        self.scheduler = DeficitRoundRobin(
+            settings.FAIR_QUEUE_WEIGHTS if weights is None else weights
+        )
+        self.lock = self.conn.lock(DISPATCHER_KEY, timeout=LOCK_TIMEOUT)
+        self.id = uuid.uuid4().hex
+        self.processing_key = PROCESSING_KEY.format(self.id)
+        self._renewed = 0.0
+        self._broker = None
+        self._recovered = False
+
+    def acquire(self, blocking=True) -> bool:
+        """Become the active dispatcher; waits for a running one to stop."""
+        acquired = self.lock.acquire(blocking=blocking)
+        if acquired:
+            self._renewed = time.monotonic()
+        return acquired
+
+    def keep_alive(self) -> None:
+        if time.monotonic() - self._renewed < LOCK_TIMEOUT / 3:
+            return
+        try:
+            self.lock.reacquire()
+            self._renewed = time.monotonic()
+        except LockError:
+            logger.warning("Fair queue dispatcher lock lost; reacquiring")
+            self.acquire()
+
+    def release(self) -> None:
+        try:
+            self.lock.release()
+        except LockError:
+            pass
+
+    def room(self) -> int:
+        """How many tasks fit in the Celery queue under FAIR_QUEUE_MAX_INFLIGHT."""
+        if self._broker is None:
+            self._broker = celery_app.connection_for_write()
+        queue = settings.FAIR_QUEUE_CELERY_QUEUE
+        try:
+            waiting = self._broker.default_channel.queue_declare(
+                queue, passive=True
+            ).message_count
+        except Exception:
+            # The queue doesn't exist until the first publish
+            waiting = 0
+        return settings.FAIR_QUEUE_MAX_INFLIGHT - waiting
+
+    def recover(self) -> int:
+        """Publish the batches other dispatchers left in their processing lists."""
+        for other in self.conn.smembers(DISPATCHERS_KEY):
+            other = _text(other)
+            if other == self.id:
+                continue
+            self.conn.eval(
+                MOVE_SCRIPT,
+                3,
+                PROCESSING_KEY.format(other),
+                self.processing_key,
+                DISPATCHERS_KEY,
+                0,
+                self.id,
+            )
+            self.conn.srem(DISPATCHERS_KEY, other)
+        sent = 0
+        while item := self.conn.lindex(self.processing_key, 0):
+            self.publish(json.loads(item))
+            self.conn.lpop(self.processing_key)
+            sent += 1
+        if sent:
+            logger.warning("Fair queue dispatcher recovered %d tasks", sent)
+        self._recovered = True
+        return sent
+
+    def dispatch(self, budget=None) -> int:
+        """Publish up to ``budget`` tasks (default: ``room()``); returns the count."""
+        if budget is None:
+            budget = self.room()
+        if budget <= 0:
+            return 0
+        sent = 0 if self._recovered else self.recover()
+        sizes, plans = backlogs(self.conn)
+        for schema, count in self.scheduler.plan(sizes, plans, budget):
+            key = TENANT_KEY.format(schema)
+            raw = self.conn.eval(
+                MOVE_SCRIPT,
+                3,
+                key,
+                self.processing_key,
+                DISPATCHERS_KEY,
+                count,
+                self.id,
+            )
+            for index, item in enumerate(raw):
+                message = json.loads(item)
+                try:
+                    self.publish(message)
+                except Exception:
+                    # Put the unpublished tasks back at the head, in order
+                    pipe = self.conn.pipeline(transaction=True)
+                    pipe.lpush(key, *reversed(raw[index:]))
+                    pipe.delete(self.processing_key)
+                    pipe.execute()
+                    raise
+                metrics.record_fair_queue_wait(
+                    plans.get(schema, ""), time.time() - message["enqueued_at"]
+                )
+                sent += 1
+            pipe = self.conn.pipeline(transaction=False)
+            pipe.delete(self.processing_key)
+            pipe.eval(RETIRE_SCRIPT, 3, key, ACTIVE_KEY, PLANS_KEY, schema)
+            pipe.execute()
+        return sent
+
+    def drain(self, batch=500) -> int:
+        """Publish every queued task, ignoring FAIR_QUEUE_MAX_INFLIGHT."""
+        total = 0
+        while sent := self.dispatch(batch):
+            total += sent
+        return total
+
+    def run(self, interval=None, stop=None) -> None:
+        """Dispatch until ``stop`` (a ``threading.Event``) is set."""
+        if interval is None:
+            interval = settings.FAIR_QUEUE_POLL_INTERVAL
+        # Standby dispatchers wait here until the active one stops
+        while not self.acquire(blocking=False):
+            if stop is not None and stop.is_set():
+                return
+            time.sleep(LOCK_TIMEOUT / 10)
+        try:
+            while stop is None or not stop.is_set():
+                self.keep_alive()
+                try:
+                    sent = self.dispatch()
+                except Exception:
+                    # Broker or Redis hiccup: the tasks are back in their lists
+                    logger.exception("Fair queue dispatch failed")
+                    sent = 0
+                if not sent:
+                    time.sleep(interval)
+        finally:
+            # Once released, new tasks are published directly: nothing can
+            # be pushed after the drain
+            self.release()
+            self.drain()
+            self.conn.srem(DISPATCHERS_KEY, self.id)
+
+
+class BacklogCollector:
+    """``fair_queue_backlog{tenant,plan}``, read from Redis at scrape time."""
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+
+        try:
+            sizes, plans = backlogs(get_redis_connection("default"))
+        except Exception:
+            return
+        family = GaugeMetricFamily(
+            "fair_queue_backlog",
+            "Tasks waiting in the per-tenant fair queues",
+            labels=["tenant", "plan"],
+        )
+        for schema, size in sizes.items():
+            family.add_metric([schema, plans.get(schema, "")], size)
+        yield family
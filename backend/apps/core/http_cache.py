@@ -0,0 +1,31 @@
+import hashlib
+import json
+
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.cache import cache_page
+
+
+def strong_etag(payload) -> str:
+    """Strong ETag for a JSON-serializable payload (stable key ordering)."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return quote_etag(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32])
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True when the request's If-None-Match already names ``etag``."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    return etag in parse_etags(header) or header.strip() == "*"
+
+
+def cache_page_if_enabled(ttl: int):
+    """``cache_page`` on ``get`` only when ``ttl`` > 0.
+
+    ``cache_page(0)`` still performs a cache lookup per request without ever
+    storing anything, so a disabled TTL should not install the decorator.
+    """
+    if ttl and ttl > 0:
+        return method_decorator(cache_page(ttl), name="get")
+    return lambda cls: cls
@@ -1,9 +1,151 @@
+"""Logging pipeline: formatting and I/O off the request thread.
+
+``QueueLoggingHandler`` is what ``LOGGING`` installs as ``console``. The
+calling thread only runs the handler's filters, merges the message
+arguments and puts the record on a bounded queue; a ``QueueListener``
+thread formats it (``JSONFormatter`` or the plain format) and writes it to
+the stream. When the queue is full the record is dropped and counted, and
+the listener reports the count with the next record it writes, so stdout
+backpressure never turns into request latency.
+
+Filters attached to the handler:
+
+- ``ContextFilter`` adds ``request_id`` and ``tenant`` from the current
+  request (set by ``LogContextMiddleware`` in a contextvar). The request id
+  comes from ``X-Request-ID`` or is generated, only once something is
+  logged.
+- ``SamplingFilter`` keeps a fraction (``LOG_SAMPLE_RATES``) of the
+  INFO/DEBUG records of high-volume loggers; warnings and errors are never
+  sampled.
+"""
+
+import atexit
+import contextvars
+import copy
 import json
 import logging
+import os
+import queue
+import random
+import threading
+import uuid
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+REQUEST_ID_HEADER = "HTTP_X_REQUEST_ID"
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "tenant",
+}
+REQUEST_ID_MAX_LENGTH = 64
+
+_request_context = contextvars.ContextVar("log_request_context", default=None)
+
+
+class RequestLogContext:
+    __slots__ = ("request", "_request_id")
+
+    def __init__(self, request):
+        self.request = request
+        self._request_id = None
+
+    @property
+    def request_id(self) -> str:
+        if self._request_id is None:
+            incoming = self.request.META.get(REQUEST_ID_HEADER, "")
+            self._request_id = incoming[:REQUEST_ID_MAX_LENGTH] or uuid.uuid4().hex
+        return self._request_id
+
+    @property
+    def tenant(self):
+        return getattr(getattr(self.request, "tenant", None), "schema_name", None)
+
+
+@sync_and_async_middleware
+def LogContextMiddleware(get_response):
+    """Expose the request to log records; echoes ``X-Request-ID`` once used."""
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            context = RequestLogContext(request)
+            token = _request_context.set(context)
+            try:
+                response = await get_response(request)
+            finally:
+                _request_context.reset(token)
+            if context._request_id is not None:
+                response["X-Request-ID"] = context._request_id
+            return response
+
+        return middleware
+
+    def middleware(request):
+        context = RequestLogContext(request)
+        token = _request_context.set(context)
+        try:
+            response = get_response(request)
+        finally:
+            _request_context.reset(token)
+        if context._request_id is not None:
+            response["X-Request-ID"] = context._request_id
+        return response
+
+    return middleware
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if not hasattr(record, "request_id"):
+            record.request_id = context.request_id if context else None
+        if not hasattr(record, "tenant"):
+            record.tenant = context.tenant if context else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rate`` of the records below WARNING from each listed logger."""
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = {name: float(rate) for name, rate in (rates or {}).items()}
+        self._resolved = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            # The most specific configured ancestor wins
+            matches = [
+                prefix
+                for prefix in self.rates
+                if name == prefix or name.startswith(prefix + ".")
+            ]
+            rate = self.rates[max(matches, key=len)] if matches else 1.0
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
 
 
 class JSONFormatter(logging.Formatter):
+    """One JSON object per record; fields passed with ``extra=`` are included."""
+
     def format(self, record: logging.LogRecord) -> str:
         payload = {
             "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
@@ -12,8 +154,113 @@ class JSONFormatter(logging.Formatter):
             "message": record.getMessage(),
         }
         # Optional context
-        if record.exc_info:
-            payload["exc_info"] = self.formatException(record.exc_info)
-        if hasattr(record, "request_id"):
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if getattr(record, "request_id", None) is not None:
             payload["request_id"] = record.request_id
-        return json.dumps(payload, ensure_ascii=False)
+        if getattr(record, "tenant", None) is not None:
+            payload["tenant"] = record.tenant
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        if orjson is not None:
+            return orjson.dumps(payload, default=str).decode()
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _Listener(QueueListener):
+    def __init__(self, queue, handler):
+        super().__init__(queue, handler.target, respect_handler_level=True)
+        self.owner = handler
+
+    def handle(self, record):
+        super().handle(record)
+        dropped = self.owner.dropped - self.owner.reported
+        if dropped > 0:
+            self.owner.reported += dropped
+            super().handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": "Dropped %d log records (logging queue full)",
+                        "args": (dropped,),
+                        "request_id": None,
+                        "tenant": None,
+                    }
+                )
+            )
+
+    def enqueue_sentinel(self):
+        # Block rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+class QueueLoggingHandler(QueueHandler):
+    """Bounded, non-blocking handler writing to ``stream`` from a listener thread.
+
+    The formatter configured for this handler is applied by the listener.
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self.reported = 0
+        self._drop_lock = threading.Lock()
+        super().__init__(queue.Queue(maxsize))
+        self.listener = None
+        self._closed = False
+        self._start()
+        atexit.register(self._stop)
+        if hasattr(os, "register_at_fork"):
+            # The listener thread does not survive fork (gunicorn, Celery)
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _start(self):
+        self.listener = _Listener(self.queue, self)
+        self.listener.start()
+
+    def _stop(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+
+    def _restart_in_child(self):
+        if self._closed:
+            return
+        self.queue = queue.Queue(self.maxsize)
+        self._drop_lock = threading.Lock()
+        self.dropped = self.reported = 0
+        self._start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def prepare(self, record):
+        # Merge args and render the traceback now: they may not be safe to
+        # read from another thread later, and must not pin request objects.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def close(self):
+        self._closed = True
+        self._stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...api_schema import GENERATOR_CHOICES, artifact_dir, generate, write_artifacts
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schemas once and write them as versioned artifacts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--generator",
+            choices=GENERATOR_CHOICES,
+            action="append",
+            help="Only run this generator (repeatable; default: all)",
+        )
+        parser.add_argument(
+            "--api-version",
+            help="Artifact version directory (default: SPECTACULAR_SETTINGS VERSION)",
+        )
+
+    def handle(self, *args, **options):
+        failed = []
+        for generator in options["generator"] or GENERATOR_CHOICES:
+            try:
+                contents = generate(generator)
+            except Exception as exc:
+                failed.append(f"{generator}: {type(exc).__name__}: {exc}")
+                continue
+            manifest = write_artifacts(generator, contents, options["api_version"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{generator} schema written to "
+                    f"{artifact_dir(manifest['version'])}"
+                )
+            )
+        if failed:
+            raise CommandError("Schema generation failed:\n" + "\n".join(failed))
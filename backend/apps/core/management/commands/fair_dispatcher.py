@@ -0,0 +1,35 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from ...fair_queue import FairDispatcher
+
+
+class Command(BaseCommand):
+    help = "Feed the per-tenant fair queues to Celery, weighted by plan"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Publish what is queued (e.g. after a crash) and exit",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Idle poll interval in seconds (default: FAIR_QUEUE_POLL_INTERVAL)",
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = FairDispatcher()
+        if options["once"]:
+            sent = dispatcher.drain()
+            self.stdout.write(self.style.SUCCESS(f"{sent} tasks dispatched"))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write("Fair queue dispatcher running")
+        dispatcher.run(options["interval"], stop)
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...query_budget import load_report
+
+
+class Command(BaseCommand):
+    help = "List the views with the most SQL queries from a query budget report"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=settings.QUERY_BUDGET_REPORT,
+            help="Report written by the test suite (default: QUERY_BUDGET_REPORT)",
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--duplicates",
+            action="store_true",
+            help="Also show the repeated statements of each view's worst run",
+        )
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        if not path:
+            raise CommandError("No report file: pass --file or set QUERY_BUDGET_REPORT")
+        try:
+            report = load_report(path)
+        except FileNotFoundError as exc:
+            raise CommandError(
+                f"{path} not found; run the tests with QUERY_BUDGET_REPORT={path}"
+            ) from exc
+
+        # Over-budget views first, then by their worst run
+        ranked = sorted(
+            report.items(),
+            key=lambda item: (item[1]["over_budget"], item[1]["max_queries"]),
+            reverse=True,
+        )[: options["limit"]]
+        self.stdout.write(
+            f"{'view':<48}{'max':>6}{'avg':>8}{'budget':>8}{'over':>6}{'runs':>6}"
+        )
+        for label, entry in ranked:
+            budget = "-" if entry["budget"] is None else entry["budget"]
+            line = (
+                f"{label:<48}{entry['max_queries']:>6}"
+                f"{entry['total_queries'] / entry['runs']:>8.1f}"
+                f"{budget:>8}{entry['over_budget']:>6}{entry['runs']:>6}"
+            )
+            style = self.style.ERROR if entry["over_budget"] else str
+            self.stdout.write(style(line))
+            if options["duplicates"]:
+                for duplicate in entry.get("duplicates", []):
+                    self.stdout.write(f"    {duplicate['count']}x {duplicate['sql']}")
@@ -0,0 +1,372 @@
+"""Prometheus metrics for requests, database, cache and Celery tasks.
+
+``MetricsMiddleware`` times each request and labels it with the resolved
+view, its ``throttle_scope`` and the tenant plan. While the request runs,
+a ``connection.execute_wrapper`` on every database alias and the
+instrumented cache backends (``InstrumentedRedisCache``) add to per-request
+tallies kept in a contextvar; the middleware observes them once, when the
+response leaves. Celery task durations come from ``task_prerun``/``task_postrun``
+(connected in ``CoreConfig.ready``). ``metrics_view`` serves ``/metrics``;
+outside ``DEBUG`` it requires the ``METRICS_AUTH_TOKEN`` bearer token.
+
+Gunicorn and Celery prefork run several processes. With
+``PROMETHEUS_MULTIPROC_DIR`` set (before start), each process writes its
+samples to memory-mapped files there, and ``/metrics`` aggregates every
+process's files, including those of workers sharing the directory.
+``gunicorn.conf.py`` clears the directory on start and marks dead workers.
+
+Celery workers run in their own containers, so a worker serves its task
+metrics itself: once ready, the main process starts an exporter on
+``METRICS_WORKER_PORT`` that aggregates its pool children through the same
+multiprocess files (``worker_init`` drops files of previous runs,
+``worker_process_shutdown`` marks children dead).
+
+``prometheus_client`` is optional: without it, or with
+``METRICS_ENABLED = False``, every hook is a no-op.
+"""
+
+import contextvars
+import logging
+import os
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import sync_and_async_middleware
+from django_redis.cache import RedisCache
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Histogram
+except ImportError:  # optional; metrics are disabled without it
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+ENABLED = prometheus_client is not None and getattr(settings, "METRICS_ENABLED", True)
+UNRESOLVED_VIEW = "<unresolved>"
+# Cache methods that are one backend round-trip each
+CACHE_OPS = (
+    "get",
+    "set",
+    "add",
+    "delete",
+    "touch",
+    "incr",
+    "decr",
+    "has_key",
+    "get_many",
+    "set_many",
+    "delete_many",
+)
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+_in_cache_op = contextvars.ContextVar("in_cache_op", default=False)
+# task_id -> perf_counter() at task_prerun
+_task_started = {}
+# Collectors reading shared state (e.g. Redis) at scrape time
+_scrape_collectors = []
+
+if ENABLED:
+    REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds",
+        "Request latency by view",
+        ["view", "method", "status", "throttle_scope", "plan"],
+    )
+    REQUEST_QUERIES = Histogram(
+        "http_request_db_queries",
+        "Database queries per request",
+        ["view"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, float("inf")),
+    )
+    REQUEST_QUERY_SECONDS = Histogram(
+        "http_request_db_seconds",
+        "Time spent in database queries per request",
+        ["view"],
+    )
+    REQUEST_CACHE_OPS = Histogram(
+        "http_request_cache_operations",
+        "Cache round-trips per request",
+        ["view"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, float("inf")),
+    )
+    CACHE_OPERATIONS = Counter(
+        "cache_operations_total", "Cache operations", ["operation"]
+    )
+    CACHE_SECONDS = Histogram(
+        "cache_operation_duration_seconds",
+        "Cache operation latency",
+        ["operation"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, float("inf")),
+    )
+    TASK_SECONDS = Histogram(
+        "celery_task_duration_seconds",
+        "Celery task run time",
+        ["task", "state"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf")),
+    )
+    FAIR_QUEUE_WAIT_SECONDS = Histogram(
+        "fair_queue_wait_seconds",
+        "Time tasks waited in the per-tenant fair queues before dispatch",
+        ["plan"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf")),
+    )
+    ANALYTICS_EVENTS = Counter(
+        "analytics_events_total",
+        "Measurement Protocol events by outcome (sent, dropped, failed)",
+        ["outcome"],
+    )
+    ANALYTICS_RETRIES = Counter(
+        "analytics_retries_total", "Measurement Protocol request retries"
+    )
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "query_seconds", "cache_ops")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.cache_ops = 0
+
+
+def _count_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current = _current.get()
+        if current is not None:
+            current.queries += 1
+            current.query_seconds += time.perf_counter() - started
+
+
+def _view_labels(request) -> tuple:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED_VIEW, ""
+    view_class = getattr(match.func, "cls", None) or getattr(
+        match.func, "view_class", None
+    )
+    scope = getattr(view_class, "throttle_scope", None) or ""
+    return match.view_name or UNRESOLVED_VIEW, scope
+
+
+def _observe(request, response, current, elapsed: float) -> None:
+    view, scope = _view_labels(request)
+    plan = getattr(getattr(request, "tenant", None), "plan", None) or ""
+    REQUEST_SECONDS.labels(
+        view, request.method, f"{response.status_code // 100}xx", scope, plan
+    ).observe(elapsed)
+    REQUEST_QUERIES.labels(view).observe(current.queries)
+    REQUEST_QUERY_SECONDS.labels(view).observe(current.query_seconds)
+    REQUEST_CACHE_OPS.labels(view).observe(current.cache_ops)
+
+
+@sync_and_async_middleware
+def MetricsMiddleware(get_response):
+    if not ENABLED:
+        return get_response
+
+    if iscoroutinefunction(get_response):
+        # Imported here: apps.core.aio reports its cache calls to this module
+        from . import aio
+
+        async def middleware(request):
+            current = RequestMetrics()
+            token = _current.set(current)
+            started = time.perf_counter()
+            try:
+                async with aio.aexecute_wrapper(_count_query):
+                    response = await get_response(request)
+            finally:
+                _current.reset(token)
+            _observe(request, response, current, time.perf_counter() - started)
+            return response
+
+        return middleware
+
+    def middleware(request):
+        current = RequestMetrics()
+        token = _current.set(current)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_count_query))
+                response = get_response(request)
+        finally:
+            _current.reset(token)
+        _observe(request, response, current, time.perf_counter() - started)
+        return response
+
+    return middleware
+
+
+def record_cache_op(operation: str, seconds: float) -> None:
+    current = _current.get()
+    if current is not None:
+        current.cache_ops += 1
+    CACHE_OPERATIONS.labels(operation).inc()
+    CACHE_SECONDS.labels(operation).observe(seconds)
+
+
+def _instrumented(operation):
+    def method(self, *args, **kwargs):
+        call = getattr(super(InstrumentedCacheMixin, self), operation)
+        if _in_cache_op.get():
+            # e.g. BaseCache.get_many calling get(): one operation, not two
+            return call(*args, **kwargs)
+        token = _in_cache_op.set(True)
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            record_cache_op(operation, time.perf_counter() - started)
+            _in_cache_op.reset(token)
+
+    method.__name__ = operation
+    return method
+
+
+class InstrumentedCacheMixin:
+    """Counts and times every cache round-trip (see ``CACHE_OPS``)."""
+
+
+if ENABLED:
+    for _operation in CACHE_OPS:
+        setattr(InstrumentedCacheMixin, _operation, _instrumented(_operation))
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+def task_started(sender=None, task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def task_finished(sender=None, task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    name = getattr(task, "name", None) or getattr(sender, "name", "unknown")
+    TASK_SECONDS.labels(name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+def clear_stale_files(sender=None, **kwargs):
+    """``worker_init``: drop multiprocess files left by a previous run."""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    # This process may already have written its own files (module import)
+    own = f"_{os.getpid()}.db"
+    for name in os.listdir(directory):
+        if name.endswith(".db") and not name.endswith(own):
+            os.remove(os.path.join(directory, name))
+
+
+def start_worker_exporter(sender=None, **kwargs):
+    """``worker_ready``: serve this worker's metrics on ``METRICS_WORKER_PORT``."""
+    port = settings.METRICS_WORKER_PORT
+    if not port:
+        return
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set: task metrics of prefork "
+            "pool processes are not exported"
+        )
+    prometheus_client.start_http_server(port, registry=_registry())
+
+
+def mark_worker_process_dead(sender=None, pid=None, **kwargs):
+    """``worker_process_shutdown``: discard the child's live gauges."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def connect_task_signals() -> None:
+    if not ENABLED:
+        return
+    from celery.signals import (
+        task_postrun,
+        task_prerun,
+        worker_init,
+        worker_process_shutdown,
+        worker_ready,
+    )
+
+    task_prerun.connect(task_started, weak=False)
+    task_postrun.connect(task_finished, weak=False)
+    worker_init.connect(clear_stale_files, weak=False)
+    worker_ready.connect(start_worker_exporter, weak=False)
+    worker_process_shutdown.connect(mark_worker_process_dead, weak=False)
+
+
+def record_fair_queue_wait(plan: str, seconds: float) -> None:
+    if ENABLED:
+        FAIR_QUEUE_WAIT_SECONDS.labels(plan or "").observe(seconds)
+
+
+def record_analytics_events(outcome: str, count: int = 1) -> None:
+    if ENABLED:
+        ANALYTICS_EVENTS.labels(outcome).inc(count)
+
+
+def record_analytics_retry() -> None:
+    if ENABLED:
+        ANALYTICS_RETRIES.inc()
+
+
+def register_scrape_collector(collector) -> None:
+    """Add a collector that reads shared state, so any process can serve it."""
+    if not ENABLED:
+        return
+    _scrape_collectors.append(collector)
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        prometheus_client.REGISTRY.register(collector)
+
+
+def _registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _scrape_collectors:
+            registry.register(collector)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def metrics_view(request):
+    """Prometheus text exposition behind ``METRICS_AUTH_TOKEN`` bearer auth.
+
+    Without a token the endpoint is only open in ``DEBUG``: the samples name
+    every view and tenant plan.
+    """
+    if not ENABLED:
+        return HttpResponse("metrics disabled\n", status=404, content_type="text/plain")
+    token = settings.METRICS_AUTH_TOKEN
+    if token:
+        header = request.headers.get("Authorization", "")
+        if not constant_time_compare(header, f"Bearer {token}"):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        prometheus_client.generate_latest(_registry()),
+        content_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
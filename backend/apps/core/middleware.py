@@ -1,3 +1,8 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.decorators import sync_and_async_middleware
+
+from . import aio
+
 try:
     # module import marker for test-time debug
     pass
@@ -11,6 +16,7 @@ except Exception:
 TEST_DOMAIN_REGISTRY = {}
 
 
+@sync_and_async_middleware
 def TenantMainMiddleware(get_response):
     """Wrapper around django_tenants' TenantMainMiddleware that first
     consults the in-process `TEST_DOMAIN_REGISTRY` to resolve tenants
@@ -31,7 +37,7 @@ def TenantMainMiddleware(get_response):
         else None
     )
 
-    def middleware(request):
+    def resolve_from_registry(request):
         import logging
 
         logger = logging.getLogger("apps.core")
@@ -80,7 +86,9 @@ def TenantMainMiddleware(get_response):
 
         # Log resolved host info for observability
         try:
-            logger.info("Tenant resolve: host=%s source=%s", host, host_source)
+            logging.getLogger("apps.core.tenant_resolve").info(
+                "Tenant resolve: host=%s source=%s", host, host_source
+            )
         except Exception:
             pass
 
@@ -107,16 +115,34 @@ def TenantMainMiddleware(get_response):
                 host,
             )
 
+        try:
+            return bool(host and host in TEST_DOMAIN_REGISTRY)
+        except Exception:
+            return False
+
+    if iscoroutinefunction(get_response):
+        # The real middleware (a MiddlewareMixin) is async-capable too
+        async def middleware(request):
+            # The registry is empty outside tests; when used, the schema is
+            # set on the connection of the request's ORM thread
+            resolved = False
+            if TEST_DOMAIN_REGISTRY:
+                resolved = await sync_to_async(resolve_from_registry)(request)
+            if resolved:
+                return await get_response(request)
+            if real is not None:
+                return await real(request)
+            return await get_response(request)
+
+        return middleware
+
+    def middleware(request):
         # If we resolved the tenant via TEST_DOMAIN_REGISTRY, skip the
         # django-tenants middleware to avoid its DB lookup which can't see
         # transaction-local Domain rows during pytest runs. Otherwise
         # delegate to the real middleware.
-        try:
-            if host and host in TEST_DOMAIN_REGISTRY:
-                return get_response(request)
-        except Exception:
-            pass
-
+        if resolve_from_registry(request):
+            return get_response(request)
         if real is not None:
             return real(request)
         return get_response(request)
@@ -124,8 +150,9 @@ def TenantMainMiddleware(get_response):
     return middleware
 
 
+@sync_and_async_middleware
 def TenantContextMiddleware(get_response):
-    def middleware(request):
+    def set_context(request):
         tenant = getattr(request, "tenant", None)
         if tenant is not None:
             try:
@@ -133,15 +160,27 @@ def TenantContextMiddleware(get_response):
                 request.tenant_schema = getattr(tenant, "schema_name", None)
             except Exception:
                 pass
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            set_context(request)
+            return await get_response(request)
+
+        return middleware
+
+    def middleware(request):
+        set_context(request)
         return get_response(request)
 
     return middleware
 
 
+@sync_and_async_middleware
 def EnforceActiveTenantMiddleware(get_response):
     from django.http import JsonResponse
 
-    def middleware(request):
+    def blocked(request):
         tenant = getattr(request, "tenant", None)
         # If tenant has is_active and is False, block access
         try:
@@ -151,25 +190,48 @@ def EnforceActiveTenantMiddleware(get_response):
                 and tenant.is_active is False
             ):
                 return JsonResponse({"detail": "Tenant suspenso"}, status=403)
+            # Schema still being cloned/seeded by provision_tenant_task
+            if tenant is not None and getattr(
+                tenant, "provisioning_status", "ready"
+            ) not in ("ready", None):
+                response = JsonResponse(
+                    {"detail": "Tenant em provisionamento"}, status=503
+                )
+                response["Retry-After"] = "5"
+                return response
         except Exception:
             # Fail open to avoid blocking due to edge errors
             pass
-        return get_response(request)
+        return None
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            return blocked(request) or await get_response(request)
+
+        return middleware
+
+    def middleware(request):
+        return blocked(request) or get_response(request)
 
     return middleware
 
 
+@sync_and_async_middleware
 def PlanLimitMiddleware(get_response):
     """Middleware para validar limites diários por plano antes de ações.
     Usa o atributo `throttle_scope` da view (ex.: send_whatsapp, email_send, etc.)
     e valida contra `settings.TENANT_PLAN_DAILY_LIMITS[plan][scope]` por tenant.
-    Contadores são armazenados em cache até o fim do dia.
+    Contadores são armazenados em cache até o fim do dia; no caminho async
+    (ASGI) são lidos e incrementados via `apps.core.aio` (Redis assíncrono).
     """
     from django.conf import settings
     from django.core.cache import cache
     from django.http import JsonResponse
     from django.utils import timezone
 
+    LIMITED_METHODS = ("POST", "PUT", "PATCH")
+
     def _category_from_request(request):
         try:
             match = getattr(request, "resolver_match", None)
@@ -231,42 +293,76 @@ def PlanLimitMiddleware(get_response):
         end = now.replace(hour=23, minute=59, second=59, microsecond=0)
         return int((end - now).total_seconds()) or 1
 
-    def middleware(request):
-        try:
-            if request.method in ("POST", "PUT", "PATCH"):
-                tenant = getattr(request, "tenant", None)
-                schema = getattr(tenant, "schema_name", None)
-                category = _category_from_request(request)
-                plan_code = _plan_code(tenant)
-                if tenant and schema and category and plan_code:
-                    limit = _limit_for(tenant, plan_code, category)
-                    if isinstance(limit, int) and limit >= 0:
-                        key = _cache_key(schema, category)
-                        try:
-                            pass
-                        except Exception:
-                            pass
-                        count = cache.get(key, 0)
-                        try:
-                            pass
-                        except Exception:
-                            pass
-                        if count >= limit:
-                            try:
-                                pass
-                            except Exception:
-                                pass
-                            return JsonResponse(
-                                {
-                                    "detail": "Limite diário do plano atingido",
-                                    "plan": plan_code,
-                                    "category": category,
-                                    "limit": limit,
-                                },
-                                status=429,
-                            )
+    def _applicable_limit(request):
+        """(key, limit, plano, categoria) quando há limite diário, senão None."""
+        tenant = getattr(request, "tenant", None)
+        schema = getattr(tenant, "schema_name", None)
+        category = _category_from_request(request)
+        plan_code = _plan_code(tenant)
+        if not (tenant and schema and category and plan_code):
+            return None
+        limit = _limit_for(tenant, plan_code, category)
+        if not isinstance(limit, int) or limit < 0:
+            return None
+        return _cache_key(schema, category), limit, plan_code, category
+
+    def _limit_reached(plan_code, category, limit):
+        return JsonResponse(
+            {
+                "detail": "Limite diário do plano atingido",
+                "plan": plan_code,
+                "category": category,
+                "limit": limit,
+            },
+            status=429,
+        )
+
+    def _succeeded(request, response):
+        return (
+            200 <= getattr(response, "status_code", 500) < 300
+            and request.method in LIMITED_METHODS
+        )
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            try:
+                if request.method in LIMITED_METHODS:
+                    # plan_ref pode exigir uma query, que não roda no event loop
+                    applicable = await sync_to_async(_applicable_limit)(request)
+                    if applicable:
+                        key, limit, plan_code, category = applicable
+                        if await aio.acount(key) >= limit:
+                            return _limit_reached(plan_code, category, limit)
                         # marcar para incrementar depois de sucesso
                         request._plan_limit_key = key
+            except Exception:
+                # Fail open para evitar bloquear em erro inesperado
+                pass
+
+            response = await get_response(request)
+
+            try:
+                key = getattr(request, "_plan_limit_key", None)
+                if key and _succeeded(request, response):
+                    await aio.aincr(key, _ttl_until_end_of_day())
+            except Exception:
+                pass
+
+            return response
+
+        return middleware
+
+    def middleware(request):
+        try:
+            if request.method in LIMITED_METHODS:
+                applicable = _applicable_limit(request)
+                if applicable:
+                    key, limit, plan_code, category = applicable
+                    if cache.get(key, 0) >= limit:
+                        return _limit_reached(plan_code, category, limit)
+                    # marcar para incrementar depois de sucesso
+                    request._plan_limit_key = key
         except Exception:
             # Fail open para evitar bloquear em erro inesperado
             pass
@@ -275,18 +371,9 @@ def PlanLimitMiddleware(get_response):
 
         try:
             key = getattr(request, "_plan_limit_key", None)
-            if (
-                key
-                and 200 <= getattr(response, "status_code", 500) < 300
-                and request.method in ("POST", "PUT", "PATCH")
-            ):
-                ttl = _ttl_until_end_of_day()
+            if key and _succeeded(request, response):
                 current = cache.get(key, 0)
-                try:
-                    pass
-                except Exception:
-                    pass
-                cache.set(key, int(current) + 1, timeout=ttl)
+                cache.set(key, int(current) + 1, timeout=_ttl_until_end_of_day())
         except Exception:
             pass
 
@@ -295,6 +382,7 @@ def PlanLimitMiddleware(get_response):
     return middleware
 
 
+@sync_and_async_middleware
 def EnsureTenantSetMiddleware(get_response):
     """Fallback middleware to ensure `request.tenant` is set when the
     tenant-detection middleware did not populate it (useful for tests).
@@ -302,7 +390,7 @@ def EnsureTenantSetMiddleware(get_response):
     request.tenant and connection schema accordingly.
     """
 
-    def middleware(request):
+    def ensure_tenant(request):
         try:
             if getattr(request, "tenant", None) is None:
                 host = None
@@ -326,7 +414,7 @@ def EnsureTenantSetMiddleware(get_response):
                 try:
                     import logging
 
-                    logger = logging.getLogger("apps.core")
+                    logger = logging.getLogger("apps.core.tenant_resolve")
                     logger.info("EnsureTenantSetMiddleware host lookup: %s", host)
                 except Exception:
                     pass
@@ -361,7 +449,7 @@ def EnsureTenantSetMiddleware(get_response):
                     try:
                         import logging
 
-                        logging.getLogger("apps.core").info(
+                        logging.getLogger("apps.core.tenant_resolve").info(
                             "EnsureTenantSetMiddleware found Domain=%s Tenant=%s",
                             getattr(d, "domain", None) if "d" in locals() else None,
                             getattr(t, "schema_name", None),
@@ -389,7 +477,7 @@ def EnsureTenantSetMiddleware(get_response):
                         try:
                             import logging
 
-                            logging.getLogger("apps.core").info(
+                            logging.getLogger("apps.core.tenant_resolve").info(
                                 "EnsureTenantSetMiddleware set request.tenant=%s",
                                 getattr(request.tenant, "schema_name", None),
                             )
@@ -403,20 +491,33 @@ def EnsureTenantSetMiddleware(get_response):
                     pass
         except Exception:
             pass
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if getattr(request, "tenant", None) is None:
+                # Domain lookup and set_schema belong to the ORM thread
+                await sync_to_async(ensure_tenant)(request)
+            return await get_response(request)
+
+        return middleware
+
+    def middleware(request):
+        ensure_tenant(request)
         return get_response(request)
 
     return middleware
 
 
+@sync_and_async_middleware
 def RequestDebugMiddleware(get_response):
     """Lightweight middleware to log host, resolved host, tenant and schema for debugging tests."""
 
-    def middleware(request):
-        response = None
+    def log_pre(request):
         try:
             import logging
 
-            logger = logging.getLogger("apps.core")
+            logger = logging.getLogger("apps.core.request_debug")
             host = None
             try:
                 host = request.META.get("HTTP_HOST")
@@ -481,62 +582,81 @@ def RequestDebugMiddleware(get_response):
         except Exception:
             pass
 
-        # Dispatch request to next middleware/view
+    def log_post(request, response):
         try:
-            response = get_response(request)
-        finally:
+            import logging
+
+            logger = logging.getLogger("apps.core.request_debug")
+            # Log post-dispatch resolver_match and response status
             try:
-                import logging
+                rm = getattr(request, "resolver_match", None)
+                rm_name = None
+                if rm is not None:
+                    rm_name = (
+                        getattr(rm, "view_name", None)
+                        or getattr(rm, "url_name", None)
+                        or str(rm)
+                    )
+            except Exception:
+                rm_name = None
+            try:
+                from django.db import connection
 
-                logger = logging.getLogger("apps.core")
-                # Log post-dispatch resolver_match and response status
-                try:
-                    rm = getattr(request, "resolver_match", None)
-                    rm_name = None
-                    if rm is not None:
-                        rm_name = (
-                            getattr(rm, "view_name", None)
-                            or getattr(rm, "url_name", None)
-                            or str(rm)
-                        )
-                except Exception:
-                    rm_name = None
-                try:
-                    from django.db import connection
+                schema = getattr(connection, "schema_name", None)
+            except Exception:
+                schema = None
+            logger.info(
+                "RequestDebugMiddleware POST resolver_match=%s tenant=%s schema=%s response_status=%s",
+                rm_name,
+                getattr(getattr(request, "tenant", None), "schema_name", None),
+                schema,
+                getattr(response, "status_code", None),
+            )
+            try:
+                # Extra: attempt to resolve the path and print result or exception
+                from django.urls import resolve
 
-                    schema = getattr(connection, "schema_name", None)
-                except Exception:
-                    schema = None
-                logger.info(
-                    "RequestDebugMiddleware POST resolver_match=%s tenant=%s schema=%s response_status=%s",
-                    rm_name,
-                    getattr(getattr(request, "tenant", None), "schema_name", None),
-                    schema,
-                    getattr(response, "status_code", None),
-                )
                 try:
-                    # Extra: attempt to resolve the path and print result or exception
-                    from django.urls import resolve
-
-                    try:
-                        resolve(getattr(request, "path", "/"))
-                    except Exception:
-                        pass
+                    resolve(getattr(request, "path", "/"))
                 except Exception:
                     pass
             except Exception:
                 pass
+        except Exception:
+            pass
+
+    if iscoroutinefunction(get_response):
 
+        async def middleware(request):
+            log_pre(request)
+            response = None
+            try:
+                response = await get_response(request)
+            finally:
+                log_post(request, response)
+            return response
+
+        return middleware
+
+    def middleware(request):
+        log_pre(request)
+        response = None
+        # Dispatch request to next middleware/view
+        try:
+            response = get_response(request)
+        finally:
+            log_post(request, response)
         return response
 
     return middleware
 
 
+@sync_and_async_middleware
 def InitialRequestDebugMiddleware(get_response):
     """Runs first to capture the raw request META and whether a tenant
     attribute is present before any tenant middleware mutates the request."""
 
-    def middleware(request):
+    def inspect(request):
         try:
             try:
                 request.META.get("HTTP_HOST")
@@ -548,6 +668,17 @@ def InitialRequestDebugMiddleware(get_response):
                 pass
         except Exception:
             pass
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            inspect(request)
+            return await get_response(request)
+
+        return middleware
+
+    def middleware(request):
+        inspect(request)
         return get_response(request)
 
     return middleware
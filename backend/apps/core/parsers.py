@@ -0,0 +1,25 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import USE_ORJSON, StandardJSONRenderer, orjson
+
+
+class StandardJSONParser(JSONParser):
+    """``JSONParser`` decoding with orjson when ``StandardJSONRenderer`` does.
+
+    orjson only reads UTF-8 and always rejects ``NaN``/``Infinity`` (as DRF
+    does with ``STRICT_JSON``); other encodings go through the stdlib parser.
+    """
+
+    renderer_class = StandardJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not USE_ORJSON or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc)) from exc
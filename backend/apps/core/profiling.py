@@ -0,0 +1,335 @@
+"""On-demand profiling of live requests and Celery tasks.
+
+Nothing is profiled unless an admin asks for it, in one of two ways (both
+from the "Profiles" page next to the audit logs in the admin):
+
+- a signed ``X-Profile`` token (``profiling_token``), valid for
+  ``PROFILING_TOKEN_MAX_AGE`` seconds, profiles every request carrying it;
+- sampling rules stored in the cache (``set_rules``) profile a fraction of
+  the requests of a tenant and/or path prefix, or of the runs of a task
+  (e.g. ``apps.events.tasks.handle_event``), until they expire. Each process
+  re-reads the rules at most every ``RULES_REFRESH_SECONDS``, so an idle
+  hook costs a dictionary lookup per request.
+
+``PROFILING_ENGINE`` is ``cprofile`` (deterministic; stored as a marshalled
+pstats file) or ``pyinstrument`` (statistical sampling, lower overhead;
+stored as a speedscope JSON document), falling back to cProfile when
+pyinstrument is not installed. Profiles are gzipped into ``PROFILING_DIR``
+with a JSON sidecar; each write prunes files older than
+``PROFILING_MAX_AGE_DAYS`` and keeps at most ``PROFILING_MAX_FILES``.
+Profiles stay on the host that produced them unless the directory is a
+shared volume.
+
+Under ASGI a request profile covers the request's sync thread (sync views,
+authentication, ORM calls made through ``sync_to_async``), not the event
+loop, where other requests' coroutines interleave.
+"""
+
+import cProfile
+import gzip
+import json
+import marshal
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.text import slugify
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # optional; cProfile is used without it
+    SamplingProfiler = None
+
+TOKEN_HEADER = "X-Profile"
+TOKEN_SALT = "apps.core.profiling"
+RULES_KEY = "profiling:rules"
+RULES_REFRESH_SECONDS = 10
+
+# One profiler per thread: cProfile cannot nest
+_local = threading.local()
+# (fetched_at, rules) per process
+_rules_cache = (0.0, [])
+# task_id -> (Profile, started) between task_prerun and task_postrun
+_task_profiles = {}
+
+
+class Profile:
+    """A running profiler; ``stop()`` returns ``(data, extension)``."""
+
+    def __init__(self):
+        self.engine = settings.PROFILING_ENGINE
+        if self.engine == "pyinstrument" and SamplingProfiler is not None:
+            self._profiler = SamplingProfiler(async_mode="disabled")
+        else:
+            self.engine = "cprofile"
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        _local.active = True
+        if self.engine == "cprofile":
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def stop(self) -> tuple:
+        try:
+            if self.engine == "cprofile":
+                self._profiler.disable()
+                self._profiler.create_stats()
+                # The format pstats.Stats(path) loads (see Stats.dump_stats)
+                return marshal.dumps(self._profiler.stats), "pstats"
+            session = self._profiler.stop()
+            rendered = SpeedscopeRenderer().render(session)
+            return rendered.encode(), "speedscope.json"
+        finally:
+            _local.active = False
+
+
+def start_profile():
+    """A started ``Profile``, or None when this thread is already profiled."""
+    if getattr(_local, "active", False):
+        return None
+    profile = Profile()
+    try:
+        profile.start()
+    except ValueError:
+        # Another profiler (e.g. a debugger or coverage) owns the hook
+        _local.active = False
+        return None
+    return profile
+
+
+def profiling_token(user) -> str:
+    """Value for the ``X-Profile`` header, signed for ``user``."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def _valid_token(value: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            value, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def set_rules(rules: list) -> None:
+    """Store sampling rules for every process.
+
+    Each rule is a dict with ``rate`` (0-1), ``expires_at`` (unix time) and
+    any of ``tenant`` (schema name), ``path`` (prefix) and ``task`` (name);
+    empty criteria match everything.
+    """
+    global _rules_cache
+    now = time.time()
+    rules = [rule for rule in rules if rule["expires_at"] > now]
+    if rules:
+        ttl = int(max(rule["expires_at"] for rule in rules) - now) + 1
+        cache.set(RULES_KEY, rules, timeout=ttl)
+    else:
+        cache.delete(RULES_KEY)
+    _rules_cache = (now, rules)
+
+
+def get_rules() -> list:
+    global _rules_cache
+    fetched_at, rules = _rules_cache
+    now = time.time()
+    if now - fetched_at >= RULES_REFRESH_SECONDS:
+        try:
+            rules = cache.get(RULES_KEY) or []
+        except Exception:
+            rules = []
+        _rules_cache = (now, rules)
+    return [rule for rule in rules if rule["expires_at"] > now]
+
+
+def _sampled(rules, **values) -> bool:
+    for rule in rules:
+        if rule.get("task") and values.get("task") != rule["task"]:
+            continue
+        if not rule.get("task") and "task" in values:
+            continue
+        if rule.get("tenant") and values.get("tenant") != rule["tenant"]:
+            continue
+        if rule.get("path") and not (values.get("path") or "").startswith(rule["path"]):
+            continue
+        if random.random() < rule["rate"]:
+            return True
+    return False
+
+
+def should_profile_request(request) -> bool:
+    token = request.headers.get(TOKEN_HEADER)
+    if token:
+        return _valid_token(token)
+    rules = get_rules()
+    if not rules:
+        return False
+    tenant = getattr(getattr(request, "tenant", None), "schema_name", None)
+    return _sampled(rules, tenant=tenant, path=request.path)
+
+
+def save_profile(kind: str, label: str, data: bytes, extension: str, meta) -> str:
+    """Write a gzipped profile and its sidecar; returns the file name."""
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    slug = slugify(label.replace("/", "-").replace(".", "-"))[:60] or "root"
+    name = f"{stamp}-{kind}-{slug}-{uuid.uuid4().hex[:8]}.{extension}.gz"
+    (directory / name).write_bytes(gzip.compress(data))
+    sidecar = {**meta, "kind": kind, "label": label, "created_at": time.time()}
+    (directory / f"{name}.json").write_text(json.dumps(sidecar, default=str))
+    prune_profiles()
+    return name
+
+
+def list_profiles() -> list:
+    """Sidecar metadata of every stored profile, newest first."""
+    directory = Path(settings.PROFILING_DIR)
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for sidecar in directory.glob("*.gz.json"):
+        profile = directory / sidecar.name[: -len(".json")]
+        try:
+            meta = json.loads(sidecar.read_text())
+            size = profile.stat().st_size
+        except (OSError, ValueError):
+            continue
+        profiles.append({**meta, "name": profile.name, "size": size})
+    profiles.sort(key=lambda meta: meta["created_at"], reverse=True)
+    return profiles
+
+
+def profile_path(name: str):
+    """Path of a stored profile, or None for unknown or unsafe names."""
+    directory = Path(settings.PROFILING_DIR)
+    path = directory / name
+    if path.parent != directory or not name.endswith(".gz") or not path.is_file():
+        return None
+    return path
+
+
+def prune_profiles() -> int:
+    directory = Path(settings.PROFILING_DIR)
+    cutoff = time.time() - settings.PROFILING_MAX_AGE_DAYS * 86400
+    profiles = list_profiles()
+    expired = [
+        meta
+        for index, meta in enumerate(profiles)
+        if index >= settings.PROFILING_MAX_FILES or meta["created_at"] < cutoff
+    ]
+    for meta in expired:
+        for path in (directory / meta["name"], directory / f"{meta['name']}.json"):
+            path.unlink(missing_ok=True)
+    return len(expired)
+
+
+@sync_and_async_middleware
+def ProfilingMiddleware(get_response):
+    if not settings.PROFILING_ENABLED:
+        return get_response
+
+    if iscoroutinefunction(get_response):
+        # Under ASGI, sync views, authentication and the ORM all run in the
+        # request's thread_sensitive thread: the profiler runs there, so it
+        # sees them but not the coroutines interleaving on the event loop
+        async def middleware(request):
+            if not should_profile_request(request):
+                return await get_response(request)
+            profile = await sync_to_async(start_profile)()
+            if profile is None:
+                return await get_response(request)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                data, extension = await sync_to_async(profile.stop)()
+            return await sync_to_async(_attach_profile)(
+                request, response, data, extension, started
+            )
+
+        return middleware
+
+    def middleware(request):
+        if not should_profile_request(request):
+            return get_response(request)
+        profile = start_profile()
+        if profile is None:
+            return get_response(request)
+        started = time.perf_counter()
+        try:
+            response = get_response(request)
+        finally:
+            data, extension = profile.stop()
+        return _attach_profile(request, response, data, extension, started)
+
+    return middleware
+
+
+def _attach_profile(request, response, data, extension, started):
+    match = getattr(request, "resolver_match", None)
+    tenant = getattr(getattr(request, "tenant", None), "schema_name", None)
+    response["X-Profile-Id"] = save_profile(
+        "request",
+        getattr(match, "view_name", None) or request.path,
+        data,
+        extension,
+        {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "tenant": tenant,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+    return response
+
+
+def task_started(sender=None, task_id=None, task=None, **kwargs):
+    name = getattr(task, "name", None) or getattr(sender, "name", None)
+    rules = get_rules()
+    if not rules or not _sampled(rules, task=name):
+        return
+    profile = start_profile()
+    if profile is not None:
+        _task_profiles[task_id] = (profile, time.perf_counter())
+
+
+def task_finished(sender=None, task_id=None, task=None, state=None, **kwargs):
+    running = _task_profiles.pop(task_id, None)
+    if running is None:
+        return
+    profile, started = running
+    data, extension = profile.stop()
+    name = getattr(task, "name", None) or getattr(sender, "name", "unknown")
+    save_profile(
+        "task",
+        name,
+        data,
+        extension,
+        {
+            "task_id": task_id,
+            "state": state,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+
+
+def connect_profiling_signals() -> None:
+    if not settings.PROFILING_ENABLED:
+        return
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(task_started, weak=False)
+    task_postrun.connect(task_finished, weak=False)
@@ -0,0 +1,187 @@
+"""Per-endpoint SQL query budgets.
+
+A view declares ``query_budget = N`` (or ``QUERY_BUDGETS`` maps its URL name
+to N, which wins; ``QUERY_BUDGET_DEFAULT`` covers the rest).
+``QueryBudgetMiddleware`` counts every statement the request runs, on every
+database alias, through ``connection.execute_wrapper``. Over budget, it logs
+a warning on ``apps.core.query_budget`` carrying the repeated statement
+fingerprints (the N+1 culprits), or raises ``QueryBudgetExceeded`` with
+``QUERY_BUDGET_RAISE`` (the test settings), failing the test.
+
+``query_budget(n, label)`` applies the same check to a block of code, e.g.
+``user_has_permission`` or a task, in tests or production code.
+
+With ``QUERY_BUDGET_REPORT`` set, every checked request and block is tallied
+per view/label and ``tests/conftest.py`` writes the tally there when the
+test session ends; ``manage.py query_budget_report`` lists the worst
+offenders.
+"""
+
+import json
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+from . import aio
+
+logger = logging.getLogger(__name__)
+
+DUPLICATES_SHOWN = 5
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# label -> tally, filled only while QUERY_BUDGET_REPORT is set
+_report = {}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql: str) -> str:
+    """``sql`` with literals and ``IN`` list lengths collapsed."""
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _LITERAL.sub("?", sql)
+    return " ".join(sql.split())
+
+
+class QueryTracker:
+    """Records the SQL of every statement run while ``track()`` is active."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @contextmanager
+    def track(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def duplicates(self, limit: int = DUPLICATES_SHOWN) -> list:
+        counts = Counter(fingerprint(sql) for sql in self.statements)
+        return [
+            {"sql": sql, "count": count}
+            for sql, count in counts.most_common(limit)
+            if count > 1
+        ]
+
+
+def budget_for(match):
+    """Budget for a resolved request: settings map, view attribute, default."""
+    budgets = getattr(settings, "QUERY_BUDGETS", None) or {}
+    if match.view_name in budgets:
+        return budgets[match.view_name]
+    view_class = getattr(match.func, "cls", None) or getattr(
+        match.func, "view_class", None
+    )
+    budget = getattr(view_class, "query_budget", None)
+    if budget is None:
+        budget = getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+    return budget
+
+
+def _record(label: str, tracker: QueryTracker, budget, exceeded: bool) -> None:
+    entry = _report.setdefault(
+        label,
+        {"runs": 0, "max_queries": 0, "total_queries": 0, "over_budget": 0},
+    )
+    entry["runs"] += 1
+    entry["total_queries"] += tracker.count
+    entry["over_budget"] += exceeded
+    entry["budget"] = budget
+    if tracker.count >= entry["max_queries"]:
+        entry["max_queries"] = tracker.count
+        entry["duplicates"] = tracker.duplicates()
+
+
+def enforce(label: str, tracker: QueryTracker, budget) -> None:
+    exceeded = budget is not None and tracker.count > budget
+    if getattr(settings, "QUERY_BUDGET_REPORT", ""):
+        _record(label, tracker, budget, exceeded)
+    if not exceeded:
+        return
+    duplicates = tracker.duplicates()
+    if getattr(settings, "QUERY_BUDGET_RAISE", False):
+        repeated = "".join(f"\n  {d['count']}x {d['sql']}" for d in duplicates)
+        raise QueryBudgetExceeded(
+            f"{label} ran {tracker.count} queries (budget {budget}){repeated}"
+        )
+    logger.warning(
+        "Query budget exceeded: %s ran %d queries (budget %d)",
+        label,
+        tracker.count,
+        budget,
+        extra={
+            "view": label,
+            "queries": tracker.count,
+            "budget": budget,
+            "duplicates": duplicates,
+        },
+    )
+
+
+@contextmanager
+def query_budget(budget: int, label: str = "block"):
+    """Check the statements run inside the block against ``budget``."""
+    tracker = QueryTracker()
+    with tracker.track():
+        yield tracker
+    enforce(label, tracker, budget)
+
+
+def _enforce_request(request, tracker: QueryTracker) -> None:
+    match = getattr(request, "resolver_match", None)
+    if match is not None:
+        enforce(match.view_name or match.route, tracker, budget_for(match))
+
+
+@sync_and_async_middleware
+def QueryBudgetMiddleware(get_response):
+    if not getattr(settings, "QUERY_BUDGET_ENABLED", True):
+        return get_response
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            tracker = QueryTracker()
+            async with aio.aexecute_wrapper(tracker):
+                response = await get_response(request)
+            _enforce_request(request, tracker)
+            return response
+
+        return middleware
+
+    def middleware(request):
+        tracker = QueryTracker()
+        with tracker.track():
+            response = get_response(request)
+        _enforce_request(request, tracker)
+        return response
+
+    return middleware
+
+
+def write_report(path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(_report, indent=2, sort_keys=True) + "\n")
+
+
+def load_report(path) -> dict:
+    return json.loads(Path(path).read_text())
@@ -1,8 +1,94 @@
-import os
+"""JSON renderer for the API envelope.
+
+Encoding goes through orjson when it is installed and ``API_JSON_BACKEND``
+is ``"orjson"`` (the default): it serializes datetimes, dates, UUIDs and
+dict/list subclasses natively, and ``_orjson_default`` covers the rest of
+what DRF's ``JSONEncoder`` accepts (Decimal, lazy strings, timedelta,
+querysets, ...) with the same output. Otherwise DRF's stdlib encoder is used.
+
+The envelope is written around the encoded payload as bytes rather than by
+building a wrapping dict, and the settings involved are read once, at
+import.
+"""
+
+import contextlib
+import datetime
+import decimal
 from typing import Any
 
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
 from rest_framework.renderers import JSONRenderer
 
+try:
+    import orjson
+except ImportError:  # optional; DRF's stdlib encoder is used instead
+    orjson = None
+
+USE_ORJSON = orjson is not None and settings.API_JSON_BACKEND == "orjson"
+ENVELOPE = settings.API_RESPONSE_ENVELOPE
+
+ENVELOPE_PREFIX = b'{"success":true,"message":"OK","data":'
+ENVELOPE_SUFFIX = b"}"
+# U+2028/U+2029 in UTF-8; escaped so the output stays a JavaScript subset
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(obj):
+    """Types orjson doesn't handle, encoded like DRF's ``JSONEncoder``."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Serializers coerce decimals to strings by default
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__getitem__"):
+        cls = list if isinstance(obj, (list, tuple)) else dict
+        with contextlib.suppress(Exception):
+            return cls(obj)
+    if hasattr(obj, "__iter__"):
+        return tuple(item for item in obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON bytes, using the configured backend."""
+    if USE_ORJSON:
+        content = orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS)
+        if b"\xe2\x80" in content:
+            for raw, escaped in LINE_SEPARATORS:
+                content = content.replace(raw, escaped)
+        return content
+    return JSONRenderer().render(data)
+
+
+def should_envelope(data: Any, renderer_context) -> bool:
+    if not ENVELOPE:
+        return False
+    response = renderer_context.get("response") if renderer_context else None
+    status_code = getattr(response, "status_code", None)
+    if not status_code or not 200 <= status_code < 300:
+        return False
+    if isinstance(data, dict):
+        # Already-enveloped responses and DRF paginated responses go as-is
+        if "success" in data and ("data" in data or "error" in data):
+            return False
+        if "results" in data:
+            return False
+    return True
+
 
 class StandardJSONRenderer(JSONRenderer):
     """
@@ -13,39 +99,22 @@ class StandardJSONRenderer(JSONRenderer):
       "data": <original payload>
     }
     Error responses are handled by the global exception handler and left as-is.
+    Disabled with ``API_RESPONSE_ENVELOPE = False`` (the test settings).
     """
 
     def render(self, data: Any, accepted_media_type=None, renderer_context=None):
-        response = renderer_context.get("response") if renderer_context else None
-        status_code = getattr(response, "status_code", None)
-
-        try:
-            is_dict = isinstance(data, dict)
-            # Treat already-enveloped responses or DRF paginated responses as-is
-            already_enveloped = is_dict and (
-                "success" in data and ("data" in data or "error" in data)
-            )
-            # DRF pagination returns a dict with 'results' key; do not wrap that
-            if is_dict and "results" in data:
-                already_enveloped = True
-        except Exception:
-            already_enveloped = False
-
-        # During pytest runs we prefer raw responses to avoid breaking
-        # existing tests that expect top-level payloads. Detect pytest by
-        # presence of the PYTEST_CURRENT_TEST env var and do not wrap.
-        running_pytest = bool(os.environ.get("PYTEST_CURRENT_TEST"))
-
-        if (
-            status_code
-            and 200 <= status_code < 300
-            and not already_enveloped
-            and not running_pytest
-        ):
-            data = {
-                "success": True,
-                "message": "OK",
-                "data": data,
-            }
-
-        return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        envelope = should_envelope(data, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            # Pretty-printed output (browsable API, ``; indent=``): stdlib
+            if envelope:
+                data = {"success": True, "message": "OK", "data": data}
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = dumps(data)
+        if envelope:
+            return ENVELOPE_PREFIX + content + ENVELOPE_SUFFIX
+        return content
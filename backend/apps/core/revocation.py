@@ -0,0 +1,329 @@
+"""Revoked-token checks answered from an in-process Bloom filter.
+
+Every refresh (and, with logout, access) token is checked against the
+blacklist tables, which costs a query per check. Here each process keeps a
+Bloom filter of the JTIs of revoked tokens that have not expired yet:
+
+- a filter miss means "not revoked" and costs no network call at all;
+- a filter hit (a revoked token or a false positive, at most
+  ``REVOCATION_FILTER_ERROR_RATE``) is confirmed against the Redis key set
+  when the token was revoked, whose TTL is the token's remaining lifetime,
+  and then against the database.
+
+The filter is built from the database on first use and rebuilt every
+``REVOCATION_FILTER_REBUILD_SECONDS`` (or when it fills up), which drops
+expired JTIs. Revocations in other processes reach it through Redis pub/sub
+(``CHANNEL``); a subscriber thread is started before the first build so no
+message falls between the build and the subscription. JTIs arriving while a
+rebuild reads the database are buffered and merged into the new filter; one
+thread rebuilds at a time, the others keep using the previous filter.
+
+Without a live subscriber (no Redis, connection lost, cache backend other
+than django-redis) the filter could be stale, so checks go to the database,
+as SimpleJWT does. ``prune_expired`` (beat task ``prune_revoked_tokens``)
+deletes rows for tokens that have already expired.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "auth:revocations"
+REVOKED_KEY = "auth:revoked:{jti}"
+# Seconds to wait before retrying a subscription that failed
+SUBSCRIBE_RETRY_SECONDS = 30
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` items at ``error_rate``."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(int(capacity), 1)
+        self.size = max(
+            64, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing (Kirsch-Mitzenmacher) over one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class _FilterState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.built_at = 0.0
+        # JTIs published while a rebuild is reading the database; not None
+        # also means a rebuild is running (one at a time per process)
+        self.pending = None
+        self.listener_pid = None
+        self.listening = False
+        self.retry_at = 0.0
+
+
+_state = _FilterState()
+
+
+def _refresh_lifetime():
+    return api_settings.REFRESH_TOKEN_LIFETIME
+
+
+def _revoked_jtis():
+    """JTIs of revoked tokens that have not expired yet."""
+    now = timezone.now()
+    if apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        yield from (
+            BlacklistedToken.objects.filter(token__expires_at__gt=now)
+            .values_list("token__jti", flat=True)
+            .iterator()
+        )
+    if apps.is_installed("accounts"):
+        from accounts.models import BlacklistedToken as AccountBlacklistedToken
+
+        yield from (
+            AccountBlacklistedToken.objects.filter(
+                created_at__gt=now - _refresh_lifetime()
+            )
+            .values_list("jti", flat=True)
+            .iterator()
+        )
+
+
+def revoked_in_db(jti: str) -> bool:
+    if apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            return True
+    if apps.is_installed("accounts"):
+        from accounts.models import BlacklistedToken as AccountBlacklistedToken
+
+        if AccountBlacklistedToken.objects.filter(jti=jti).exists():
+            return True
+    return False
+
+
+def rebuild_filter():
+    """Rebuild this process's filter; None if another thread is rebuilding it."""
+    with _state.lock:
+        if _state.pending is not None:
+            return None
+        _state.pending = set()
+    try:
+        jtis = list(_revoked_jtis())
+    except Exception:
+        with _state.lock:
+            _state.pending = None
+        raise
+    bloom = BloomFilter(
+        max(len(jtis) * 2, settings.REVOCATION_FILTER_MIN_CAPACITY),
+        settings.REVOCATION_FILTER_ERROR_RATE,
+    )
+    for jti in jtis:
+        bloom.add(jti)
+    with _state.lock:
+        for jti in _state.pending:
+            bloom.add(jti)
+        _state.pending = None
+        _state.bloom = bloom
+        _state.built_at = time.monotonic()
+    return bloom
+
+
+def remember_revoked(jti: str) -> None:
+    """Add a JTI to this process's filter (pub/sub messages, local revokes)."""
+    with _state.lock:
+        if _state.bloom is not None:
+            _state.bloom.add(jti)
+        if _state.pending is not None:
+            _state.pending.add(jti)
+
+
+def _listen(pubsub) -> None:
+    try:
+        for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            jti = message["data"]
+            remember_revoked(jti.decode() if isinstance(jti, bytes) else jti)
+    except Exception:
+        logger.warning("revocation_subscriber_lost", exc_info=True)
+    finally:
+        with _state.lock:
+            # Messages may be lost from here on: stop trusting the filter
+            _state.listening = False
+            _state.bloom = None
+            _state.retry_at = time.monotonic() + SUBSCRIBE_RETRY_SECONDS
+
+
+def _ensure_listener() -> bool:
+    pid = os.getpid()
+    if _state.listening and _state.listener_pid == pid:
+        return True
+    if _state.listener_pid == pid and time.monotonic() < _state.retry_at:
+        return False
+    _state.listener_pid = pid
+    # A forked worker inherits neither the thread nor a trustworthy filter
+    _state.listening = False
+    _state.bloom = None
+    try:
+        from django_redis import get_redis_connection
+
+        pubsub = get_redis_connection("default").pubsub()
+        pubsub.subscribe(CHANNEL)
+    except Exception:
+        _state.retry_at = time.monotonic() + SUBSCRIBE_RETRY_SECONDS
+        return False
+    _state.listening = True
+    threading.Thread(
+        target=_listen, args=(pubsub,), name="token-revocations", daemon=True
+    ).start()
+    return True
+
+
+def current_filter():
+    """This process's filter, or ``None`` when it can't be trusted."""
+    if not settings.REVOCATION_FILTER_ENABLED or not _ensure_listener():
+        return None
+    bloom = _state.bloom
+    if (
+        bloom is None
+        or bloom.full
+        or time.monotonic() - _state.built_at
+        > settings.REVOCATION_FILTER_REBUILD_SECONDS
+    ):
+        try:
+            rebuilt = rebuild_filter()
+        except Exception:
+            logger.warning("revocation_filter_rebuild_failed", exc_info=True)
+            return None
+        # While another thread rebuilds, an old (still complete) filter is
+        # used; without one, checks go to the database
+        if rebuilt is not None:
+            bloom = rebuilt
+    return bloom
+
+
+def is_revoked(jti) -> bool:
+    if not jti:
+        return False
+    bloom = current_filter()
+    if bloom is None:
+        return revoked_in_db(jti)
+    if jti not in bloom:
+        return False
+    try:
+        if cache.get(REVOKED_KEY.format(jti=jti)):
+            return True
+    except Exception:
+        pass
+    # False positive, or revoked before the Redis key existed
+    return revoked_in_db(jti)
+
+
+def publish_revocation(jti: str, expires_at) -> None:
+    """Once the blacklist row commits, mark the JTI in Redis and notify workers."""
+
+    def publish():
+        ttl = int((expires_at - timezone.now()).total_seconds())
+        if ttl <= 0:
+            return
+        remember_revoked(jti)
+        try:
+            cache.set(REVOKED_KEY.format(jti=jti), 1, ttl)
+            from django_redis import get_redis_connection
+
+            get_redis_connection("default").publish(CHANNEL, jti)
+        except Exception:
+            # Other processes fall back to the database until they rebuild
+            logger.warning("revocation_publish_failed", exc_info=True)
+
+    transaction.on_commit(publish)
+
+
+def revoke_token(token):
+    """Blacklist a SimpleJWT token (refresh or access) and publish its JTI."""
+    from rest_framework_simplejwt.token_blacklist.models import (
+        BlacklistedToken,
+        OutstandingToken,
+    )
+
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime_from_epoch(token["exp"])
+    outstanding, _ = OutstandingToken.objects.get_or_create(
+        jti=jti,
+        defaults={"token": str(token), "expires_at": expires_at},
+    )
+    blacklisted = BlacklistedToken.objects.get_or_create(token=outstanding)
+    publish_revocation(jti, expires_at)
+    return blacklisted
+
+
+def prune_expired() -> dict:
+    """Delete blacklist rows of tokens that have already expired."""
+    now = timezone.now()
+    pruned = {"outstanding": 0, "accounts": 0}
+    if apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+        from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+        # BlacklistedToken rows go with them (on_delete=CASCADE)
+        pruned["outstanding"], _ = OutstandingToken.objects.filter(
+            expires_at__lte=now
+        ).delete()
+    if apps.is_installed("accounts"):
+        from accounts.models import BlacklistedToken as AccountBlacklistedToken
+
+        pruned["accounts"], _ = AccountBlacklistedToken.objects.filter(
+            created_at__lte=now - _refresh_lifetime()
+        ).delete()
+    return pruned
+
+
+class RevocableRefreshToken(RefreshToken):
+    """Refresh token whose blacklist check and revoke go through the filter."""
+
+    def check_blacklist(self) -> None:
+        if is_revoked(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        return revoke_token(self)
@@ -118,3 +118,11 @@ def check_daily_limit_warns():
     except Exception as exc:
         # Return exception string for visibility in Celery results
         return {"error": str(exc)}
+
+
+@shared_task
+def prune_revoked_tokens():
+    """Periodic task: delete blacklist rows of tokens that already expired."""
+    from apps.core.revocation import prune_expired
+
+    return prune_expired()
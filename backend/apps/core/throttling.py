@@ -2,10 +2,73 @@ from time import time
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from rest_framework.throttling import ScopedRateThrottle
+from rest_framework import throttling
+from rest_framework.throttling import ScopedRateThrottle, SimpleRateThrottle
 
+from . import aio
 
-class PlanScopedRateThrottle(ScopedRateThrottle):
+
+class FixedWindowRateThrottle(SimpleRateThrottle):
+    """Fixed-window rate limit with an async ``aallow_request``.
+
+    DRF's ``allow_request`` keeps a list of timestamps per client (a sliding
+    window, read-modify-write). Here each window is one counter key
+    (``<cache key>:<window>``) incremented atomically, so sync views and
+    async views (``apps.core.async_views``, through ``apps.core.aio``, without
+    waiting on a thread) share the same counter and budget.
+
+    Listed after DRF's throttle in the bases, so e.g.
+    ``ScopedRateThrottle.allow_request`` resolves the rate and then counts here.
+    """
+
+    _window_ends = None
+
+    def _window_key(self, key):
+        window = int(self.timer() // self.duration)
+        self._window_ends = (window + 1) * self.duration
+        return f"{key}:{window}"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        key = self._window_key(key)
+        # SET NX EX, then INCR: the counter never exists without a TTL
+        self.cache.add(key, 0, timeout=self.duration)
+        try:
+            count = self.cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.set(key, 1, timeout=self.duration)
+            count = 1
+        return count <= self.num_requests
+
+    async def aallow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        count = await aio.aincr(self._window_key(key), self.duration)
+        return count <= self.num_requests
+
+    def wait(self):
+        if self._window_ends is None:
+            return None
+        return max(self._window_ends - self.timer(), 0)
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, FixedWindowRateThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, FixedWindowRateThrottle):
+    pass
+
+
+class PlanScopedRateThrottle(ScopedRateThrottle, FixedWindowRateThrottle):
     """
     Scoped throttle that supports per-tenant plan-based rates.
     Uses the view's `throttle_scope` and, if available, overrides the rate based
@@ -24,6 +87,20 @@ class PlanScopedRateThrottle(ScopedRateThrottle):
             self.record_usage(request)
         return allowed
 
+    async def aallow_request(self, request, view):
+        self._request = request
+        self._view = view
+        # As ScopedRateThrottle.allow_request, which resolves the rate per view
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        allowed = await super().aallow_request(request, view)
+        if allowed:
+            await self.arecord_usage(request)
+        return allowed
+
     def get_rate(self):
         plan_rates = getattr(settings, "TENANT_PLAN_THROTTLE_RATES", {})
         req = getattr(self, "_request", None)
@@ -111,3 +188,14 @@ class PlanScopedRateThrottle(ScopedRateThrottle):
                     self.cache.set(key, data, timeout=max(0, expires_at - current))
                 except Exception:
                     pass
+
+    async def arecord_usage(self, request):
+        tenant = getattr(request, "tenant", None)
+        schema = getattr(tenant, "schema_name", "public")
+        key = self.stats_cache_key(schema, self.scope or "default")
+        window = getattr(self, "duration", None) or 60
+        try:
+            if await aio.aincr(f"{key}:count", window) == 1:
+                await aio.aadd(f"{key}:exp", int(time()) + window, window)
+        except Exception:
+            pass
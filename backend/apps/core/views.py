@@ -4,13 +4,12 @@ from time import time
 
 from apps.auditing.models import AuditLog
 from apps.rbac.permissions import HasPermission
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.cache import cache
 from django.db.models import Count
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
 from django.utils import timezone
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django_redis import get_redis_connection
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -21,8 +20,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from saas_backend.celery import app as celery_app
 
+from . import fair_queue
+from .async_views import AsyncAPIView
+from .db_router import non_atomic_view
+from .http_cache import cache_page_if_enabled, etag_matches, strong_etag
 from .throttling import PlanScopedRateThrottle
-from .webhook_handlers import check_and_mark_idempotent, dispatch_webhook
+from .webhook_handlers import acheck_and_mark_idempotent, dispatch_webhook
 from .webhooks import verify_hmac_signature, verify_stripe_signature
 
 
@@ -44,9 +47,7 @@ class HealthView(APIView):
         return Response({"status": "ok"})
 
 
-@method_decorator(
-    cache_page(getattr(settings, "CACHE_TTL_TENANT_STATUS", 0)), name="get"
-)
+@cache_page_if_enabled(getattr(settings, "CACHE_TTL_TENANT_STATUS", 0))
 class TenantThrottleStatusView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -228,9 +229,8 @@ class ResetDailyPlanCountersView(APIView):
         )
 
 
-@method_decorator(
-    cache_page(getattr(settings, "CACHE_TTL_TENANT_DAILY_SUMMARY", 0)), name="get"
-)
+@non_atomic_view
+@cache_page_if_enabled(getattr(settings, "CACHE_TTL_TENANT_DAILY_SUMMARY", 0))
 class TenantDailySummaryView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -264,12 +264,17 @@ class TenantDailySummaryView(APIView):
         daily_cfg = daily_limits_for(plan)
         logging.getLogger("apps.core").info("DAILY_CFG plan=%s cfg=%s", plan, daily_cfg)
         throttle = PlanScopedRateThrottle()
+        # One round-trip for every category counter instead of one per category
+        counter_keys = {
+            category: f"plan_limit:{schema}:{category}:{today}"
+            for category in daily_cfg
+        }
+        counters = throttle.cache.get_many(list(counter_keys.values()))
 
         summary = []
         warn_threshold = getattr(settings, "TENANT_PLAN_DAILY_WARN_THRESHOLD", 80)
         for category, limit in daily_cfg.items():
-            key = f"plan_limit:{schema}:{category}:{today}"
-            used = int(throttle.cache.get(key, 0))
+            used = int(counters.get(counter_keys[category], 0))
             percent_used = None
             try:
                 if isinstance(limit, int) and limit > 0:
@@ -305,10 +310,19 @@ class TenantDailySummaryView(APIView):
             "daily": summary,
         }
         logging.getLogger("apps.core").info("DAILY_SUMMARY payload=%s", payload)
-        # Return raw JSON to avoid DRF renderer/caching interactions in tests
-        return JsonResponse(payload)
+        # Counters move on every enqueue, so the validator is derived from the
+        # payload itself; unchanged usage is answered with an empty 304.
+        etag = strong_etag(payload)
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            # Return raw JSON to avoid DRF renderer/caching interactions in tests
+            response = JsonResponse(payload)
+        response["ETag"] = etag
+        return response
 
 
+@non_atomic_view
 class QueuesStatusView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -329,6 +343,11 @@ class QueuesStatusView(APIView):
                         "workers": {"worker@host": {}},
                         "active": {"worker@host": []},
                     },
+                    "fair_queue": {
+                        "dispatcher": True,
+                        "backlog": {"acme": 1200},
+                        "plans": {"acme": "free"},
+                    },
                     "dlq": {
                         "by_tenant": [{"tenant_schema": "acme", "count": 2}],
                         "recent": [
@@ -358,6 +377,11 @@ class QueuesStatusView(APIView):
                             "queues": ["events", "dlq"],
                             "queue_depths": {"events": 0, "dlq": 0},
                         },
+                        "fair_queue": {
+                            "dispatcher": True,
+                            "backlog": {"acme": 1200},
+                            "plans": {"acme": "free"},
+                        },
                         "dlq": {
                             "by_tenant": [{"tenant_schema": "acme", "count": 2}],
                             "recent": [
@@ -378,6 +402,7 @@ class QueuesStatusView(APIView):
     def get(self, request):
         redis_info = {"ok": False}
         depths = {"events": None, "dlq": None}
+        fair = {"dispatcher": None, "backlog": None, "plans": None}
 
         try:
             conn = get_redis_connection("default")
@@ -390,6 +415,11 @@ class QueuesStatusView(APIView):
                 depths["dlq"] = int(conn.llen("dlq"))
             except Exception:
                 pass
+            try:
+                fair["dispatcher"] = bool(conn.exists(fair_queue.DISPATCHER_KEY))
+                fair["backlog"], fair["plans"] = fair_queue.backlogs(conn)
+            except Exception:
+                pass
         except Exception as e:
             redis_info["error"] = str(e)
 
@@ -424,6 +454,7 @@ class QueuesStatusView(APIView):
                 "workers": workers,
                 "active": active,
             },
+            "fair_queue": fair,
             "dlq": {
                 "by_tenant": dlq_by_tenant,
                 "recent": recent_dlq,
@@ -436,8 +467,24 @@ class QueuesStatusView(APIView):
 security_logger = logging.getLogger("apps.security")
 
 
-class WebhookReceiverView(APIView):
+def _audit_webhook(request, provider, valid, payload, tenant):
+    AuditLog.objects.create(
+        user=None,
+        path=request.path,
+        method=request.method,
+        source="webhook",
+        action=f"webhook_{provider}",
+        status_code=200 if valid else 401,
+        tenant_schema=getattr(tenant, "schema_name", None),
+        tenant_id=getattr(tenant, "id", None),
+        ip_address=getattr(request, "META", {}).get("REMOTE_ADDR"),
+        payload=payload,
+    )
+
+
+class WebhookReceiverView(AsyncAPIView):
     permission_classes = [AllowAny]
+    query_budget = 10
 
     @extend_schema(
         summary="Webhook receiver",
@@ -479,7 +526,7 @@ class WebhookReceiverView(APIView):
         },
         tags=["core"],
     )
-    def post(self, request, provider: str):
+    async def post(self, request, provider: str):
         secret = (getattr(settings, "WEBHOOK_SECRETS", {}) or {}).get(provider)
         if not secret:
             return Response(
@@ -551,17 +598,8 @@ class WebhookReceiverView(APIView):
                     "path": request.path,
                 },
             )
-            AuditLog.objects.create(
-                user=None,
-                path=request.path,
-                method=request.method,
-                source="webhook",
-                action=f"webhook_{provider}",
-                status_code=200 if valid else 401,
-                tenant_schema=getattr(tenant, "schema_name", None),
-                tenant_id=getattr(tenant, "id", None),
-                ip_address=getattr(request, "META", {}).get("REMOTE_ADDR"),
-                payload=payload,
+            await sync_to_async(_audit_webhook)(
+                request, provider, valid, payload, tenant
             )
         except Exception:
             pass
@@ -583,11 +621,12 @@ class WebhookReceiverView(APIView):
         except Exception:
             event_id = None
 
-        first_time = check_and_mark_idempotent(provider, event_id)
+        first_time = await acheck_and_mark_idempotent(provider, event_id)
 
-        # Dispatch provider-specific handler
+        # Dispatch provider-specific handler (publishes a Celery task; eager
+        # tasks may use the ORM, so it runs in the request's ORM thread)
         try:
-            dispatch_webhook(
+            await sync_to_async(dispatch_webhook)(
                 provider,
                 payload if isinstance(payload, dict) else {},
                 getattr(tenant, "schema_name", None),
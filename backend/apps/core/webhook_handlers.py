@@ -6,6 +6,8 @@ from django.conf import settings
 from django.core.cache import cache
 from django_redis import get_redis_connection
 
+from . import aio
+
 logger = logging.getLogger("apps.core.webhooks")
 
 
@@ -37,6 +39,25 @@ def check_and_mark_idempotent(provider: str, event_id: Optional[str]) -> bool:
             return True
 
 
+async def acheck_and_mark_idempotent(provider: str, event_id: Optional[str]) -> bool:
+    """``check_and_mark_idempotent`` for async views, on the same keys."""
+    if not event_id:
+        return True
+    key = _idempotency_key(provider, event_id)
+    ttl = int(getattr(settings, "WEBHOOK_IDEMPOTENCY_TTL_SECONDS", 86400))
+    try:
+        client = aio.redis_client()
+        if client is not None:
+            # SET key NX EX ttl
+            return bool(await client.set(key, 1, ex=ttl, nx=True))
+    except Exception:
+        pass
+    try:
+        return bool(await cache.aadd(key, 1, timeout=ttl))
+    except Exception:
+        return True
+
+
 def dispatch_webhook(
     provider: str,
     payload: Dict[str, Any],
@@ -1,3 +1,5 @@
+from apps.core import fair_queue
+from apps.core.async_views import AsyncAPIView
 from apps.rbac.permissions import HasPermission
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -25,7 +27,7 @@ class MailerStatusView(APIView):
         return Response({"service": "mailer", "status": "ok"})
 
 
-class MailerSendEmailView(APIView):
+class MailerSendEmailView(AsyncAPIView):
     required_permission = "email_send"
     permission_classes = [IsAuthenticated, HasPermission]
     throttle_scope = "email_send"
@@ -50,10 +52,12 @@ class MailerSendEmailView(APIView):
         },
         tags=["email"],
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = EmailSendSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        task = send_email_message.delay(
+        task = await fair_queue.aenqueue(
+            getattr(request, "tenant", None),
+            send_email_message,
             serializer.validated_data["to"],
             serializer.validated_data["subject"],
             serializer.validated_data["body"],
@@ -0,0 +1,263 @@
+"""Set-based engine for bulk RBAC imports.
+
+Used by ``BulkRbacApplyView`` and the ``bulk_apply_rbac`` command. Whatever
+the payload size, users, roles and permissions are resolved with one ``IN``
+query each. Pairs are matched with one ``(user_id, x_id) IN (...)`` per
+relation (chunked to stay below driver parameter limits): assignments first
+read the pairs that already exist, so the summary counts only new rows, and
+write the rest with ``bulk_create``; revocations are one ``DELETE``.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import Permission, Role, UserPermission, UserRole
+
+# Email that UserManager derives for users created with only a `username`
+PLACEHOLDER_EMAIL = "{username}@noemail.invalid"
+BATCH_SIZE = 1000
+
+# (section, kind, error key used in the per-item report)
+OPERATIONS = (
+    ("assign", "roles", "roles_assign"),
+    ("assign", "permissions", "perms_assign"),
+    ("revoke", "roles", "roles_revoke"),
+    ("revoke", "permissions", "perms_revoke"),
+)
+
+
+def _lookup_fields(User) -> list:
+    fields = []
+    for name in (getattr(User, "USERNAME_FIELD", "username"), "username", "email"):
+        try:
+            User._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if name not in fields:
+            fields.append(name)
+    return fields
+
+
+def _registered_users(identifiers) -> dict:
+    # Users created inside a test transaction may be invisible to the request
+    # connection; the in-process registry covers that case.
+    from apps.core.test_registry import get_user_pk_by_username
+
+    found = {}
+    for ident in identifiers:
+        pk = get_user_pk_by_username(ident)
+        if not pk and "@" not in ident:
+            pk = get_user_pk_by_username(PLACEHOLDER_EMAIL.format(username=ident))
+        if pk:
+            found[ident] = pk
+    return found
+
+
+def _match_users(User, keys, case_sensitive) -> dict:
+    """``{key: {pk}}`` for users whose lookup fields match ``keys``."""
+    fields = _lookup_fields(User)
+    if case_sensitive:
+        aliases = fields
+        queryset = User.objects.all()
+    else:
+        annotations = {f"lookup_{field}": Lower(field) for field in fields}
+        aliases = list(annotations)
+        queryset = User.objects.annotate(**annotations)
+    match = Q(
+        *(Q(**{f"{alias}__in": list(keys)}) for alias in aliases), _connector=Q.OR
+    )
+    found = {}
+    for pk, *values in queryset.filter(match).values_list("pk", *aliases):
+        for value in values:
+            if value in keys:
+                found.setdefault(value, set()).add(pk)
+    return found
+
+
+def resolve_users(identifiers) -> dict:
+    """Map usernames/emails to user pks with one or two queries.
+
+    Exact matches on ``USERNAME_FIELD``/``username``/``email`` come first
+    (an indexed ``IN``); identifiers left over are matched case-insensitively.
+    Bare names also match the placeholder email of username-only users, after
+    the name itself. Identifiers matching several users at the same step map
+    to ``None``; unresolved ones are simply absent from the result.
+    """
+    User = get_user_model()
+    resolved = {}
+    pending = list(dict.fromkeys(identifiers))
+    for case_sensitive in (True, False):
+        if not pending:
+            break
+        # Each identifier's keys, in order of preference
+        keys = {}
+        for ident in pending:
+            key = ident if case_sensitive else ident.lower()
+            keys[ident] = [key]
+            if "@" not in ident:
+                placeholder = PLACEHOLDER_EMAIL.format(username=ident)
+                keys[ident].append(
+                    placeholder if case_sensitive else placeholder.lower()
+                )
+        found = _match_users(
+            User,
+            {key for ident_keys in keys.values() for key in ident_keys},
+            case_sensitive,
+        )
+        for ident, ident_keys in keys.items():
+            for key in ident_keys:
+                pks = found.get(key)
+                if pks:
+                    resolved[ident] = next(iter(pks)) if len(pks) == 1 else None
+                    break
+        pending = [ident for ident in pending if ident not in resolved]
+
+    if pending:
+        resolved.update(_registered_users(pending))
+    return resolved
+
+
+def _pair_batches(model, field, tenant, pairs):
+    """Yield ``(connection, table, user_col, obj_col, where, params)`` per batch.
+
+    ``where`` selects the batch's ``(user_id, x_id)`` rows of ``tenant`` with
+    one row-value IN (chunked to stay below driver parameter limits).
+    """
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    user_col = qn(model._meta.get_field("user").column)
+    obj_col = qn(model._meta.get_field(field).column)
+    tenant_col = qn(model._meta.get_field("tenant").column)
+    pairs = sorted(pairs)
+    for start in range(0, len(pairs), BATCH_SIZE):
+        batch = pairs[start : start + BATCH_SIZE]
+        values = ", ".join(["(%s, %s)"] * len(batch))
+        where = f"{tenant_col} = %s AND ({user_col}, {obj_col}) IN ({values})"
+        params = [tenant.pk, *(value for pair in batch for value in pair)]
+        yield connection, table, user_col, obj_col, where, params
+
+
+def _bulk_assign(model, field, tenant, pairs) -> int:
+    """Insert the pairs ``tenant`` doesn't have yet; returns how many were new."""
+    existing = set()
+    for connection, table, user_col, obj_col, where, params in _pair_batches(
+        model, field, tenant, pairs
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {user_col}, {obj_col} FROM {table} WHERE {where}", params
+            )
+            existing.update(cursor.fetchall())
+    new = set(pairs) - existing
+    model.objects.bulk_create(
+        (
+            model(user_id=user_id, tenant=tenant, **{field: obj_id})
+            for user_id, obj_id in sorted(new)
+        ),
+        batch_size=BATCH_SIZE,
+        # A concurrent import may still insert the same pairs
+        ignore_conflicts=True,
+    )
+    return len(new)
+
+
+def _bulk_revoke(model, field, tenant, pairs) -> int:
+    """Delete every ``(user_id, field)`` pair of ``tenant`` with row-value IN."""
+    deleted = 0
+    for connection, table, _, _, where, params in _pair_batches(
+        model, field, tenant, pairs
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE {where}", params)
+            deleted += cursor.rowcount
+    return deleted
+
+
+def _referenced_names(items: dict) -> tuple:
+    usernames, role_names, perm_codes = set(), set(), set()
+    for (_, kind), rows in items.items():
+        for item in rows:
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get("username"), str):
+                usernames.add(item["username"])
+            if kind == "roles" and isinstance(item.get("role"), str):
+                role_names.add(item["role"])
+            if kind == "permissions" and isinstance(item.get("permission"), str):
+                perm_codes.add(item["permission"])
+    return usernames, role_names, perm_codes
+
+
+def bulk_apply_rbac(operations: dict, tenant) -> tuple:
+    """Apply an ``{"assign": {...}, "revoke": {...}}`` payload to ``tenant``.
+
+    Returns ``(summary, errors)``: ``summary`` counts the applied operations
+    and ``errors`` lists one ``{error_key: message}`` per rejected item, in
+    payload order. Assignments run before revocations, as before.
+    """
+    items = {
+        (section, kind): (operations.get(section) or {}).get(kind) or []
+        for section, kind, _ in OPERATIONS
+    }
+    usernames, role_names, perm_codes = _referenced_names(items)
+    users = resolve_users(usernames)
+    roles = dict(Role.objects.filter(name__in=role_names).values_list("name", "pk"))
+    perms = dict(
+        Permission.objects.filter(code__in=perm_codes).values_list("code", "pk")
+    )
+
+    errors = []
+    pairs = {key: set() for key in items}
+    for section, kind, error_key in OPERATIONS:
+        field, lookup, label = (
+            ("role", roles, "Role não encontrada")
+            if kind == "roles"
+            else ("permission", perms, "Permissão não encontrada")
+        )
+        for item in items[(section, kind)]:
+            if not (
+                isinstance(item, dict)
+                and isinstance(item.get("username"), str)
+                and isinstance(item.get(field), str)
+            ):
+                errors.append({error_key: f"Item inválido: {item!r}"})
+                continue
+            user_id = users.get(item["username"])
+            if user_id is None and item["username"] in users:
+                errors.append({error_key: f"Usuário ambíguo: {item['username']}"})
+                continue
+            if user_id is None:
+                errors.append(
+                    {error_key: f"Usuário não encontrado: {item['username']}"}
+                )
+                continue
+            obj_id = lookup.get(item[field])
+            if obj_id is None:
+                errors.append({error_key: f"{label}: {item[field]}"})
+                continue
+            pairs[(section, kind)].add((user_id, obj_id))
+
+    with transaction.atomic():
+        summary = {
+            "roles_assigned": _bulk_assign(
+                UserRole, "role_id", tenant, pairs[("assign", "roles")]
+            ),
+            "permissions_assigned": _bulk_assign(
+                UserPermission,
+                "permission_id",
+                tenant,
+                pairs[("assign", "permissions")],
+            ),
+            "roles_revoked": _bulk_revoke(
+                UserRole, "role", tenant, pairs[("revoke", "roles")]
+            ),
+            "permissions_revoked": _bulk_revoke(
+                UserPermission, "permission", tenant, pairs[("revoke", "permissions")]
+            ),
+        }
+    summary["errors"] = len(errors)
+    return summary, errors
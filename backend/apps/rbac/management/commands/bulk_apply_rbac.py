@@ -1,9 +1,8 @@
 import json
 
-from apps.rbac.models import Permission, Role, UserPermission, UserRole
+from apps.rbac.bulk import bulk_apply_rbac
 from apps.tenants.models import Tenant
-from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
@@ -30,40 +29,13 @@ class Command(BaseCommand):
         except Tenant.DoesNotExist:
             return self.stdout.write(self.style.ERROR("Tenant não encontrado"))
 
-        User = get_user_model()
-
-        def get_user(username):
-            try:
-                return User.objects.get(username=username)
-            except User.DoesNotExist:
-                raise ValueError(f"Usuário não encontrado: {username}")
-
-        # Assign roles
-        for item in data.get("assign", {}).get("roles", []) or []:
-            user = get_user(item["username"])
-            role = Role.objects.get(name=item["role"])
-            UserRole.objects.get_or_create(user=user, role=role, tenant=tenant)
-
-        # Assign permissions
-        for item in data.get("assign", {}).get("permissions", []) or []:
-            user = get_user(item["username"])
-            perm = Permission.objects.get(code=item["permission"])
-            UserPermission.objects.get_or_create(
-                user=user, permission=perm, tenant=tenant
+        summary, errors = bulk_apply_rbac(data, tenant)
+        for error in errors:
+            for key, message in error.items():
+                self.stderr.write(f"{key}: {message}")
+        self.stdout.write(json.dumps(summary))
+        if errors:
+            raise CommandError(
+                f"{len(errors)} operação(ões) rejeitada(s); as demais foram aplicadas"
             )
-
-        # Revoke roles
-        for item in data.get("revoke", {}).get("roles", []) or []:
-            user = get_user(item["username"])
-            role = Role.objects.get(name=item["role"])
-            UserRole.objects.filter(user=user, role=role, tenant=tenant).delete()
-
-        # Revoke permissions
-        for item in data.get("revoke", {}).get("permissions", []) or []:
-            user = get_user(item["username"])
-            perm = Permission.objects.get(code=item["permission"])
-            UserPermission.objects.filter(
-                user=user, permission=perm, tenant=tenant
-            ).delete()
-
         self.stdout.write(self.style.SUCCESS("Operações RBAC aplicadas com sucesso"))
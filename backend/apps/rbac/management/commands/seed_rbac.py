@@ -1,17 +1,22 @@
-from contextlib import contextmanager
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connections
 
-from ...models import Permission, Role
+from ...seeding import pending_targets, public_schema_name, seed_schema, seed_target
 
 
-def _noop_context(*args, **kwargs):
-    @contextmanager
-    def _ctx():
-        yield
+def _seed(schema_name: str, force: bool) -> tuple:
+    try:
+        return schema_name, seed_schema(schema_name, force=force)
+    except Exception:
+        return schema_name, "failed"
 
-    return _ctx()
+
+def _close_connections():
+    # Forked workers must open their own database connections
+    connections.close_all()
 
 
 class Command(BaseCommand):
@@ -31,119 +36,61 @@ class Command(BaseCommand):
             help="Seed all tenants (requires django-tenants)",
             required=False,
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Worker processes for --all-tenants (1 = inline)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-apply even where the current seed fingerprint is recorded",
+        )
 
     def handle(self, *args, **options):
-        # Prepare context manager for tenant schema switching if available
-        try:
-            from django_tenants.utils import get_public_schema_name, schema_context
-        except Exception:
-            schema_context = _noop_context
-            try:
-                # best-effort fallback
-                from django_tenants.utils import get_public_schema_name
-            except Exception:
-
-                def get_public_schema_name():
-                    return "public"
+        force = options["force"]
+        if options.get("all_tenants"):
+            return self._seed_all(options["workers"], force)
+
+        schema_name = options.get("tenant") or public_schema_name()
+        outcome = seed_schema(schema_name, force=force)
+        self.stdout.write(
+            self.style.SUCCESS(f"RBAC seed completed for {schema_name} ({outcome})")
+        )
 
-        tenant_arg = options.get("tenant")
-        all_tenants = options.get("all_tenants")
+    def _schemas(self) -> list:
+        try:
+            from django.apps import apps as django_apps
 
-        def seed_in_schema(schema_name=None):
-            ctx = (
-                schema_context(schema_name)
-                if schema_name
-                else schema_context(get_public_schema_name())
+            Tenant = django_apps.get_model("tenants", "Tenant")
+            return list(Tenant.objects.values_list("schema_name", flat=True))
+        except Exception:
+            self.stderr.write(
+                "Unable to enumerate tenants; ensure apps.tenants is installed "
+                "and migrations applied"
             )
-            with ctx:
-                perms = [
-                    {"code": "manage_users", "description": "Gerenciar usuários"},
-                    {"code": "view_users", "description": "Ver usuários"},
-                    {
-                        "code": "manage_rbac",
-                        "description": "Gerenciar roles e permissões",
-                    },
-                    {"code": "manage_tenants", "description": "Gerenciar tenants"},
-                ]
-                created_perms = []
-                for p in perms:
-                    perm, created = Permission.objects.get_or_create(
-                        code=p["code"],
-                        defaults={"description": p.get("description", "")},
-                    )
-                    created_perms.append(perm)
-                    if created:
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f"[{schema_name or 'default'}] Created permission: {perm.code}"
-                            )
-                        )
-
-                # Roles
-                admin_role, created = Role.objects.get_or_create(name="ADMIN")
-                if created:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"[{schema_name or 'default'}] Created role: ADMIN"
-                        )
-                    )
-                cliente_role, created = Role.objects.get_or_create(name="CLIENTE")
-                if created:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"[{schema_name or 'default'}] Created role: CLIENTE"
-                        )
-                    )
-
-                # Assign permissions to ADMIN (all)
-                with transaction.atomic():
-                    admin_role.permissions.set(Permission.objects.all())
-                    admin_role.save()
-
-                    # Assign a minimal set to CLIENTE
-                    cliente_perms = Permission.objects.filter(code__in=["view_users"])
-                    cliente_role.permissions.set(cliente_perms)
-                    cliente_role.save()
-
-        # If requested, seed all tenants (requires tenants app + django-tenants)
-        if all_tenants:
-            try:
-                from django.apps import apps as django_apps
+            return []
 
-                Tenant = django_apps.get_model("tenants", "Tenant")
-                try:
-                    pass
-
-                except Exception:
-                    pass
-                for t in Tenant.objects.all():
-                    try:
-                        seed_in_schema(t.schema_name)
-                    except Exception:
-                        # don't fail the whole run
-                        self.stderr.write(f"Failed to seed tenant {t.schema_name}")
-            except Exception:
-                self.stderr.write(
-                    "Unable to enumerate tenants; ensure apps.tenants is installed and migrations applied"
-                )
-                # fall back to single-schema seed
-                seed_in_schema(None)
-            self.stdout.write(self.style.SUCCESS("RBAC seed completed (all tenants)"))
-            return
-
-        # If a single tenant was supplied, seed only that schema
-        if tenant_arg:
-            try:
-                seed_in_schema(tenant_arg)
-                self.stdout.write(
-                    self.style.SUCCESS(f"RBAC seed completed for tenant {tenant_arg}")
-                )
-                return
-            except Exception:
-                self.stderr.write(
-                    f"Failed to seed tenant {tenant_arg}; falling back to default schema"
-                )
-
-        # Default: seed public/default schema
-        seed_in_schema(None)
-        self.stdout.write(self.style.SUCCESS("RBAC seed completed"))
+    def _seed_all(self, workers: int, force: bool):
+        schemas = [public_schema_name(), *self._schemas()]
+        targets = pending_targets(schemas, force=force)
+        results = Counter(
+            {"skipped": len({seed_target(name) for name in schemas}) - len(targets)}
+        )
+        if workers <= 1 or len(targets) <= 1:
+            outcomes = [_seed(name, force) for name in targets]
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_close_connections
+            ) as pool:
+                outcomes = list(pool.map(_seed, targets, [force] * len(targets)))
+        for schema_name, outcome in outcomes:
+            results[outcome] += 1
+            if outcome == "failed":
+                self.stderr.write(f"Failed to seed tenant {schema_name}")
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(results.items()) if v)
+        self.stdout.write(
+            self.style.SUCCESS(f"RBAC seed completed (all tenants): {summary}")
+        )
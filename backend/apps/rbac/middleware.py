@@ -1,3 +1,4 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import JsonResponse
 
 from .permissions import user_has_permission
@@ -6,10 +7,16 @@ from .permissions import user_has_permission
 class PermissionMiddleware:
     """Middleware checks for required_permission on view functions/classes.
     Uses process_view to read attribute and enforce 403 if missing.
+    Under ASGI, Django runs the (sync) process_view in the ORM thread.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
         return self.get_response(request)
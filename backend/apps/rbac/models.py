@@ -141,3 +141,14 @@ class UserPermission(models.Model):
                     except Exception:
                         pass
         super().save(*args, **kwargs)
+
+
+class RbacSeedState(models.Model):
+    """Fingerprint of the default RBAC seed last applied to a schema."""
+
+    schema_name = models.CharField(max_length=63, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    seeded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.schema_name}:{self.fingerprint[:12]}"
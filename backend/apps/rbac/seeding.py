@@ -0,0 +1,166 @@
+"""Default RBAC seed: desired state, fingerprint and a diff-based applier.
+
+The desired permissions and roles are declared once below. ``seed_schema``
+applies them with a handful of set-based statements: one read per table, a
+``bulk_create(update_conflicts=True)`` only for rows that are missing or
+differ, and a diff of the role/permission links. Each applied schema records
+the seed fingerprint in ``RbacSeedState`` so later runs (every ``migrate``,
+every tenant creation, ``seed_rbac --all-tenants``) skip schemas that are
+already current.
+
+``ADMIN`` receives every permission that exists when the seed is applied.
+Permissions created later through the API are not picked up by a skipped
+schema; run ``seed_rbac --force`` to re-apply.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Permission, RbacSeedState, Role
+
+DEFAULT_PERMISSIONS = {
+    "manage_users": "Gerenciar usuários",
+    "view_users": "Ver usuários",
+    "manage_rbac": "Gerenciar roles e permissões",
+    "manage_tenants": "Gerenciar tenants",
+}
+
+# None means "every permission in the schema"
+DEFAULT_ROLES = {
+    "ADMIN": None,
+    "CLIENTE": ("view_users",),
+}
+
+SEED_FINGERPRINT = hashlib.sha256(
+    json.dumps(
+        {"permissions": DEFAULT_PERMISSIONS, "roles": DEFAULT_ROLES}, sort_keys=True
+    ).encode()
+).hexdigest()
+
+
+def public_schema_name() -> str:
+    try:
+        from django_tenants.utils import get_public_schema_name
+
+        return get_public_schema_name()
+    except Exception:
+        return "public"
+
+
+def rbac_is_shared() -> bool:
+    """RBAC tables live only in the public schema (``apps.rbac`` is shared)."""
+    return "apps.rbac" not in getattr(settings, "TENANT_APPS", ())
+
+
+def seed_target(schema_name=None) -> str:
+    """Schema whose RBAC tables ``schema_name`` actually reads and writes.
+
+    Shared RBAC tables resolve to ``public`` through the search path from
+    every tenant, so all tenants collapse onto a single seed target.
+    """
+    if not schema_name or rbac_is_shared():
+        return public_schema_name()
+    return schema_name
+
+
+def schema_context(schema_name):
+    try:
+        from django_tenants.utils import schema_context as tenant_schema_context
+    except Exception:
+        from contextlib import nullcontext
+
+        return nullcontext()
+    return tenant_schema_context(schema_name)
+
+
+def _sync_permissions() -> dict:
+    existing = dict(Permission.objects.values_list("code", "description"))
+    changed = [
+        Permission(code=code, description=description)
+        for code, description in DEFAULT_PERMISSIONS.items()
+        if existing.get(code) != description
+    ]
+    if changed:
+        Permission.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=["code"],
+            update_fields=["description"],
+        )
+    return dict(Permission.objects.values_list("code", "pk"))
+
+
+def _sync_roles() -> dict:
+    existing = dict(
+        Role.objects.filter(name__in=DEFAULT_ROLES).values_list("name", "pk")
+    )
+    missing = [Role(name=name) for name in DEFAULT_ROLES if name not in existing]
+    if missing:
+        Role.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = dict(
+            Role.objects.filter(name__in=DEFAULT_ROLES).values_list("name", "pk")
+        )
+    return existing
+
+
+def _sync_role_permissions(role_ids: dict, perm_ids: dict) -> None:
+    Link = Role.permissions.through
+    desired = set()
+    for name, codes in DEFAULT_ROLES.items():
+        wanted = perm_ids.values() if codes is None else (perm_ids[c] for c in codes)
+        desired.update((role_ids[name], perm_id) for perm_id in wanted)
+
+    current = set(
+        Link.objects.filter(role_id__in=role_ids.values()).values_list(
+            "role_id", "permission_id"
+        )
+    )
+    if desired - current:
+        Link.objects.bulk_create(
+            (Link(role_id=r, permission_id=p) for r, p in desired - current),
+            ignore_conflicts=True,
+        )
+    extra = {}
+    for role_id, perm_id in current - desired:
+        extra.setdefault(role_id, []).append(perm_id)
+    for role_id, stale in extra.items():
+        Link.objects.filter(role_id=role_id, permission_id__in=stale).delete()
+
+
+def seed_schema(schema_name=None, force: bool = False) -> str:
+    """Apply the default seed to ``schema_name``; returns ``seeded``/``skipped``."""
+    target = seed_target(schema_name)
+    with schema_context(target):
+        current = (
+            RbacSeedState.objects.filter(schema_name=target)
+            .values_list("fingerprint", flat=True)
+            .first()
+        )
+        if current == SEED_FINGERPRINT and not force:
+            return "skipped"
+        with transaction.atomic():
+            perm_ids = _sync_permissions()
+            role_ids = _sync_roles()
+            _sync_role_permissions(role_ids, perm_ids)
+            RbacSeedState.objects.update_or_create(
+                schema_name=target, defaults={"fingerprint": SEED_FINGERPRINT}
+            )
+    return "seeded"
+
+
+def pending_targets(schema_names, force: bool = False) -> list:
+    """Distinct seed targets for ``schema_names`` that are not yet current."""
+    targets = list(dict.fromkeys(seed_target(name) for name in schema_names))
+    if force or not rbac_is_shared():
+        # Each schema keeps its own state row; workers check it themselves
+        return targets
+    with schema_context(public_schema_name()):
+        current = set(
+            RbacSeedState.objects.filter(
+                schema_name__in=targets, fingerprint=SEED_FINGERPRINT
+            ).values_list("schema_name", flat=True)
+        )
+    return [name for name in targets if name not in current]
@@ -1,16 +1,20 @@
-from django.core.management import call_command
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 
 
 @receiver(post_migrate)
 def seed_rbac_on_migrate(sender, **kwargs):
-    """Run the RBAC seed command automatically after migrations in development/test.
-    This is idempotent and safe to run repeatedly.
+    """Seed default RBAC roles and permissions after migrations.
+
+    ``post_migrate`` fires once per installed app; only the RBAC app's signal
+    seeds, and schemas already at the current seed fingerprint are skipped.
     """
+    if getattr(sender, "name", None) != "apps.rbac":
+        return
     try:
-        # avoid running during migrations for other apps unnecessarily
-        call_command("seed_rbac")
+        from .seeding import seed_schema
+
+        seed_schema()
     except Exception:
         # don't fail migrations if seeding fails
         pass
@@ -8,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .bulk import bulk_apply_rbac
 from .models import Permission, Role, UserRole
 from .permissions import HasPermission
 from .serializers import (
@@ -409,6 +410,8 @@ class PermissionDetailView(APIView):
 class BulkRbacApplyView(APIView):
     required_permission = "manage_users"
     permission_classes = [IsAuthenticated, HasPermission]
+    # bulk_apply_rbac is set-based: constant in the number of operations
+    query_budget = 30
 
     @extend_schema(
         request=BulkRbacOperationSerializer,
@@ -451,11 +454,6 @@ class BulkRbacApplyView(APIView):
         ser.is_valid(raise_exception=True)
         payload = ser.validated_data
 
-        from django.contrib.auth import get_user_model
-
-        from .models import Permission, Role, UserPermission, UserRole
-
-        User = get_user_model()
         tenant = getattr(request, "tenant", None)
         if tenant is None:
             return Response(
@@ -463,149 +461,7 @@ class BulkRbacApplyView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        def get_user(username):
-            # Try several plausible fields to locate the user record. This
-            # accommodates projects where `USERNAME_FIELD` differs or when the
-            # test-created user may have been saved into a different field.
-            uname_field = getattr(User, "USERNAME_FIELD", "username")
-            candidate_fields = [uname_field, "username", "email"]
-            from django.core.exceptions import FieldError
-
-            for field in candidate_fields:
-                if not field:
-                    continue
-                try:
-                    qs = User.objects.filter(**{field: username})
-                except FieldError:
-                    continue
-                try:
-                    u = qs.first()
-                    if u:
-                        return u
-                except Exception:
-                    continue
-            # Last-resort: try a case-insensitive contains search across known
-            # fields, this is more expensive but helps in flaky test DB visibility
-            try:
-                from django.db.models import Q
-
-                q = Q()
-                for field in candidate_fields:
-                    try:
-                        q |= Q(**{f"{field}__iexact": username})
-                    except Exception:
-                        pass
-                if q:
-                    u = User.objects.filter(q).first()
-                    if u:
-                        return u
-            except Exception:
-                pass
-            # If the project's USERNAME_FIELD is `email` and tests pass a
-            # `username` value (legacy tests), the UserManager derives a
-            # placeholder email like `username@noemail.invalid`. Try that
-            # form as a convenience so tests that create users with
-            # `username=` are discovered.
-            try:
-                uname_field = getattr(User, "USERNAME_FIELD", "username")
-                if uname_field == "email" and "@" not in username:
-                    pseudo_email = f"{username}@noemail.invalid"
-                    u = User.objects.filter(email__iexact=pseudo_email).first()
-                    if u:
-                        return u
-            except Exception:
-                pass
-            # As a fallback, attempt to query the shared (public) schema
-            # where the auth user table typically lives for shared apps.
-            try:
-                from django_tenants.utils import schema_context
-
-                with schema_context("public"):
-                    for field in candidate_fields:
-                        try:
-                            u = User.objects.filter(
-                                **{f"{field}__iexact": username}
-                            ).first()
-                            if u:
-                                return u
-                        except Exception:
-                            continue
-            except Exception:
-                pass
-            # If DB lookups failed, try an in-process test registry that
-            # records user PKs when tests create users inside pytest
-            # transactions (those rows can be invisible to the request
-            # handling DB connection). If found, return a lightweight
-            # stub containing only the PK so downstream code can operate
-            # using `user_id=` semantics.
-            try:
-                from apps.core.test_registry import get_user_pk_by_username
-
-                # Try both raw username and the pseudo-email form used by
-                # the UserManager helper for legacy username inputs.
-                pk = get_user_pk_by_username(username)
-                if not pk and "@" not in username:
-                    pk = get_user_pk_by_username(f"{username}@noemail.invalid")
-                if pk:
-
-                    class _StubUser:
-                        def __init__(self, pk):
-                            self.pk = pk
-
-                    return _StubUser(pk)
-            except Exception:
-                pass
-            raise ValueError(f"Usuário não encontrado: {username}")
-
-        errors = []
-
-        # Assign roles
-        for item in payload.get("assign", {}).get("roles", []) or []:
-            try:
-                user = get_user(item["username"])
-                user_pk = getattr(user, "pk", None)
-                role = Role.objects.get(name=item["role"])
-                UserRole.objects.get_or_create(
-                    user_id=user_pk, role=role, tenant=tenant
-                )
-            except Exception as e:
-                errors.append({"roles_assign": str(e)})
-
-        # Assign permissions
-        for item in payload.get("assign", {}).get("permissions", []) or []:
-            try:
-                user = get_user(item["username"])
-                user_pk = getattr(user, "pk", None)
-                perm = Permission.objects.get(code=item["permission"])
-                UserPermission.objects.get_or_create(
-                    user_id=user_pk, permission=perm, tenant=tenant
-                )
-            except Exception as e:
-                errors.append({"perms_assign": str(e)})
-
-        # Revoke roles
-        for item in payload.get("revoke", {}).get("roles", []) or []:
-            try:
-                user = get_user(item["username"])
-                user_pk = getattr(user, "pk", None)
-                role = Role.objects.get(name=item["role"])
-                UserRole.objects.filter(
-                    user_id=user_pk, role=role, tenant=tenant
-                ).delete()
-            except Exception as e:
-                errors.append({"roles_revoke": str(e)})
-
-        # Revoke permissions
-        for item in payload.get("revoke", {}).get("permissions", []) or []:
-            try:
-                user = get_user(item["username"])
-                user_pk = getattr(user, "pk", None)
-                perm = Permission.objects.get(code=item["permission"])
-                UserPermission.objects.filter(
-                    user_id=user_pk, permission=perm, tenant=tenant
-                ).delete()
-            except Exception as e:
-                errors.append({"perms_revoke": str(e)})
+        summary, errors = bulk_apply_rbac(payload, tenant)
 
         # If some sub-operations reported non-fatal errors, surface a 207
         # Multi-Status so tests can assert partial failures while still
@@ -625,6 +481,8 @@ class BulkRbacApplyView(APIView):
                 tenant_schema=getattr(tenant, "schema_name", None),
                 tenant_id=getattr(tenant, "id", None),
                 ip_address=getattr(request, "META", {}).get("REMOTE_ADDR"),
+                # One summarized entry for the whole import
+                payload=summary,
             )
         except Exception:
             pass
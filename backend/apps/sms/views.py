@@ -1,3 +1,5 @@
+from apps.core import fair_queue
+from apps.core.async_views import AsyncAPIView
 from apps.rbac.permissions import HasPermission
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -25,7 +27,7 @@ class SmsStatusView(APIView):
         return Response({"service": "sms", "status": "ok"})
 
 
-class SmsSendMessageView(APIView):
+class SmsSendMessageView(AsyncAPIView):
     required_permission = "sms_send"
     permission_classes = [IsAuthenticated, HasPermission]
     throttle_scope = "sms_send"
@@ -50,11 +52,14 @@ class SmsSendMessageView(APIView):
         },
         tags=["sms"],
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = SmsSendSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        task = send_sms_message.delay(
-            serializer.validated_data["to"], serializer.validated_data["message"]
+        task = await fair_queue.aenqueue(
+            getattr(request, "tenant", None),
+            send_sms_message,
+            serializer.validated_data["to"],
+            serializer.validated_data["message"],
         )
         return Response(
             {"id": task.id, "status": "queued"}, status=status.HTTP_201_CREATED
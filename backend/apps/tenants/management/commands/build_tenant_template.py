@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from ...provisioning import (
+    build_template,
+    migration_state_hash,
+    template_schema_name,
+    template_state,
+)
+
+
+class Command(BaseCommand):
+    help = "Build the migrated template schema that new tenants are cloned from"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild even if the template matches the current migrations",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report whether the template is current (exit 1 if stale)",
+        )
+
+    def handle(self, *args, **options):
+        schema = template_schema_name()
+        if options["check"]:
+            if template_state() != migration_state_hash():
+                self.stderr.write(f"Template schema {schema} is stale")
+                raise SystemExit(1)
+            self.stdout.write(
+                self.style.SUCCESS(f"Template schema {schema} is current")
+            )
+            return
+        rebuilt = build_template(force=options["force"])
+        state = "rebuilt" if rebuilt else "already current"
+        self.stdout.write(self.style.SUCCESS(f"Template schema {schema} {state}"))
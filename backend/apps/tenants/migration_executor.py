@@ -0,0 +1,272 @@
+"""Parallel, resumable executor for ``migrate_schemas``.
+
+django-tenants picks the executor through ``GET_EXECUTOR_FUNCTION``; ours
+adds the ``parallel`` codename (the default, see
+``TENANT_MIGRATION_EXECUTOR``) next to ``standard`` and ``multiprocessing``.
+
+The public schema is migrated first, inline. Tenant schemas then run in a
+bounded process pool (``TENANT_MIGRATION_WORKERS``, default one per core),
+largest or historically slowest first so a big schema does not start last
+and stretch the tail. Every finished schema is recorded in
+``SchemaMigrationProgress`` under a run key derived from the migration graph
+and the command's target; rerunning the same deploy after an interruption
+skips schemas already ``done`` for that key. A progress line is printed as
+each schema finishes and a summary (failures, slowest schemas) at the end.
+"""
+
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import CommandError, OutputWrapper
+from django.db import connection, connections
+from django_tenants.migration_executors import get_executor as tenants_get_executor
+from django_tenants.migration_executors.base import MigrationExecutor, run_migrations
+
+ORDER_CHOICES = ("size", "duration", "name")
+SLOWEST_REPORTED = 5
+
+# Options that only inspect the migration state; nothing to record or resume
+READ_ONLY_OPTIONS = ("list", "plan", "check_unapplied")
+# Non-picklable options django passes through call_command
+LOCAL_OPTIONS = ("stdout", "stderr")
+
+
+def get_executor(codename=None):
+    """``GET_EXECUTOR_FUNCTION``: resolve ``parallel`` or a django-tenants one."""
+    codename = (
+        codename or os.environ.get("EXECUTOR") or settings.TENANT_MIGRATION_EXECUTOR
+    )
+    if codename == ParallelExecutor.codename:
+        return ParallelExecutor
+    return tenants_get_executor(codename)
+
+
+def run_key(options) -> str:
+    """Identify a rollout: the migration graph plus what the command targets."""
+    from .provisioning import migration_state_hash
+
+    target = [
+        migration_state_hash(),
+        options.get("app_label") or "",
+        options.get("migration_name") or "",
+        "fake" if options.get("fake") else "",
+        "fake-initial" if options.get("fake_initial") else "",
+    ]
+    return hashlib.sha256("\n".join(target).encode()).hexdigest()
+
+
+def schema_sizes(schema_names) -> dict:
+    """Total on-disk size (tables, indexes, TOAST) of each schema, in bytes."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT n.nspname, COALESCE(SUM(pg_total_relation_size(c.oid)), 0) "
+            "FROM pg_namespace n LEFT JOIN pg_class c "
+            "ON c.relnamespace = n.oid AND c.relkind IN ('r', 'm') "
+            "WHERE n.nspname = ANY(%s) GROUP BY n.nspname",
+            [list(schema_names)],
+        )
+        return {name: int(size) for name, size in cursor.fetchall()}
+
+
+def order_schemas(schema_names, sizes=None, durations=None, mode="size") -> list:
+    """Sort schemas so the most expensive ones start first.
+
+    ``duration`` uses the previous run's timing and falls back to size for
+    schemas never migrated by this executor; ``name`` keeps a stable
+    alphabetical order.
+    """
+    if mode not in ORDER_CHOICES:
+        raise CommandError(
+            f"TENANT_MIGRATION_ORDER must be one of {', '.join(ORDER_CHOICES)}"
+        )
+    if mode == "name":
+        return sorted(schema_names)
+    sizes = sizes or {}
+    durations = durations or {}
+    if mode == "duration":
+        return sorted(
+            schema_names,
+            key=lambda name: (-durations.get(name, -1), -sizes.get(name, 0), name),
+        )
+    return sorted(schema_names, key=lambda name: (-sizes.get(name, 0), name))
+
+
+def _close_connections():
+    # Forked workers must open their own database connections
+    connections.close_all()
+
+
+def _migrate_schema(args, options, schema_name, tenant_type=""):
+    started = time.monotonic()
+    try:
+        run_migrations(
+            args,
+            options,
+            ParallelExecutor.codename,
+            schema_name,
+            tenant_type=tenant_type,
+            allow_atomic=False,
+        )
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        return schema_name, False, time.monotonic() - started, error
+    return schema_name, True, time.monotonic() - started, ""
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+
+class ParallelExecutor(MigrationExecutor):
+    codename = "parallel"
+
+    def __init__(self, args, options):
+        super().__init__(args, options)
+        self.options = {
+            key: value for key, value in options.items() if key not in LOCAL_OPTIONS
+        }
+        self.stdout = options.get("stdout") or OutputWrapper(sys.stdout)
+        self.workers = settings.TENANT_MIGRATION_WORKERS or os.cpu_count() or 1
+        # An explicit --schema (template builds, tests, one-off repairs) is
+        # always migrated; resume only applies to full rollouts.
+        self.tracking = not (
+            options.get("schema_name")
+            or any(options.get(name) for name in READ_ONLY_OPTIONS)
+        )
+
+    def run_migrations(self, tenants=None):
+        self._run([(name, "") for name in tenants or []])
+
+    def run_multi_type_migrations(self, tenants):
+        self._run([(name, tenant_type) for name, tenant_type in tenants or []])
+
+    def _run(self, tenants):
+        public = [item for item in tenants if item[0] == self.PUBLIC_SCHEMA_NAME]
+        tenants = [item for item in tenants if item[0] != self.PUBLIC_SCHEMA_NAME]
+        for schema_name, tenant_type in public:
+            run_migrations(
+                self.args,
+                self.options,
+                self.codename,
+                schema_name,
+                tenant_type=tenant_type,
+            )
+        if not tenants:
+            return
+        if len(tenants) == 1 and not self.tracking:
+            schema_name, tenant_type = tenants[0]
+            run_migrations(
+                self.args,
+                self.options,
+                self.codename,
+                schema_name,
+                tenant_type=tenant_type,
+            )
+            return
+
+        types = dict(tenants)
+        key = run_key(self.options) if self.tracking else None
+        pending, resumed = self._plan(list(types), key)
+        if resumed:
+            self._write(f"Resuming: {resumed} schema(s) already migrated for this run")
+        if not pending:
+            return
+        results = self._migrate(pending, types, key)
+        self._summary(results, resumed)
+
+    def _plan(self, schema_names, key) -> tuple:
+        from .models import SchemaMigrationProgress
+
+        done, durations = set(), {}
+        if self.tracking:
+            rows = SchemaMigrationProgress.objects.filter(
+                schema_name__in=schema_names
+            ).values_list("schema_name", "run_key", "status", "duration_ms")
+            for name, row_key, status, duration_ms in rows:
+                durations[name] = duration_ms
+                if row_key == key and status == SchemaMigrationProgress.STATUS_DONE:
+                    done.add(name)
+        pending = [name for name in schema_names if name not in done]
+        mode = settings.TENANT_MIGRATION_ORDER
+        sizes = schema_sizes(pending) if mode != "name" else {}
+        return order_schemas(pending, sizes, durations, mode), len(done)
+
+    def _migrate(self, pending, types, key) -> list:
+        total = len(pending)
+        workers = min(self.workers, total)
+        self._write(
+            f"Migrating {total} tenant schema(s) with {workers} worker(s), "
+            f"ordered by {settings.TENANT_MIGRATION_ORDER}"
+        )
+        started = time.monotonic()
+        results = []
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_close_connections
+        ) as pool:
+            futures = [
+                pool.submit(_migrate_schema, self.args, self.options, name, types[name])
+                for name in pending
+            ]
+            for future in as_completed(futures):
+                schema_name, ok, duration, error = future.result()
+                results.append((schema_name, ok, duration, error))
+                self._record(schema_name, key, ok, duration, error)
+                elapsed = time.monotonic() - started
+                eta = elapsed / len(results) * (total - len(results))
+                self._write(
+                    f"[{len(results)}/{total}] {schema_name} "
+                    f"{'ok' if ok else 'FAILED'} in {_format_seconds(duration)} "
+                    f"(elapsed {_format_seconds(elapsed)}, "
+                    f"eta {_format_seconds(eta)})"
+                )
+        return results
+
+    def _record(self, schema_name, key, ok, duration, error):
+        if not self.tracking:
+            return
+        from .models import SchemaMigrationProgress
+
+        connection.set_schema_to_public()
+        SchemaMigrationProgress.objects.update_or_create(
+            schema_name=schema_name,
+            defaults={
+                "run_key": key,
+                "status": (
+                    SchemaMigrationProgress.STATUS_DONE
+                    if ok
+                    else SchemaMigrationProgress.STATUS_FAILED
+                ),
+                "duration_ms": int(duration * 1000),
+                "error": error[:2000],
+            },
+        )
+
+    def _summary(self, results, resumed):
+        failed = [(name, error) for name, ok, _, error in results if not ok]
+        slowest = sorted(results, key=lambda row: row[2], reverse=True)
+        slowest = ", ".join(
+            f"{name} ({_format_seconds(duration)})"
+            for name, _, duration, _ in slowest[:SLOWEST_REPORTED]
+        )
+        self._write(
+            f"Tenant migrations: ok={len(results) - len(failed)} "
+            f"failed={len(failed)} resumed={resumed}; slowest: {slowest}"
+        )
+        if failed:
+            details = "\n".join(f"  {name}: {error}" for name, error in failed)
+            raise CommandError(
+                f"{len(failed)} tenant schema(s) failed to migrate; rerun "
+                f"migrate_schemas to retry only those:\n{details}"
+            )
+
+    def _write(self, message):
+        if int(self.options.get("verbosity", 1)) >= 1:
+            self.stdout.write(message)
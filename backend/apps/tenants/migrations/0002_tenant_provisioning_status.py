@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tenants", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="provisioning_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pendente"),
+                    ("provisioning", "Provisionando"),
+                    ("ready", "Pronto"),
+                    ("failed", "Falhou"),
+                ],
+                db_default="ready",
+                default="ready",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="tenant",
+            name="provisioning_error",
+            field=models.TextField(blank=True, db_default="", default=""),
+        ),
+    ]
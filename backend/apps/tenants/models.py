@@ -13,6 +13,18 @@ class Plan(models.Model):
 
 
 class Tenant(TenantMixin):
+    PROVISIONING_PENDING = "pending"
+    PROVISIONING_RUNNING = "provisioning"
+    PROVISIONING_READY = "ready"
+    PROVISIONING_FAILED = "failed"
+
+    PROVISIONING_CHOICES = (
+        (PROVISIONING_PENDING, "Pendente"),
+        (PROVISIONING_RUNNING, "Provisionando"),
+        (PROVISIONING_READY, "Pronto"),
+        (PROVISIONING_FAILED, "Falhou"),
+    )
+
     name = models.CharField(max_length=200)
     plan = models.CharField(max_length=50, default="free")
     plan_ref = models.ForeignKey(
@@ -20,9 +32,61 @@ class Tenant(TenantMixin):
     )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    provisioning_status = models.CharField(
+        max_length=20,
+        choices=PROVISIONING_CHOICES,
+        default=PROVISIONING_READY,
+        db_default=PROVISIONING_READY,
+    )
+    provisioning_error = models.TextField(blank=True, default="", db_default="")
 
     auto_create_schema = True
 
+    def create_schema(self, check_if_exists=False, sync_schema=True, verbosity=1):
+        """Clone the migrated template schema instead of running migrations.
+
+        Falls back to django-tenants' migrate-based creation when cloning is
+        disabled (``TENANT_TEMPLATE_CLONING``) or no sync is requested.
+        """
+        from . import provisioning
+
+        if not (sync_schema and provisioning.template_cloning_enabled()):
+            return super().create_schema(
+                check_if_exists=check_if_exists,
+                sync_schema=sync_schema,
+                verbosity=verbosity,
+            )
+        return provisioning.clone_template(
+            self.schema_name, check_if_exists=check_if_exists
+        )
+
+
+class SchemaMigrationProgress(models.Model):
+    """Outcome of the last ``migrate_schemas`` run for one tenant schema.
+
+    Written by ``apps.tenants.migration_executor``: an interrupted rollout
+    resumes by skipping schemas already ``done`` for the same ``run_key``, and
+    ``duration_ms`` orders the next rollout slowest-first.
+    """
+
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (STATUS_DONE, "Concluída"),
+        (STATUS_FAILED, "Falhou"),
+    )
+
+    schema_name = models.CharField(max_length=63, unique=True)
+    run_key = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    duration_ms = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.schema_name}:{self.status}"
+
 
 class Domain(DomainMixin):
     def save(self, *args, **kwargs):
@@ -0,0 +1,122 @@
+"""Pool of pre-provisioned spare tenant schemas.
+
+Spares are cloned from the template schema (see ``apps.tenants.provisioning``)
+ahead of time by the ``replenish_tenant_pool`` beat task and stamped with the
+migration hash they were built from. Signup claims one by renaming it to the
+new tenant's schema inside the same transaction that inserts the
+``Tenant``/``Domain`` rows, so it costs a few catalog updates instead of a
+schema build. Spares left behind by a migration change are never claimed and
+are dropped on the next replenish.
+"""
+
+import logging
+import secrets
+import zlib
+
+from django.conf import settings
+from django.db import connection
+
+from . import provisioning
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = zlib.crc32(b"tenants:schema-pool")
+
+
+def pool_enabled() -> bool:
+    return settings.TENANT_POOL_SIZE > 0 and provisioning.template_cloning_enabled()
+
+
+def _like_prefix() -> str:
+    return settings.TENANT_POOL_PREFIX.replace("_", r"\_") + "%"
+
+
+def spare_schemas() -> list:
+    """``[(schema_name, migration_hash), ...]`` for every spare, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nspname, obj_description(oid, 'pg_namespace') "
+            "FROM pg_namespace WHERE nspname LIKE %s ORDER BY nspname",
+            [_like_prefix()],
+        )
+        return cursor.fetchall()
+
+
+def pool_status() -> dict:
+    """Pool depth for monitoring (``GET /tenants/pool``)."""
+    if not pool_enabled():
+        return {"enabled": False, "target": settings.TENANT_POOL_SIZE, "ready": 0}
+    current = provisioning.migration_state_hash()
+    spares = spare_schemas()
+    ready = sum(1 for _, state in spares if state == current)
+    return {
+        "enabled": True,
+        "target": settings.TENANT_POOL_SIZE,
+        "ready": ready,
+        "stale": len(spares) - ready,
+        "migration_hash": current,
+    }
+
+
+def _create_spare(current_hash: str) -> str:
+    name = f"{settings.TENANT_POOL_PREFIX}{secrets.token_hex(6)}"
+    provisioning.clone_template(name)
+    with connection.cursor() as cursor:
+        cursor.execute(f'COMMENT ON SCHEMA "{name}" IS %s', [current_hash])
+    return name
+
+
+def replenish() -> dict:
+    """Drop stale spares and clone new ones up to ``TENANT_POOL_SIZE``."""
+    current = provisioning.migration_state_hash()
+    dropped = created = 0
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [LOCK_KEY])
+        if not cursor.fetchone()[0]:
+            # Another worker is already replenishing
+            return {"created": 0, "dropped": 0}
+    try:
+        ready = 0
+        for name, state in spare_schemas():
+            if state == current:
+                ready += 1
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP SCHEMA IF EXISTS "{name}" CASCADE')
+            dropped += 1
+        for _ in range(max(settings.TENANT_POOL_SIZE - ready, 0)):
+            _create_spare(current)
+            created += 1
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [LOCK_KEY])
+    if created or dropped:
+        logger.info("Tenant pool replenished: created=%s dropped=%s", created, dropped)
+    return {"created": created, "dropped": dropped}
+
+
+def claim_spare(schema_name: str) -> bool:
+    """Rename a current spare to ``schema_name``; False if none is available.
+
+    Must run inside the transaction that creates the tenant rows: the rename
+    is transactional DDL, so a rollback puts the spare back in the pool. A
+    transaction-scoped advisory lock per spare keeps concurrent signups from
+    picking the same one.
+    """
+    current = provisioning.migration_state_hash()
+    with connection.cursor() as cursor:
+        for name, state in spare_schemas():
+            if state != current:
+                continue
+            cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", [name])
+            if not cursor.fetchone()[0]:
+                continue
+            # Re-check: a concurrent claim may have committed the rename
+            # between our listing and the lock.
+            cursor.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", [name])
+            if cursor.fetchone() is None:
+                continue
+            cursor.execute(f'ALTER SCHEMA "{name}" RENAME TO "{schema_name}"')
+            cursor.execute(f'COMMENT ON SCHEMA "{schema_name}" IS NULL')
+            return True
+    return False
@@ -0,0 +1,155 @@
+"""Tenant provisioning by cloning a pre-migrated template schema.
+
+Running the whole migration chain for every new tenant takes longer as
+migrations accumulate. Instead a template schema (``TENANT_TEMPLATE_SCHEMA``)
+is migrated and seeded once, and new tenant schemas are copied from it with
+the server-side ``clone_schema`` function shipped by django-tenants
+(``django_tenants.clone``), which copies tables, sequences, constraints and
+the ``django_migrations`` rows in a single statement.
+
+The template is stamped (``COMMENT ON SCHEMA``) with a hash of the migration
+graph on disk; a deploy that adds migrations changes the hash and the next
+clone rebuilds the template first. Rebuilds take an exclusive advisory lock
+and clones a shared one, so a clone never sees a half-built template.
+"""
+
+import functools
+import hashlib
+import logging
+import zlib
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django_tenants.clone import CloneSchema
+from django_tenants.utils import schema_exists
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = zlib.crc32(b"tenants:template-schema")
+
+
+def template_schema_name() -> str:
+    return settings.TENANT_TEMPLATE_SCHEMA
+
+
+def template_cloning_enabled() -> bool:
+    return settings.TENANT_TEMPLATE_CLONING and connection.vendor == "postgresql"
+
+
+@functools.lru_cache(maxsize=1)
+def migration_state_hash() -> str:
+    """SHA-256 of every migration known on disk (app label + name).
+
+    Computed once per process: loading the graph imports every migration
+    module, and the files only change with a deploy (a new process).
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    nodes = sorted(f"{app}.{name}" for app, name in loader.graph.nodes)
+    return hashlib.sha256("\n".join(nodes).encode()).hexdigest()
+
+
+@contextmanager
+def _advisory_lock(shared: bool = False):
+    suffix = "_shared" if shared else ""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT pg_advisory_lock{suffix}(%s)", [LOCK_KEY])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT pg_advisory_unlock{suffix}(%s)", [LOCK_KEY])
+
+
+def template_state():
+    """Migration hash stamped on the template schema, or ``None``."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT obj_description(oid, 'pg_namespace') FROM pg_namespace "
+            "WHERE nspname = %s",
+            [template_schema_name()],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _ensure_clone_function():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regproc('public.clone_schema')")
+        if cursor.fetchone()[0] is None:
+            CloneSchema()._create_clone_schema_function()
+
+
+def build_template(force: bool = False) -> bool:
+    """(Re)build the template schema if its hash is stale; True if rebuilt."""
+    expected = migration_state_hash()
+    schema = template_schema_name()
+    with _advisory_lock():
+        if not force and template_state() == expected:
+            return False
+        logger.info("Rebuilding tenant template schema %s", schema)
+        connection.set_schema_to_public()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+            cursor.execute(f'CREATE SCHEMA "{schema}"')
+        call_command(
+            "migrate_schemas", schema_name=schema, interactive=False, verbosity=0
+        )
+        from apps.rbac.seeding import seed_schema
+
+        seed_schema(schema)
+        connection.set_schema_to_public()
+        with connection.cursor() as cursor:
+            cursor.execute(f'COMMENT ON SCHEMA "{schema}" IS %s', [expected])
+    return True
+
+
+def clone_template(schema_name: str, check_if_exists: bool = False) -> bool:
+    """Create ``schema_name`` as a copy of the (fresh) template schema.
+
+    Returns False when ``check_if_exists`` is set and the schema is already
+    there, mirroring ``TenantMixin.create_schema``.
+    """
+    connection.set_schema_to_public()
+    if schema_exists(schema_name):
+        if check_if_exists:
+            return False
+        raise ValueError(f'Schema "{schema_name}" already exists')
+    build_template()
+    _ensure_clone_function()
+    with _advisory_lock(shared=True):
+        if template_state() != migration_state_hash():
+            raise RuntimeError("Tenant template schema is stale; rebuild it first")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT public.clone_schema(%s, %s, true, false)",
+                [template_schema_name(), schema_name],
+            )
+    connection.set_schema_to_public()
+    return True
+
+
+def provision_tenant(tenant) -> str:
+    """Create and seed ``tenant``'s schema, tracking ``provisioning_status``."""
+    from apps.rbac.seeding import seed_schema
+
+    Tenant = type(tenant)
+    Tenant.objects.filter(pk=tenant.pk).update(
+        provisioning_status=Tenant.PROVISIONING_RUNNING, provisioning_error=""
+    )
+    try:
+        tenant.create_schema(check_if_exists=True, verbosity=0)
+        seed_schema(tenant.schema_name)
+    except Exception as exc:
+        logger.exception("Provisioning failed for tenant %s", tenant.schema_name)
+        Tenant.objects.filter(pk=tenant.pk).update(
+            provisioning_status=Tenant.PROVISIONING_FAILED,
+            provisioning_error=str(exc)[:2000],
+        )
+        return Tenant.PROVISIONING_FAILED
+    Tenant.objects.filter(pk=tenant.pk).update(
+        provisioning_status=Tenant.PROVISIONING_READY
+    )
+    return Tenant.PROVISIONING_READY
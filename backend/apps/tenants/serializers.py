@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
+from . import pool
 from .models import Domain, Tenant
 
 
@@ -10,7 +13,8 @@ class TenantCreateSerializer(serializers.Serializer):
     plan = serializers.CharField(max_length=50, required=False, default="free")
 
     def validate_schema_name(self, value):
-        if value in ("public",):
+        reserved = value in ("public", settings.TENANT_TEMPLATE_SCHEMA)
+        if reserved or value.startswith(settings.TENANT_POOL_PREFIX):
             raise serializers.ValidationError("schema_name inválido")
         return value
 
@@ -21,12 +25,35 @@ class TenantCreateSerializer(serializers.Serializer):
         plan = validated_data.get("plan", "free")
 
         tenant = Tenant(name=name, schema_name=schema_name, plan=plan, is_active=True)
-        tenant.save()  # auto_create_schema criará o schema
+        with transaction.atomic():
+            # Um schema reserva já migrado é renomeado na mesma transação que
+            # cria o tenant; sem reserva, clona do template em background.
+            from_pool = pool.pool_enabled() and pool.claim_spare(schema_name)
+            run_async = not from_pool and settings.TENANT_ASYNC_PROVISIONING
+            if from_pool or run_async:
+                tenant.auto_create_schema = False
+            if run_async:
+                tenant.provisioning_status = Tenant.PROVISIONING_PENDING
+            tenant.save()  # caso contrário, auto_create_schema cria o schema
 
-        Domain.objects.create(domain=domain_name, tenant=tenant, is_primary=True)
+            Domain.objects.create(domain=domain_name, tenant=tenant, is_primary=True)
+
+        from .tasks import provision_tenant_task, replenish_tenant_pool
+
+        if from_pool:
+            transaction.on_commit(replenish_tenant_pool.delay)
+        elif run_async:
+            transaction.on_commit(lambda: provision_tenant_task.delay(tenant.pk))
         return tenant
 
 
+class TenantProvisioningSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tenant
+        fields = ("id", "schema_name", "provisioning_status", "provisioning_error")
+        read_only_fields = fields
+
+
 class TenantActionSerializer(serializers.Serializer):
     action = serializers.ChoiceField(choices=["suspend", "reactivate"])
 
@@ -1,4 +1,3 @@
-from django.core.management import call_command
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -14,8 +13,10 @@ def seed_rbac_on_tenant_create(sender, instance: Tenant, created, **kwargs):
     if not created:
         return
     try:
-        # call management command to seed this tenant schema
-        call_command("seed_rbac", "--tenant", instance.schema_name)
+        from apps.rbac.seeding import seed_schema
+
+        # no-op when the tenant's RBAC tables are already at the current seed
+        seed_schema(instance.schema_name)
     except Exception:
         # never fail tenant creation due to seeding errors
         return
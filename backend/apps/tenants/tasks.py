@@ -0,0 +1,33 @@
+from celery import shared_task
+
+
+@shared_task
+def provision_tenant_task(tenant_id: int) -> str:
+    """Background provisioning for tenants created through the API."""
+    from .models import Tenant
+    from .provisioning import provision_tenant
+
+    tenant = Tenant.objects.filter(pk=tenant_id).first()
+    if tenant is None:
+        return "missing"
+    return provision_tenant(tenant)
+
+
+@shared_task
+def build_tenant_template_task(force: bool = False) -> bool:
+    """Rebuild the template schema ahead of signups (e.g. after a deploy)."""
+    from .provisioning import build_template, template_cloning_enabled
+
+    if not template_cloning_enabled():
+        return False
+    return build_template(force=force)
+
+
+@shared_task
+def replenish_tenant_pool() -> dict:
+    """Keep ``TENANT_POOL_SIZE`` current spare schemas ready to be claimed."""
+    from .pool import pool_enabled, replenish
+
+    if not pool_enabled():
+        return {"created": 0, "dropped": 0}
+    return replenish()
@@ -1,9 +1,16 @@
 from django.urls import path
 
-from .views import TenantActionView, TenantCreateView, TenantPlanUpdateView
+from .views import (
+    TenantActionView,
+    TenantCreateView,
+    TenantPlanUpdateView,
+    TenantPoolStatusView,
+    TenantProvisioningStatusView,
+)
 
 urlpatterns = [
     path("tenants", TenantCreateView.as_view(), name="tenant-create"),
+    path("tenants/pool", TenantPoolStatusView.as_view(), name="tenant-pool"),
     path(
         "tenants/<int:tenant_id>/actions",
         TenantActionView.as_view(),
@@ -14,4 +21,9 @@ urlpatterns = [
         TenantPlanUpdateView.as_view(),
         name="tenant-plan-update",
     ),
+    path(
+        "tenants/<int:tenant_id>/provisioning",
+        TenantProvisioningStatusView.as_view(),
+        name="tenant-provisioning",
+    ),
 ]
@@ -9,10 +9,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import Tenant
+from .pool import pool_status
 from .serializers import (
     TenantActionSerializer,
     TenantCreateSerializer,
     TenantPlanUpdateSerializer,
+    TenantProvisioningSerializer,
 )
 
 
@@ -24,10 +26,12 @@ class TenantCreateView(APIView):
         request=TenantCreateSerializer,
         responses={
             201: None,
+            202: None,
         },
         tags=["tenants"],
         description=(
-            "Cria um tenant e emite o evento TenantCreated. "
+            "Cria um tenant e emite o evento TenantCreated. Com provisionamento "
+            "assíncrono (padrão) responde 202 e o schema é clonado em background. "
             "Consumidores do evento podem executar ações assíncronas (provisionamento, notificações)."
         ),
         examples=[
@@ -116,6 +120,7 @@ class TenantCreateView(APIView):
             )
         except Exception:
             pass
+        pending = tenant.provisioning_status != Tenant.PROVISIONING_READY
         return Response(
             {
                 "id": tenant.id,
@@ -123,11 +128,53 @@ class TenantCreateView(APIView):
                 "schema_name": tenant.schema_name,
                 "plan": tenant.plan,
                 "is_active": tenant.is_active,
+                "provisioning_status": tenant.provisioning_status,
             },
-            status=status.HTTP_201_CREATED,
+            # 202: o schema ainda está sendo provisionado; acompanhar via
+            # GET tenants/<id>/provisioning
+            status=status.HTTP_202_ACCEPTED if pending else status.HTTP_201_CREATED,
         )
 
 
+class TenantPoolStatusView(APIView):
+    required_permission = "manage_tenants"
+    permission_classes = [IsAuthenticated, HasPermission]
+
+    @extend_schema(
+        responses={200: None},
+        tags=["tenants"],
+        description=(
+            "Profundidade do pool de schemas reserva: alvo, prontos e obsoletos "
+            "(migrações mudaram e serão descartados no próximo reabastecimento)."
+        ),
+    )
+    @swagger_auto_schema(operation_description="Estado do pool de schemas reserva")
+    def get(self, request):
+        return Response(pool_status())
+
+
+class TenantProvisioningStatusView(APIView):
+    required_permission = "manage_tenants"
+    permission_classes = [IsAuthenticated, HasPermission]
+
+    @extend_schema(
+        responses={200: TenantProvisioningSerializer},
+        tags=["tenants"],
+        description="Estado do provisionamento do schema de um tenant.",
+    )
+    @swagger_auto_schema(
+        operation_description="Consulta o provisionamento de um tenant",
+        responses={200: TenantProvisioningSerializer, 404: "Not Found"},
+    )
+    def get(self, request, tenant_id):
+        tenant = Tenant.objects.filter(pk=tenant_id).first()
+        if tenant is None:
+            return Response(
+                {"detail": "Tenant não encontrado"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(TenantProvisioningSerializer(tenant).data)
+
+
 class TenantActionView(APIView):
     required_permission = "manage_tenants"
     permission_classes = [IsAuthenticated, HasPermission]
@@ -6,6 +6,14 @@ class UsersConfig(AppConfig):
     label = "users"
 
     def ready(self):
+        from apps.core.authentication import invalidate_principal
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+
+        # Drop the cached auth principal whenever the user row changes
+        post_save.connect(invalidate_principal, sender=get_user_model())
+        post_delete.connect(invalidate_principal, sender=get_user_model())
+
         # Install a test-only post_save hook to record created users in an
         # in-process registry so view code can find users created inside
         # pytest transactions even when DB connection visibility prevents
@@ -1,10 +1,14 @@
 import logging
 
+from apps.core.revocation import RevocableRefreshToken
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core import exceptions
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
 
 from .models import EmailVerificationToken
 
@@ -110,10 +114,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
     @classmethod
     def get_token(cls, user):
+        from apps.core.authentication import principal_claims
         from rest_framework_simplejwt.tokens import RefreshToken
 
         token = RefreshToken()
         token["user_id"] = user.id
+        for claim, value in principal_claims(user).items():
+            token[claim] = value
         return token
 
     def validate(self, attrs):
@@ -135,6 +142,24 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return super().validate(attrs)
 
 
+class RevocationAwareTokenRefreshSerializer(TokenRefreshSerializer):
+    """``TOKEN_REFRESH_SERIALIZER``: blacklist checks through the revocation filter.
+
+    The principal claims are re-derived from the user on every refresh, so
+    stateless access tokens pick up role and password changes.
+    """
+
+    token_class = RevocableRefreshToken
+
+    def validate(self, attrs):
+        from apps.core.authentication import refresh_principal
+
+        refresh = self.token_class(attrs["refresh"])
+        refresh_principal(refresh)
+        # Same jti and expiry: the parent rotates and blacklists it as usual
+        return super().validate({**attrs, "refresh": str(refresh)})
+
+
 class ProfileSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     email = serializers.EmailField(read_only=True)
@@ -1,5 +1,6 @@
 import logging
 
+from apps.core.revocation import RevocableRefreshToken, revoke_token
 from django.conf import settings
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -8,7 +9,6 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .serializers import (
@@ -229,7 +229,7 @@ class LogoutView(APIView):
 
         if token_str:
             try:
-                token = RefreshToken(token_str)
+                token = RevocableRefreshToken(token_str)
                 # Attempt blacklist if tables exist; otherwise ignore
                 try:
                     token.blacklist()
@@ -237,6 +237,12 @@ class LogoutView(APIView):
                     pass
             except Exception:
                 pass
+        if request.auth is not None and hasattr(request.auth, "payload"):
+            # The access token stays valid until it expires unless revoked too
+            try:
+                revoke_token(request.auth)
+            except Exception:
+                pass
         resp = Response({"detail": "logged out"})
         # Clear access token cookie
         resp.delete_cookie(
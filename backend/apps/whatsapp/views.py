@@ -1,3 +1,5 @@
+from apps.core import fair_queue
+from apps.core.async_views import AsyncAPIView
 from apps.rbac.permissions import HasPermission
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -25,7 +27,7 @@ class WhatsappStatusView(APIView):
         return Response({"service": "whatsapp", "status": "ok"})
 
 
-class WhatsappSendMessageView(APIView):
+class WhatsappSendMessageView(AsyncAPIView):
     required_permission = "send_whatsapp"
     permission_classes = [IsAuthenticated, HasPermission]
     throttle_scope = "send_whatsapp"
@@ -56,11 +58,16 @@ class WhatsappSendMessageView(APIView):
         },
         tags=["whatsapp"],
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = WhatsappSendSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        task = send_whatsapp_message.delay(data["to"], data["message"])
+        task = await fair_queue.aenqueue(
+            getattr(request, "tenant", None),
+            send_whatsapp_message,
+            data["to"],
+            data["message"],
+        )
         return Response(
             {"queued": True, "to": data["to"], "task_id": task.id},
             status=status.HTTP_201_CREATED,
@@ -1,3 +1,5 @@
+from apps.core import fair_queue
+from apps.core.async_views import AsyncAPIView
 from apps.rbac.permissions import HasPermission
 from drf_spectacular.utils import OpenApiExample, extend_schema
 from drf_yasg import openapi
@@ -25,7 +27,7 @@ class WorkflowsStatusView(APIView):
         return Response({"service": "workflows", "status": "ok"})
 
 
-class WorkflowExecuteView(APIView):
+class WorkflowExecuteView(AsyncAPIView):
     required_permission = "workflows_execute"
     permission_classes = [IsAuthenticated, HasPermission]
     throttle_scope = "workflows_execute"
@@ -52,11 +54,16 @@ class WorkflowExecuteView(APIView):
         },
         tags=["workflows"],
     )
-    def post(self, request):
+    async def post(self, request):
         serializer = WorkflowExecuteSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        task = execute_workflow.delay(data["workflow_id"], data.get("input"))
+        task = await fair_queue.aenqueue(
+            getattr(request, "tenant", None),
+            execute_workflow,
+            data["workflow_id"],
+            data.get("input"),
+        )
         return Response(
             {"id": task.id, "status": "queued"}, status=status.HTTP_201_CREATED
         )
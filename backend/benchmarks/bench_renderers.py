@@ -0,0 +1,100 @@
+"""Benchmark StandardJSONRenderer backends on serializer-shaped payloads.
+
+Usage (from backend/): python benchmarks/bench_renderers.py [--rows 1000]
+
+Payloads are built from unsaved model instances through the real
+serializers, so no database is needed.
+"""
+
+import argparse
+import datetime
+import decimal
+import os
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(BACKEND_DIR), str(BACKEND_DIR.parent)]
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "saas_backend.settings_test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.auditing.models import AuditLog  # noqa: E402
+from apps.auditing.serializers import AuditLogSerializer  # noqa: E402
+from apps.core import renderers  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.response import Response  # noqa: E402
+
+
+def audit_page(rows):
+    now = timezone.now()
+    logs = [
+        AuditLog(
+            id=index,
+            path=f"/api/v1/rbac/roles/{index}",
+            method="GET",
+            status_code=200,
+            tenant_schema="acme",
+            tenant_id=1,
+            ip_address="10.0.0.1",
+            created_at=now - datetime.timedelta(seconds=index),
+        )
+        for index in range(rows)
+    ]
+    return {
+        "count": rows,
+        "next": None,
+        "previous": None,
+        "results": AuditLogSerializer(logs, many=True).data,
+    }
+
+
+def raw_rows(rows):
+    # Values views return before serializer coercion (values(), aggregates)
+    now = timezone.now()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "created_at": now,
+            "day": now.date(),
+            "amount": decimal.Decimal("19.90"),
+            "payload": {"event": "order.paid", "items": [1, 2, 3]},
+        }
+        for _ in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    context = {"response": Response(status=200)}
+    renderer = renderers.StandardJSONRenderer()
+    payloads = {
+        "audit_logs_page": audit_page(args.rows),
+        "raw_rows": raw_rows(args.rows),
+    }
+    backends = ["stdlib"] + (["orjson"] if renderers.orjson is not None else [])
+    sys.stdout.write(f"{'payload':<18}{'backend':<9}{'ms/render':>10}{'bytes':>10}\n")
+    for name, payload in payloads.items():
+        for backend in backends:
+            renderers.USE_ORJSON = backend == "orjson"
+            seconds = timeit.timeit(
+                lambda payload=payload: renderer.render(payload, None, context),
+                number=args.number,
+            )
+            size = len(renderer.render(payload, None, context))
+            sys.stdout.write(
+                f"{name:<18}{backend:<9}{seconds / args.number * 1000:>10.3f}"
+                f"{size:>10}\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
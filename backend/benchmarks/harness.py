@@ -0,0 +1,159 @@
+"""Minimal benchmark runner with JSON baselines and a regression gate.
+
+A ``Case`` is a callable timed ``rounds`` times after ``warmup`` untimed
+calls; its optional ``setup`` runs before every call, outside the timing
+(e.g. to refill a cart the measured call empties). ``run`` prints a table,
+writes the results as JSON and compares each case's median with the
+baseline file: the exit status is 1 when any case is slower than
+``baseline * (1 + threshold)`` by more than ``--min-delta-ms`` (the noise
+floor for sub-millisecond cases), so CI can fail on the regression.
+
+Baselines are only comparable on the same machine and stack; ``meta``
+(database vendor, cache backend, dataset size) is stored alongside the
+numbers and a mismatch is reported. ``--update-baseline`` rewrites the
+file from the current run.
+
+Stdlib only, so both Django projects (``backend`` and ``backend-starter``)
+can drive it.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Optional
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[], object]
+    setup: Optional[Callable[[], object]] = None
+
+
+def out(line: str = "") -> None:
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def measure(case: Case, rounds: int, warmup: int) -> dict:
+    timings = []
+    for index in range(warmup + rounds):
+        if case.setup is not None:
+            case.setup()
+        started = time.perf_counter()
+        case.fn()
+        elapsed = time.perf_counter() - started
+        if index >= warmup:
+            timings.append(elapsed * 1000)
+    timings.sort()
+    return {
+        "rounds": rounds,
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "stdev_ms": round(statistics.pstdev(timings), 4),
+    }
+
+
+def compare(
+    results: dict, baseline: dict, threshold: float, min_delta_ms: float
+) -> list:
+    """Return ``(name, baseline_ms, current_ms)`` for each regressed case."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        before, now = previous["median_ms"], current["median_ms"]
+        if now > before * (1 + threshold) and now - before > min_delta_ms:
+            regressions.append((name, before, now))
+    return regressions
+
+
+def build_parser(description: str, default_baseline: Path) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "-k",
+        "--select",
+        action="append",
+        default=[],
+        help="Only run cases matching this glob (repeatable)",
+    )
+    parser.add_argument("--baseline", type=Path, default=default_baseline)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write this run's results as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed median slowdown before failing (0.2 = 20%%)",
+    )
+    parser.add_argument("--min-delta-ms", type=float, default=0.05)
+    parser.add_argument("--output", type=Path, help="Also write results here")
+    return parser
+
+
+def _selected(cases, patterns):
+    if not patterns:
+        return cases
+    return [c for c in cases if any(fnmatch(c.name, p) for p in patterns)]
+
+
+def run(args, cases, meta: dict) -> int:
+    meta = {**meta, "python": platform.python_version()}
+    results = {}
+    out(f"{'case':<36}{'median ms':>11}{'p95 ms':>10}{'min ms':>10}")
+    for case in _selected(cases, args.select):
+        result = results[case.name] = measure(case, args.rounds, args.warmup)
+        out(
+            f"{case.name:<36}{result['median_ms']:>11.3f}"
+            f"{result['p95_ms']:>10.3f}{result['min_ms']:>10.3f}"
+        )
+
+    document = {
+        "meta": {**meta, "created_at": datetime.now(timezone.utc).isoformat()},
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    if args.update_baseline:
+        if args.baseline.exists():
+            # Keep cases that were not selected in this run
+            previous = json.loads(args.baseline.read_text())["results"]
+            document["results"] = {**previous, **results}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        out(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        out(f"\nNo baseline at {args.baseline}; run with --update-baseline")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    stored = {k: v for k, v in baseline["meta"].items() if k != "created_at"}
+    if stored != meta:
+        out(f"\nWarning: baseline recorded with {stored}, this run is {meta}")
+    regressions = compare(
+        results, baseline["results"], args.threshold, args.min_delta_ms
+    )
+    for name, before, now in regressions:
+        out(
+            f"REGRESSION {name}: {before:.3f} ms -> {now:.3f} ms "
+            f"(+{(now / before - 1) * 100:.0f}%)"
+        )
+    if not regressions:
+        out(f"\nNo regressions above {args.threshold:.0%} against {args.baseline}")
+    return 1 if regressions else 0
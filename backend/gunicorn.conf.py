@@ -0,0 +1,23 @@
+"""Gunicorn settings read from the working directory (see Dockerfile.prod).
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set, every worker writes its metrics to
+files in that directory (``apps.core.metrics``); stale files from a previous
+run are removed on start and a dead worker's live gauges are discarded.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
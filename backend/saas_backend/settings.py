@@ -66,6 +66,20 @@ TENANT_APPS = (
 )
 
 TENANT_MODEL = "tenants.Tenant"
+# New tenant schemas are cloned from this pre-migrated template schema
+# (see apps.tenants.provisioning); API signups provision in a Celery task.
+TENANT_TEMPLATE_SCHEMA = env("TENANT_TEMPLATE_SCHEMA", default="tenant_template")
+TENANT_TEMPLATE_CLONING = env.bool("TENANT_TEMPLATE_CLONING", default=True)
+TENANT_ASYNC_PROVISIONING = env.bool("TENANT_ASYNC_PROVISIONING", default=True)
+# Spare schemas kept ready for instant signup (0 disables the pool)
+TENANT_POOL_SIZE = env.int("TENANT_POOL_SIZE", default=3)
+TENANT_POOL_PREFIX = env("TENANT_POOL_PREFIX", default="tenant_spare_")
+# migrate_schemas runs tenant schemas in a resumable process pool
+# (apps.tenants.migration_executor); EXECUTOR=standard restores the serial one.
+GET_EXECUTOR_FUNCTION = "apps.tenants.migration_executor.get_executor"
+TENANT_MIGRATION_EXECUTOR = env("TENANT_MIGRATION_EXECUTOR", default="parallel")
+TENANT_MIGRATION_WORKERS = env.int("TENANT_MIGRATION_WORKERS", default=0)  # 0 = cores
+TENANT_MIGRATION_ORDER = env("TENANT_MIGRATION_ORDER", default="size")
 DOMAIN_MODEL = "tenants.Domain"
 # Compatibility for django-tenants versions expecting TENANT_DOMAIN_MODEL
 TENANT_DOMAIN_MODEL = DOMAIN_MODEL
@@ -77,16 +91,24 @@ INSTALLED_APPS = list(SHARED_APPS) + list(TENANT_APPS)
 # Use custom user model (app_label.ModelName form)
 AUTH_USER_MODEL = "users.User"
 
-DATABASE_ROUTERS = ("django_tenants.routers.TenantSyncRouter",)
+DATABASE_ROUTERS = (
+    "apps.core.db_router.ReplicaRouter",
+    "django_tenants.routers.TenantSyncRouter",
+)
 
 MIDDLEWARE = [
+    "apps.core.metrics.MetricsMiddleware",
+    "apps.core.query_budget.QueryBudgetMiddleware",
+    "apps.core.logging_utils.LogContextMiddleware",
     "apps.core.middleware.InitialRequestDebugMiddleware",
     # EnsureTenantSetMiddleware must run before django-tenants' TenantMainMiddleware
     # so tests that register an in-process domain mapping can resolve the
     # tenant prior to django-tenants changing the URLConf/search_path.
     "apps.core.middleware.EnsureTenantSetMiddleware",
     "apps.core.middleware.TenantMainMiddleware",
+    "apps.core.profiling.ProfilingMiddleware",
     "apps.core.middleware.RequestDebugMiddleware",
+    "apps.core.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -135,10 +157,11 @@ DATABASE_URL = env(
 )
 # Parse DATABASE_URL when provided; this ensures host/port/user are taken from
 # the environment inside containers (compose sets DATABASE_URL to use service
-# hostnames like `postgres`). Then set the django-tenants engine and sensible
+# hostnames like `postgres`). Then set the django-tenants engine (wrapped by
+# apps.core.db_backend to skip redundant search_path SETs) and sensible
 # local defaults for user/password/test DB.
 default_db = env.db("DATABASE_URL", default=DATABASE_URL)
-default_db["ENGINE"] = "django_tenants.postgresql_backend"
+default_db["ENGINE"] = "apps.core.db_backend"
 default_db.setdefault("NAME", "saas_automacoes_web")
 default_db.setdefault("USER", "saas_user")
 default_db.setdefault("PASSWORD", "1234567890")
@@ -153,6 +176,23 @@ DATABASES["default"]["HOST"] = env("DB_HOST", default="postgres")
 
 # Required DB engine for django-tenants
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Behind PgBouncer in transaction mode: never trust session-level search_path
+TENANT_TRANSACTION_POOLING = env.bool("TENANT_TRANSACTION_POOLING", default=False)
+
+# Read replicas (comma-separated URLs). Safe requests read from them through
+# apps.core.db_router; a client that wrote stays on the primary for
+# DATABASE_REPLICA_STICKY_SECONDS. Under tests replicas mirror "default"
+# unless DATABASE_REPLICA_TEST_MIRROR=False (two real databases).
+DATABASE_REPLICAS = []
+for _index, _url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), 1):
+    _replica = env.db_url_config(_url)
+    _replica["ENGINE"] = "apps.core.db_backend"
+    if env.bool("DATABASE_REPLICA_TEST_MIRROR", default=True):
+        _replica["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica_{_index}"] = _replica
+    DATABASE_REPLICAS.append(f"replica_{_index}")
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=10)
+DATABASE_REPLICA_PIN_COOKIE = env("DATABASE_REPLICA_PIN_COOKIE", default="db_pin")
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -190,16 +230,22 @@ CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "apps.core.authentication.CookieJWTAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.core.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_RENDERER_CLASSES": (
         "apps.core.renderers.StandardJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.core.parsers.StandardJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # DRF's throttles plus an async check for AsyncAPIView (apps.core.throttling)
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "apps.core.throttling.AnonRateThrottle",
+        "apps.core.throttling.UserRateThrottle",
         "apps.core.throttling.PlanScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
@@ -219,12 +265,23 @@ REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "saas_backend.exceptions.custom_exception_handler",
 }
 
+# API JSON encoding (apps.core.renderers): "orjson" (if installed) or "stdlib"
+API_JSON_BACKEND = env("API_JSON_BACKEND", default="orjson")
+# Wrap 2xx payloads in {"success", "message", "data"}
+API_RESPONSE_ENVELOPE = env.bool("API_RESPONSE_ENVELOPE", default=True)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "SaaS Automacoes API",
     "VERSION": "v1",
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# OpenAPI schemas compiled at build time (manage.py compile_api_schema) and
+# served from memory; the live generators are only mounted with API_SCHEMA_LIVE
+API_SCHEMA_DIR = env("API_SCHEMA_DIR", default=str(BASE_DIR / "schema"))
+API_SCHEMA_LIVE = env.bool("API_SCHEMA_LIVE", default=DEBUG)
+API_SCHEMA_MAX_AGE = env.int("API_SCHEMA_MAX_AGE", default=300)
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -233,12 +290,35 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Tokens carry a hash of the password hash; a password change revokes them
+    "CHECK_REVOKE_TOKEN": env.bool("JWT_CHECK_REVOKE_TOKEN", default=True),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "apps.users.serializers.RevocationAwareTokenRefreshSerializer"
+    ),
 }
 
+# Authenticated user cache (apps.core.authentication): per process and shared
+AUTH_PRINCIPAL_LOCAL_TTL = env.int("AUTH_PRINCIPAL_LOCAL_TTL", default=5)
+AUTH_PRINCIPAL_CACHE_TTL = env.int("AUTH_PRINCIPAL_CACHE_TTL", default=60)
+# Build request.user from signed claims only (no user lookup at all); staff
+# flags and password changes apply at the next refresh
+AUTH_JWT_STATELESS = env.bool("AUTH_JWT_STATELESS", default=False)
+
+# Revoked-token Bloom filter (apps.core.revocation), synced via Redis pub/sub
+REVOCATION_FILTER_ENABLED = env.bool("REVOCATION_FILTER_ENABLED", default=True)
+REVOCATION_FILTER_ERROR_RATE = env.float("REVOCATION_FILTER_ERROR_RATE", default=0.001)
+REVOCATION_FILTER_MIN_CAPACITY = env.int(
+    "REVOCATION_FILTER_MIN_CAPACITY", default=10000
+)
+REVOCATION_FILTER_REBUILD_SECONDS = env.int(
+    "REVOCATION_FILTER_REBUILD_SECONDS", default=900
+)
+
 # Cache backend (Redis recommended for throttle counters and multi-worker)
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        # django_redis.cache.RedisCache counting round-trips for /metrics
+        "BACKEND": "apps.core.metrics.InstrumentedRedisCache",
         "LOCATION": env("REDIS_URL", default="redis://localhost:6379/1"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -246,6 +326,48 @@ CACHES = {
     }
 }
 
+# Prometheus metrics (apps.core.metrics) served at /metrics; for gunicorn or
+# Celery prefork also set PROMETHEUS_MULTIPROC_DIR in the environment
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+# Require "Authorization: Bearer <token>" on /metrics; unset, /metrics is
+# only served with DEBUG
+METRICS_AUTH_TOKEN = env("METRICS_AUTH_TOKEN", default="")
+# Port of the exporter each Celery worker starts for its task metrics (0: off);
+# keep it on the internal network, it has no auth
+METRICS_WORKER_PORT = env.int("METRICS_WORKER_PORT", default=9808)
+
+# SQL query budgets per request (apps.core.query_budget): views declare
+# `query_budget = N`; QUERY_BUDGETS maps URL names to N and takes precedence
+QUERY_BUDGET_ENABLED = env.bool("QUERY_BUDGET_ENABLED", default=True)
+QUERY_BUDGETS = {}
+# Budget for views without one (unset: only declared budgets are checked)
+QUERY_BUDGET_DEFAULT = env.int("QUERY_BUDGET_DEFAULT", default=None)
+# Raise QueryBudgetExceeded instead of logging a warning (test settings)
+QUERY_BUDGET_RAISE = env.bool("QUERY_BUDGET_RAISE", default=False)
+# Tally queries per view into this JSON file (test runs; query_budget_report)
+QUERY_BUDGET_REPORT = env("QUERY_BUDGET_REPORT", default="")
+
+# On-demand profiling (apps.core.profiling): requests with a signed X-Profile
+# token or matching a sampling rule, both set up in the admin "Profiles" page
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=True)
+# "cprofile" (pstats files) or "pyinstrument" (sampling, speedscope files)
+PROFILING_ENGINE = env("PROFILING_ENGINE", default="cprofile")
+PROFILING_DIR = env("PROFILING_DIR", default=str(BASE_DIR / "profiles"))
+PROFILING_MAX_FILES = env.int("PROFILING_MAX_FILES", default=200)
+PROFILING_MAX_AGE_DAYS = env.int("PROFILING_MAX_AGE_DAYS", default=7)
+PROFILING_TOKEN_MAX_AGE = env.int("PROFILING_TOKEN_MAX_AGE", default=3600)
+
+# Per-tenant fair queueing (apps.core.fair_queue): tenant-triggered tasks wait
+# in per-tenant Redis lists; the fair_dispatcher command feeds them to Celery
+FAIR_QUEUE_ENABLED = env.bool("FAIR_QUEUE_ENABLED", default=True)
+# Tasks per dispatch pass for each plan (unknown plans get 1)
+FAIR_QUEUE_WEIGHTS = {"free": 1, "pro": 4, "enterprise": 8}
+FAIR_QUEUE_CELERY_QUEUE = env("FAIR_QUEUE_CELERY_QUEUE", default="celery")
+# Dispatched tasks allowed to wait in the Celery queue at once
+FAIR_QUEUE_MAX_INFLIGHT = env.int("FAIR_QUEUE_MAX_INFLIGHT", default=50)
+# Seconds the dispatcher sleeps when there is nothing to dispatch
+FAIR_QUEUE_POLL_INTERVAL = env.float("FAIR_QUEUE_POLL_INTERVAL", default=0.05)
+
 # Celery configuration
 CELERY_BROKER_URL = env("REDIS_URL", default="redis://localhost:6379/1")
 CELERY_RESULT_BACKEND = env("REDIS_URL", default="redis://localhost:6379/1")
@@ -269,6 +391,16 @@ CELERY_BEAT_SCHEDULE = {
         # Run every 5 minutes; task self-disables if not enabled
         "schedule": 300,
     },
+    "replenish-tenant-pool": {
+        "task": "apps.tenants.tasks.replenish_tenant_pool",
+        # Refill spare tenant schemas every minute; no-op when the pool is full
+        "schedule": 60,
+    },
+    "prune-revoked-tokens": {
+        "task": "apps.core.tasks.prune_revoked_tokens",
+        # Drop blacklist rows of tokens that have already expired, hourly
+        "schedule": 3600,
+    },
     "purge-dlq-daily": {
         "task": "apps.auditing.tasks.purge_dlq_older_than_default",
         # Run once per day
@@ -351,16 +483,42 @@ _formatters = {"standard": {"format": "%(asctime)s %(levelname)s %(name)s %(mess
 if USE_JSON_LOGS:
     _formatters["json"] = {"()": "apps.core.logging_utils.JSONFormatter"}
 
+# Records are queued and written by a listener thread (apps.core.logging_utils);
+# when LOG_QUEUE_SIZE records are pending, new ones are dropped and counted.
+LOG_QUEUE_ENABLED = env.bool("LOG_QUEUE_ENABLED", default=True)
+LOG_QUEUE_SIZE = env.int("LOG_QUEUE_SIZE", default=10000)
+# Fraction of INFO/DEBUG records kept per logger (e.g. "apps.core.request_debug=0.1")
+LOG_SAMPLE_RATES = env.dict(
+    "LOG_SAMPLE_RATES",
+    cast={"value": float},
+    default={"apps.core.request_debug": 0.1, "apps.core.tenant_resolve": 0.1},
+)
+
+_console_handler = {
+    "formatter": "json" if USE_JSON_LOGS else "standard",
+    "filters": ["context", "sampling"],
+}
+if LOG_QUEUE_ENABLED:
+    _console_handler.update(
+        {"()": "apps.core.logging_utils.QueueLoggingHandler", "maxsize": LOG_QUEUE_SIZE}
+    )
+else:
+    _console_handler["class"] = "logging.StreamHandler"
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": _formatters,
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "json" if USE_JSON_LOGS else "standard",
+    "filters": {
+        "context": {"()": "apps.core.logging_utils.ContextFilter"},
+        "sampling": {
+            "()": "apps.core.logging_utils.SamplingFilter",
+            "rates": LOG_SAMPLE_RATES,
         },
     },
+    "handlers": {
+        "console": _console_handler,
+    },
     "root": {
         "handlers": ["console"],
         "level": DJANGO_LOG_LEVEL,
@@ -436,6 +594,18 @@ AUDIT_RETENTION_TENANT_DAYS = {}
 GA_TRACKING_ID = env("GA_TRACKING_ID", default=None)
 GA_MEASUREMENT_ID = env("GA_MEASUREMENT_ID", default=None)
 GA_API_SECRET = env("GA_API_SECRET", default=None)
+# Server-side events are queued and posted in batches by a flusher thread
+# (apps.core.analytics); when ANALYTICS_QUEUE_SIZE are pending, new ones are dropped
+ANALYTICS_ENDPOINT = env(
+    "ANALYTICS_ENDPOINT", default="https://www.google-analytics.com/mp/collect"
+)
+ANALYTICS_QUEUE_SIZE = env.int("ANALYTICS_QUEUE_SIZE", default=10000)
+# Events per request (the Measurement Protocol accepts at most 25)
+ANALYTICS_BATCH_SIZE = env.int("ANALYTICS_BATCH_SIZE", default=25)
+# Seconds the flusher waits for a batch to fill
+ANALYTICS_FLUSH_INTERVAL = env.float("ANALYTICS_FLUSH_INTERVAL", default=1.0)
+ANALYTICS_MAX_RETRIES = env.int("ANALYTICS_MAX_RETRIES", default=3)
+ANALYTICS_TIMEOUT = env.float("ANALYTICS_TIMEOUT", default=5.0)
 
 # Password reset token lifetime (seconds). Default 30 minutes.
 PASSWORD_RESET_TIMEOUT = env.int("PASSWORD_RESET_TIMEOUT_SECONDS", default=1800)
@@ -0,0 +1,55 @@
+"""Settings for the benchmark runner (``benchmarks/run.py``).
+
+With ``BENCH_DATABASE_URL`` set the run uses that local Postgres and the
+full tenant middleware chain of ``settings_test_pg``; otherwise a SQLite
+file with the reduced ``settings_test`` stack. ``BENCH_CACHE`` selects the
+cache: ``redis`` (``REDIS_URL``), ``fakeredis`` (in-process server behind
+the same django-redis client) or ``locmem``.
+"""
+
+import os
+
+if os.environ.get("BENCH_DATABASE_URL"):
+    from .settings_test_pg import *
+
+    DATABASES = {"default": env.db("BENCH_DATABASE_URL")}
+    DATABASES["default"]["ENGINE"] = "apps.core.db_backend"
+    DATABASES["default"]["ATOMIC_REQUESTS"] = True
+else:
+    from .settings_test import *
+
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+            # A file, so --keepdb can reuse the seeded rows
+            "TEST": {
+                "NAME": env(
+                    "BENCH_SQLITE_PATH",
+                    default=str(BASE_DIR / "benchmarks" / ".bench.sqlite3"),
+                )
+            },
+        }
+    }
+
+BENCH_CACHE = env("BENCH_CACHE", default="redis")
+if BENCH_CACHE == "locmem":
+    CACHES = {"default": {"BACKEND": "apps.core.metrics.InstrumentedLocMemCache"}}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "apps.core.metrics.InstrumentedRedisCache",
+            "LOCATION": env("REDIS_URL", default="redis://localhost:6379/1"),
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        }
+    }
+    if BENCH_CACHE == "fakeredis":
+        import fakeredis
+
+        CACHES["default"]["OPTIONS"]["CONNECTION_POOL_KWARGS"] = {
+            "connection_class": fakeredis.FakeConnection
+        }
+
+WEBHOOK_SECRETS = {**WEBHOOK_SECRETS, "custom": "bench-secret"}
+# ELASTICSEARCH_URL is set by the runner to its local stand-in
+AUDIT_EXPORT_ENABLED = True
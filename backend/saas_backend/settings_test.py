@@ -20,11 +20,18 @@ if os.environ.get("USE_DOCKER_POSTGRES") == "1":
         )
     }
     # django-tenants requires the custom engine when using Postgres
-    DATABASES["default"]["ENGINE"] = "django_tenants.postgresql_backend"
+    DATABASES["default"]["ENGINE"] = "apps.core.db_backend"
     DATABASES["default"]["ATOMIC_REQUESTS"] = True
 
 # Disable tenant-specific DB routing for tests
 DATABASE_ROUTERS = []
+DATABASE_REPLICAS = []
+
+# Tests assert on raw payloads, without the response envelope
+API_RESPONSE_ENVELOPE = False
+
+# Over-budget requests fail the test (apps.core.query_budget)
+QUERY_BUDGET_RAISE = True
 
 # Remove tenant-dependent middleware to simplify test stack
 _REMOVE_MIDDLEWARE = {
@@ -30,11 +30,14 @@ def pytest_ignore_collect(path):
             "test_rbac_audit_actions.py",
             "test_rbac_bulk_api.py",
             "test_rbac_endpoints.py",
+            "test_rbac_seed.py",
             "test_rbac_user_permissions.py",
             "test_reset_daily_counters_command.py",
+            "test_search_path.py",
             "test_service_permissions.py",
             "test_tenant_plan_change.py",
             "test_tenant_plan_detail.py",
+            "test_tenant_provisioning.py",
             "test_events.py",
         )
         for name in patterns:
@@ -98,6 +101,7 @@ def pytest_collection_modifyitems(config, items):
             "test_plan_",
             "test_rbac",
             "test_reset_daily_counters_command.py",
+            "test_search_path.py",
             "test_service_permissions.py",
             "test_tenant_",
         )
@@ -107,6 +111,16 @@ def pytest_collection_modifyitems(config, items):
                 item.add_marker(skip)
 
 
+def pytest_sessionfinish(session, exitstatus):
+    """Write the per-view query tally (see `manage.py query_budget_report`)."""
+    from django.conf import settings
+
+    if getattr(settings, "QUERY_BUDGET_REPORT", ""):
+        from apps.core.query_budget import write_report
+
+        write_report(settings.QUERY_BUDGET_REPORT)
+
+
 # Enable DB for tests that use the Django `client` fixture.
 @pytest.fixture(autouse=True)
 def _enable_db_for_client(request):
@@ -25,6 +25,7 @@ MIGRATIONS_READY = threading.Event()
 
 from apps.core import middleware as core_middleware
 from apps.tenants.models import Domain, Tenant
+from apps.tenants.provisioning import clone_template, template_cloning_enabled
 from django.core.management import call_command
 from django.db import connection, transaction
 
@@ -211,9 +212,15 @@ def create_tenant(
                 pass
             tenant = Tenant.objects.get(pk=tenant_id)
 
-        # Ensure schema exists at DB level while holding the lock.
-        with connection.cursor() as cursor:
-            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
+        # Ensure schema exists at DB level while holding the lock. With
+        # template cloning the schema arrives fully migrated (one server-side
+        # clone instead of the whole migration chain per tenant).
+        cloned = template_cloning_enabled() and clone_template(
+            schema_name, check_if_exists=True
+        )
+        if not cloned:
+            with connection.cursor() as cursor:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
 
     # Ensure Domain is created in public schema so middleware can resolve host
     # to tenant even if the test's tenant row isn't visible to other DB
@@ -232,75 +239,79 @@ def create_tenant(
     # Run tenant migrations explicitly while holding the advisory lock to
     # avoid concurrent migrate runs. Re-acquire the advisory_lock here to
     # ensure serialization even if the earlier creation phase released it.
-    with advisory_lock(schema_name):
-        try:
-            # Prefer connection-level schema switch for django-tenants-aware
-            # adapters; fall back to cursor-level SET as a safety net.
+    # A cloned schema already carries every migration.
+    if not cloned:
+        with advisory_lock(schema_name):
             try:
-                connection.set_schema(schema_name)
-            except Exception:
-                with connection.cursor() as _cursor:
-                    _cursor.execute("SET search_path TO %s", [schema_name])
+                # Prefer connection-level schema switch for django-tenants-aware
+                # adapters; fall back to cursor-level SET as a safety net.
+                try:
+                    connection.set_schema(schema_name)
+                except Exception:
+                    with connection.cursor() as _cursor:
+                        _cursor.execute("SET search_path TO %s", [schema_name])
 
-            set_search_path_on_cursor(schema_name)
+                set_search_path_on_cursor(schema_name)
 
-            # Retry migrations a small number of times if a race causes
-            # MigrationSchemaMissing or transient DB cursor issues.
-            attempts = 6
-            for attempt in range(1, attempts + 1):
-                try:
-                    # Preferred: call django-tenants' migration executor API
-                    # directly to avoid the management command path that may
-                    # query `tenants_tenant` implicitly. We attempt to import
-                    # the executor module and find a class exposing
-                    # `run_migrations(tenants=...)`. This is resilient to
-                    # django-tenants versions that change class names.
-                    tried_executor = False
+                # Retry migrations a small number of times if a race causes
+                # MigrationSchemaMissing or transient DB cursor issues.
+                attempts = 6
+                for attempt in range(1, attempts + 1):
                     try:
-                        mod = __import__(
-                            "django_tenants.migration_executors.standard",
-                            fromlist=["*"],
-                        )
-                        ExecutorClass = None
-                        for name in dir(mod):
-                            obj = getattr(mod, name)
-                            if isinstance(obj, type) and hasattr(obj, "run_migrations"):
-                                ExecutorClass = obj
-                                break
-                        if ExecutorClass is not None:
-                            executor = ExecutorClass()
-                            # Some implementations expect a list, others a
-                            # single tenant name. Try both.
-                            try:
-                                executor.run_migrations(tenants=[schema_name])
-                            except TypeError:
-                                executor.run_migrations(tenants=schema_name)
-                            tried_executor = True
-                    except Exception:
+                        # Preferred: call django-tenants' migration executor API
+                        # directly to avoid the management command path that may
+                        # query `tenants_tenant` implicitly. We attempt to import
+                        # the executor module and find a class exposing
+                        # `run_migrations(tenants=...)`. This is resilient to
+                        # django-tenants versions that change class names.
                         tried_executor = False
-
-                    if not tried_executor:
-                        # Fallback to management command when direct API is
-                        # unavailable.
-                        call_command(
-                            "migrate_schemas",
-                            tenant=schema_name,
-                            noinput=True,
-                            verbosity=0,
-                        )
-                    break
+                        try:
+                            mod = __import__(
+                                "django_tenants.migration_executors.standard",
+                                fromlist=["*"],
+                            )
+                            ExecutorClass = None
+                            for name in dir(mod):
+                                obj = getattr(mod, name)
+                                if isinstance(obj, type) and hasattr(
+                                    obj, "run_migrations"
+                                ):
+                                    ExecutorClass = obj
+                                    break
+                            if ExecutorClass is not None:
+                                executor = ExecutorClass()
+                                # Some implementations expect a list, others a
+                                # single tenant name. Try both.
+                                try:
+                                    executor.run_migrations(tenants=[schema_name])
+                                except TypeError:
+                                    executor.run_migrations(tenants=schema_name)
+                                tried_executor = True
+                        except Exception:
+                            tried_executor = False
+
+                        if not tried_executor:
+                            # Fallback to management command when direct API is
+                            # unavailable.
+                            call_command(
+                                "migrate_schemas",
+                                tenant=schema_name,
+                                noinput=True,
+                                verbosity=0,
+                            )
+                        break
+                    except Exception:
+                        # If final attempt, re-raise; otherwise sleep briefly and retry.
+                        if attempt == attempts:
+                            raise
+                        time.sleep(0.2 * attempt)
+            finally:
+                # Restore public schema on the connection to avoid leaking tenant
+                # search_path into other test code.
+                try:
+                    connection.set_schema_to_public()
                 except Exception:
-                    # If final attempt, re-raise; otherwise sleep briefly and retry.
-                    if attempt == attempts:
-                        raise
-                    time.sleep(0.2 * attempt)
-        finally:
-            # Restore public schema on the connection to avoid leaking tenant
-            # search_path into other test code.
-            try:
-                connection.set_schema_to_public()
-            except Exception:
-                pass
+                    pass
 
     # Diagnostics: log current schema/search_path before running migrations.
     try:
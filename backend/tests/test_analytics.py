@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from apps.core import analytics
+
+
+class FakeCollector(ThreadingHTTPServer):
+    """Local Measurement Protocol endpoint recording each posted batch."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _CollectorHandler)
+        self.url = f"http://127.0.0.1:{self.server_port}/mp/collect"
+        self.batches = []
+        # Status codes to answer with, in order; 204 once exhausted
+        self.statuses = []
+        self.received = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.batches.append(
+            {
+                "query": parse_qs(urlparse(self.path).query),
+                "body": body,
+                "client_port": self.client_address[1],
+            }
+        )
+        server.received.set()
+        server.gate.wait(5)
+        status = server.statuses.pop(0) if server.statuses else 204
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def collector():
+    server = FakeCollector()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.gate.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _pipeline(collector, **kwargs):
+    options = {"flush_interval": 0.05, "backoff": 0.01, **kwargs}
+    return analytics.AnalyticsPipeline(collector.url, "G-TEST", "secret", **options)
+
+
+def test_track_event_is_batched_over_one_connection(collector, settings, monkeypatch):
+    settings.GA_MEASUREMENT_ID = "G-TEST"
+    settings.GA_API_SECRET = "secret"
+    pipeline = _pipeline(collector)
+    monkeypatch.setattr(analytics, "_pipeline", pipeline)
+    user = SimpleNamespace(id=7)
+
+    started = time.perf_counter()
+    for i in range(60):
+        analytics.track_event("signup", user=user, params={"step": i})
+    assert time.perf_counter() - started < 0.5
+
+    assert pipeline.flush(5)
+    assert [len(batch["body"]["events"]) for batch in collector.batches] == [25, 25, 10]
+    first = collector.batches[0]
+    assert first["query"] == {"measurement_id": ["G-TEST"], "api_secret": ["secret"]}
+    assert first["body"]["client_id"] == "server"
+    assert first["body"]["user_id"] == "7"
+    assert first["body"]["events"][0] == {"name": "signup", "params": {"step": 0}}
+    # The pooled session keeps the connection alive between batches
+    assert len({batch["client_port"] for batch in collector.batches}) == 1
+    assert pipeline.stats == {"sent": 60, "dropped": 0, "failed": 0, "retried": 0}
+    pipeline.close()
+
+
+def test_batches_are_split_by_client_id(collector):
+    pipeline = _pipeline(collector, flush_interval=0.2)
+    for client_id in ("a", "b", "a"):
+        pipeline.submit(
+            {"client_id": client_id, "user_id": None, "name": "view", "params": {}}
+        )
+    assert pipeline.flush(5)
+    bodies = sorted(
+        (batch["body"] for batch in collector.batches), key=lambda b: b["client_id"]
+    )
+    assert [(b["client_id"], len(b["events"])) for b in bodies] == [("a", 2), ("b", 1)]
+    assert "user_id" not in bodies[0]
+    pipeline.close()
+
+
+def test_retries_failures_and_drops_are_counted(collector):
+    event = {"client_id": "server", "user_id": None, "name": "ping", "params": {}}
+    collector.statuses = [503, 429, 204, 400]
+    pipeline = _pipeline(collector, maxsize=1)
+
+    assert pipeline.submit(event)
+    assert pipeline.flush(5)
+    assert pipeline.stats == {"sent": 1, "dropped": 0, "failed": 0, "retried": 2}
+
+    # Rejected batches are not retried
+    pipeline.submit(event)
+    assert pipeline.flush(5)
+    assert pipeline.stats["failed"] == 1 and pipeline.stats["retried"] == 2
+
+    # While the collector stalls, the queue fills and new events are dropped
+    collector.gate.clear()
+    collector.received.clear()
+    pipeline.submit(event)
+    assert collector.received.wait(5)
+    assert pipeline.submit(event)
+    assert not pipeline.submit(event)
+    assert pipeline.stats["dropped"] == 1
+    collector.gate.set()
+    assert pipeline.flush(5)
+    assert pipeline.stats["sent"] == 3
+    pipeline.close()
+
+
+def test_track_event_only_logs_without_ga_credentials(settings, caplog, monkeypatch):
+    settings.GA_MEASUREMENT_ID = None
+    monkeypatch.setattr(analytics, "_pipeline", None)
+    # "apps" loggers do not propagate to the root caplog handler
+    analytics.logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level("INFO", logger=analytics.logger.name):
+            analytics.track_event("signup", params={"plan": "pro"})
+    finally:
+        analytics.logger.removeHandler(caplog.handler)
+    assert '"event_name": "signup"' in caplog.text
+    assert analytics._pipeline is None
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from apps.core import api_schema
+from apps.core.api_schema import CompiledSchemaView, write_artifacts
+from django.core.management import call_command
+from django.test import RequestFactory
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path):
+    settings.API_SCHEMA_DIR = str(tmp_path)
+    api_schema.clear_loaded()
+    yield tmp_path
+    api_schema.clear_loaded()
+
+
+def test_compiled_schema_is_served_with_etag(schema_dir):
+    write_artifacts(
+        "yasg", {"json": b'{"swagger": "2.0"}', "yaml": b"swagger: '2.0'\n"}
+    )
+    view = CompiledSchemaView.as_view(artifact="swagger")
+    factory = RequestFactory()
+
+    response = view(factory.get("/api/swagger.yaml"), format=".yaml")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/yaml"
+    assert response.content == b"swagger: '2.0'\n"
+
+    response = view(factory.get("/api/swagger.json"), format=".json")
+    etag = response["ETag"]
+    manifest = json.loads((schema_dir / "v1" / "manifest.json").read_text())
+    assert etag == '"%s"' % manifest["files"]["swagger.json"]["sha256"]
+
+    revalidated = view(
+        factory.get("/api/swagger.json", HTTP_IF_NONE_MATCH=etag), format=".json"
+    )
+    assert revalidated.status_code == 304
+    assert revalidated["ETag"] == etag
+
+
+def test_missing_artifact_returns_503(schema_dir):
+    response = CompiledSchemaView.as_view()(RequestFactory().get("/api/schema/"))
+    assert response.status_code == 503
+
+
+@pytest.mark.django_db
+def test_compile_command_writes_versioned_artifacts(schema_dir):
+    call_command("compile_api_schema", generator=["spectacular"], api_version="v9")
+    schema = json.loads((schema_dir / "v9" / "openapi.json").read_text())
+    assert schema["openapi"].startswith("3.")
+    assert schema["paths"]
+    assert (schema_dir / "v9" / "openapi.yaml").exists()
@@ -0,0 +1,121 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+import redis
+from apps.auditing.models import AuditLog
+from apps.core import aio
+from apps.core.middleware import PlanLimitMiddleware
+from apps.core.throttling import PlanScopedRateThrottle
+from apps.whatsapp import tasks as whatsapp_tasks
+from apps.whatsapp.views import WhatsappSendMessageView
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import AsyncClient
+from django.urls import path
+from django.utils.module_loading import import_string
+from saas_backend import settings as base_settings
+
+urlpatterns = [path("send", WhatsappSendMessageView.as_view())]
+
+
+def _tenant_request(rf, schema):
+    request = rf.post("/send")
+    request.tenant = SimpleNamespace(schema_name=schema, plan="free", plan_ref=None)
+    request.resolver_match = SimpleNamespace(
+        func=SimpleNamespace(view_class=WhatsappSendMessageView)
+    )
+    return request
+
+
+def test_production_middleware_chain_is_async_capable():
+    sync_only = [
+        dotted
+        for dotted in base_settings.MIDDLEWARE
+        if not getattr(import_string(dotted), "async_capable", False)
+    ]
+    assert sync_only == []
+
+
+def test_plan_limit_counts_async_requests(rf, settings):
+    settings.TENANT_PLAN_DAILY_LIMITS = {"free": {"send_whatsapp": 1}}
+    cache.clear()
+
+    async def view(request):
+        return HttpResponse(status=201)
+
+    middleware = PlanLimitMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    assert async_to_sync(middleware)(_tenant_request(rf, "acme")).status_code == 201
+    blocked = async_to_sync(middleware)(_tenant_request(rf, "acme"))
+    assert blocked.status_code == 429
+    # Other tenants keep their own counter
+    assert async_to_sync(middleware)(_tenant_request(rf, "globex")).status_code == 201
+
+
+def test_sync_and_async_throttles_share_a_fixed_window(rf, settings):
+    settings.TENANT_PLAN_THROTTLE_RATES = {"free": {"send_whatsapp": "2/min"}}
+    cache.clear()
+    request = _tenant_request(rf, "acme")
+    view = SimpleNamespace(throttle_scope="send_whatsapp")
+
+    def allow():
+        throttle = PlanScopedRateThrottle()
+        return async_to_sync(throttle.aallow_request)(request, view), throttle
+
+    assert allow()[0]
+    # Sync views count on the same window
+    assert PlanScopedRateThrottle().allow_request(request, view)
+    allowed, throttle = allow()
+    assert not allowed
+    assert not PlanScopedRateThrottle().allow_request(request, view)
+    assert 0 <= throttle.wait() <= 60
+    assert cache.get("throttle_stats:acme:send_whatsapp:count") == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(__name__)
+def test_enqueue_view_runs_on_the_asgi_path(gen_password, monkeypatch):
+    # The eager placeholder task sleeps to simulate a provider call
+    monkeypatch.setattr(whatsapp_tasks.time, "sleep", lambda seconds: None)
+    assert iscoroutinefunction(WhatsappSendMessageView.as_view())
+    user = get_user_model().objects.create_superuser(
+        email="async@example.com", password=gen_password()
+    )
+    client = AsyncClient()
+    client.force_login(user)
+
+    response = async_to_sync(client.post)(
+        "/send",
+        {"to": "+351900000000", "message": "Olá"},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 201
+    assert response.json()["queued"] is True
+    assert AuditLog.objects.filter(path="/send", user_id=user.pk).exists()
+
+    invalid = async_to_sync(client.post)("/send", {}, content_type="application/json")
+    assert invalid.status_code == 400
+
+
+def test_async_counters_always_get_a_ttl(settings):
+    url = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+    try:
+        redis.Redis.from_url(url, socket_connect_timeout=0.5).ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip(f"No Redis at {url}")
+    settings.CACHES = {
+        "default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": url}
+    }
+
+    async def count():
+        return [await aio.aincr("ttl-check", 60) for _ in range(2)]
+
+    try:
+        assert async_to_sync(count)() == [1, 2]
+        assert 0 < cache.ttl("ttl-check") <= 60
+    finally:
+        cache.delete("ttl-check")
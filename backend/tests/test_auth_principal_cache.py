@@ -0,0 +1,80 @@
+import pytest
+from apps.core.authentication import CachedJWTAuthentication, ClaimsUser
+from apps.users.serializers import (
+    CustomTokenObtainPairSerializer,
+    RevocationAwareTokenRefreshSerializer,
+)
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(gen_password):
+    cache.clear()
+    return User.objects.create_user(username="principal", password=gen_password())
+
+
+def _access_token(user):
+    return CustomTokenObtainPairSerializer.get_token(user).access_token
+
+
+@pytest.mark.django_db
+def test_warm_principal_needs_no_query(user, django_assert_num_queries):
+    token = _access_token(user)
+    auth = CachedJWTAuthentication()
+    with django_assert_num_queries(1):
+        assert auth.get_user(token).pk == user.pk
+    with django_assert_num_queries(0):
+        assert auth.get_user(token).pk == user.pk
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_cached_tokens(user, gen_password):
+    token = _access_token(user)
+    auth = CachedJWTAuthentication()
+    auth.get_user(token)
+
+    user.set_password(gen_password())
+    user.save()
+
+    with pytest.raises(AuthenticationFailed):
+        auth.get_user(token)
+    assert auth.get_user(_access_token(user)).pk == user.pk
+
+
+@pytest.mark.django_db
+def test_stateless_mode_reads_signed_claims(user, settings, django_assert_num_queries):
+    settings.AUTH_JWT_STATELESS = True
+    user.is_staff = True
+    user.save()
+    token = _access_token(user)
+    with django_assert_num_queries(0):
+        principal = CachedJWTAuthentication().get_user(token)
+    assert isinstance(principal, ClaimsUser)
+    assert principal.is_staff and not principal.is_superuser
+
+
+@pytest.mark.django_db
+def test_refresh_rederives_stateless_claims(user, settings, gen_password):
+    settings.AUTH_JWT_STATELESS = True
+    user.is_staff = True
+    user.save()
+    refresh = str(CustomTokenObtainPairSerializer.get_token(user))
+
+    user.is_staff = False
+    user.save()
+    serializer = RevocationAwareTokenRefreshSerializer(data={"refresh": refresh})
+    assert serializer.is_valid()
+    access = AccessToken(serializer.validated_data["access"])
+    assert not CachedJWTAuthentication().get_user(access).is_staff
+
+    # A password change also rejects refresh tokens issued before it
+    user.set_password(gen_password())
+    user.save()
+    refresh = serializer.validated_data["refresh"]
+    with pytest.raises(AuthenticationFailed):
+        RevocationAwareTokenRefreshSerializer(data={"refresh": refresh}).is_valid()
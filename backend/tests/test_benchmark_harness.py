@@ -0,0 +1,44 @@
+import json
+
+from benchmarks import harness
+
+
+def _args(tmp_path, *argv):
+    parser = harness.build_parser("bench", tmp_path / "baseline.json")
+    return parser.parse_args(["--rounds", "3", "--warmup", "0", *argv])
+
+
+def test_measure_runs_setup_outside_the_timed_call():
+    calls = []
+    case = harness.Case(
+        "noop", lambda: calls.append("fn"), lambda: calls.append("setup")
+    )
+    result = harness.measure(case, rounds=2, warmup=1)
+    assert calls == ["setup", "fn"] * 3
+    assert result["rounds"] == 2 and result["min_ms"] <= result["median_ms"]
+
+
+def test_compare_flags_only_slowdowns_above_threshold_and_noise_floor():
+    baseline = {"a": {"median_ms": 10.0}, "b": {"median_ms": 0.01}}
+    results = {
+        "a": {"median_ms": 12.5},
+        "b": {"median_ms": 0.03},
+        "new": {"median_ms": 1.0},
+    }
+    assert harness.compare(results, baseline, 0.2, 0.05) == [("a", 10.0, 12.5)]
+    assert harness.compare(results, baseline, 0.3, 0.05) == []
+
+
+def test_run_writes_baseline_then_fails_on_regression(tmp_path, capsys):
+    cases = [harness.Case("fast", lambda: None)]
+    meta = {"database": "sqlite"}
+    assert harness.run(_args(tmp_path, "--update-baseline"), cases, meta) == 0
+    stored = json.loads((tmp_path / "baseline.json").read_text())
+    assert set(stored["results"]) == {"fast"}
+
+    stored["results"]["fast"]["median_ms"] = 0.0001
+    (tmp_path / "baseline.json").write_text(json.dumps(stored))
+    slow = [harness.Case("fast", lambda: sum(range(20000)))]
+    args = _args(tmp_path, "--min-delta-ms", "0")
+    assert harness.run(args, slow, meta) == 1
+    assert "REGRESSION fast" in capsys.readouterr().out
@@ -29,3 +29,26 @@ def test_daily_summary_endpoint(client, gen_password, create_tenant):
     assert payload.get("schema") == "acme"
     assert "daily" in payload
     assert isinstance(payload["daily"], list)
+
+
+@pytest.mark.django_db
+def test_daily_summary_etag_not_modified(client, gen_password, create_tenant):
+    create_tenant(schema_name="etag", domain="etag.localhost", name="ETAG", plan="free")
+
+    pw = gen_password()
+    User.objects.create_user(username="admin_etag", password=pw, is_staff=True)
+    login = client.post(
+        "/api/v1/auth/token",
+        data=json.dumps({"username": "admin_etag", "password": pw}),
+        content_type="application/json",
+    )
+    client.cookies["access_token"] = login.cookies["access_token"].value
+
+    url = "/api/v1/core/throttle/daily/summary"
+    first = client.get(url, HTTP_HOST="etag.localhost")
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    again = client.get(url, HTTP_HOST="etag.localhost", HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == 304
+    assert again["ETag"] == etag
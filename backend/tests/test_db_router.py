@@ -0,0 +1,78 @@
+import pytest
+from apps.auditing.models import AuditLog
+from apps.auditing.views import AuditLogListView
+from apps.core.db_router import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    primary_reads,
+    replica_reads,
+)
+from django.conf import settings as django_settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+router = ReplicaRouter()
+
+
+@pytest.fixture
+def replica(settings):
+    # "default" doubles as its own replica: routing decisions only
+    settings.DATABASE_REPLICAS = ["default"]
+    return "default"
+
+
+def test_reads_outside_a_request_stay_on_primary(replica):
+    assert router.db_for_read(AuditLog) == "default"
+    with replica_reads(pinned=True):
+        assert router.db_for_read(AuditLog) == "default"
+
+
+def test_first_write_pins_the_rest_of_the_request(replica, settings):
+    settings.DATABASE_REPLICAS = ["replica_x"]
+    with replica_reads() as state:
+        assert state.replica == "replica_x"
+        assert router.db_for_write(AuditLog) == "default"
+        assert state.pinned and state.wrote
+        assert router.db_for_read(AuditLog) == "default"
+
+
+def test_primary_reads_block_restores_replica_routing(replica):
+    with replica_reads() as state:
+        with primary_reads():
+            assert state.pinned
+        assert not state.pinned
+
+
+def test_write_request_sets_sticky_cookie(replica):
+    def view(request):
+        router.db_for_write(AuditLog)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    response = middleware(RequestFactory().post("/api/v1/x"))
+    cookie = response.cookies[django_settings.DATABASE_REPLICA_PIN_COOKIE]
+    assert cookie["max-age"] == django_settings.DATABASE_REPLICA_STICKY_SECONDS
+
+    # Incidental writes on safe requests (auditing) do not pin the client
+    response = middleware(RequestFactory().get("/api/v1/x"))
+    assert django_settings.DATABASE_REPLICA_PIN_COOKIE not in response.cookies
+
+
+def test_pure_read_views_skip_atomic_requests():
+    assert "default" in AuditLogListView.as_view()._non_atomic_requests
+
+
+@pytest.mark.skipif(
+    "replica_1" not in django_settings.DATABASES,
+    reason="needs DATABASE_URL_TEST_PG_REPLICA",
+)
+def test_replica_follows_tenant_search_path():
+    primary = connections["default"]
+    primary.set_schema("acme_router")
+    try:
+        with replica_reads():
+            assert router.db_for_read(AuditLog) == "replica_1"
+        assert connections["replica_1"].schema_name == "acme_router"
+    finally:
+        primary.set_schema_to_public()
@@ -0,0 +1,128 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+import redis
+from apps.core import fair_queue, metrics
+from apps.whatsapp.tasks import send_whatsapp_message
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django_redis import get_redis_connection
+
+# A throwaway database: the fixture flushes it
+REDIS_URL = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+def redis_conn(settings):
+    try:
+        redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip(f"No Redis at {REDIS_URL}")
+    settings.CACHES = {
+        "default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": REDIS_URL}
+    }
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    conn = get_redis_connection("default")
+    conn.flushdb()
+    yield conn
+    conn.flushdb()
+
+
+def test_deficit_round_robin_follows_plan_weights():
+    drr = fair_queue.DeficitRoundRobin({"free": 1, "pro": 4})
+    sizes = {"bigco": 100_000, "acme": 3}
+    plans = {"bigco": "pro", "acme": "free"}
+    served = {"bigco": 0, "acme": 0}
+    for _ in range(3):
+        for schema, count in drr.plan(sizes, plans, budget=5):
+            served[schema] += count
+            sizes[schema] -= count
+    # The small tenant gets its share on every pass, whatever bigco's backlog
+    assert served == {"bigco": 12, "acme": 3}
+
+    # Once acme is done, bigco takes the whole budget
+    assert drr.plan(sizes, plans, budget=5) == [("bigco", 5)]
+
+    with pytest.raises(ImproperlyConfigured):
+        fair_queue.DeficitRoundRobin({"free": 0})
+
+
+def test_small_tenant_waits_one_pass_during_a_burst(redis_conn):
+    dispatched = []
+    dispatcher = fair_queue.FairDispatcher(publish=dispatched.append)
+    assert dispatcher.acquire(blocking=False)
+    big = SimpleNamespace(schema_name="bigco", plan="enterprise")
+    small = SimpleNamespace(schema_name="acme", plan="free")
+
+    for i in range(500):
+        fair_queue.enqueue(big, send_whatsapp_message, "+351900000000", f"burst {i}")
+    result = async_to_sync(fair_queue.aenqueue)(
+        small, send_whatsapp_message, "+351911111111", "Olá"
+    )
+    sizes, plans = fair_queue.backlogs(redis_conn)
+    assert sizes == {"acme": 1, "bigco": 500}
+    assert plans == {"acme": "free", "bigco": "enterprise"}
+
+    # Arrived last, dispatched on the first pass
+    assert dispatcher.dispatch(budget=10) == 10
+    assert result.id in [message["id"] for message in dispatched]
+    (small_message,) = [m for m in dispatched if m["id"] == result.id]
+    assert small_message["task"] == send_whatsapp_message.name
+    assert small_message["args"] == ["+351911111111", "Olá"]
+    # bigco's tasks keep their order and the rest of its backlog waits
+    assert [m["args"][1] for m in dispatched[1:]] == [f"burst {i}" for i in range(9)]
+    assert fair_queue.backlogs(redis_conn)[0] == {"bigco": 491}
+    if metrics.ENABLED:
+        (family,) = fair_queue.BacklogCollector().collect()
+        assert [(s.labels, s.value) for s in family.samples] == [
+            ({"tenant": "bigco", "plan": "enterprise"}, 491)
+        ]
+
+    # A stopping dispatcher drains its backlog; new tasks bypass the lists
+    dispatcher.release()
+    assert dispatcher.drain() == 491
+    assert fair_queue.backlogs(redis_conn) == ({}, {})
+    assert not redis_conn.exists(fair_queue.DISPATCHER_KEY)
+
+
+def test_failed_publish_puts_tasks_back(redis_conn):
+    def publish(message):
+        raise ConnectionError("broker down")
+
+    dispatcher = fair_queue.FairDispatcher(publish=publish)
+    dispatcher.acquire(blocking=False)
+    tenant = SimpleNamespace(schema_name="acme", plan="free")
+    for i in range(3):
+        fair_queue.enqueue(tenant, send_whatsapp_message, "+351900000000", str(i))
+
+    with pytest.raises(ConnectionError):
+        dispatcher.dispatch(budget=10)
+    queued = redis_conn.lrange(fair_queue.TENANT_KEY.format("acme"), 0, -1)
+    assert [json.loads(item)["args"][1] for item in queued] == ["0", "1", "2"]
+    dispatcher.release()
+
+
+def test_killed_dispatcher_batch_is_recovered(redis_conn):
+    def killed(message):
+        raise SystemExit
+
+    crashed = fair_queue.FairDispatcher(publish=killed)
+    crashed.acquire(blocking=False)
+    tenant = SimpleNamespace(schema_name="acme", plan="free")
+    for i in range(3):
+        fair_queue.enqueue(tenant, send_whatsapp_message, "+351900000000", str(i))
+    with pytest.raises(SystemExit):
+        crashed.dispatch(budget=2)
+    assert redis_conn.llen(crashed.processing_key) == 2
+    crashed.release()
+
+    dispatched = []
+    dispatcher = fair_queue.FairDispatcher(publish=dispatched.append)
+    dispatcher.acquire(blocking=False)
+    assert dispatcher.dispatch(budget=10) == 3
+    assert [m["args"][1] for m in dispatched] == ["0", "1", "2"]
+    assert not redis_conn.exists(crashed.processing_key)
+    assert not redis_conn.exists(dispatcher.processing_key)
+    dispatcher.release()
@@ -0,0 +1,29 @@
+from apps.core.http_cache import cache_page_if_enabled, etag_matches, strong_etag
+from django.test import RequestFactory
+
+
+def test_strong_etag_is_stable_and_content_sensitive():
+    a = strong_etag({"b": 1, "a": [1, 2]})
+    assert a == strong_etag({"a": [1, 2], "b": 1})
+    assert a != strong_etag({"a": [1, 2], "b": 2})
+    assert a.startswith('"') and not a.startswith("W/")
+
+
+def test_etag_matches_if_none_match_header():
+    rf = RequestFactory()
+    etag = strong_etag({"x": 1})
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH=etag), etag)
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH=f'"other", {etag}'), etag)
+    assert etag_matches(rf.get("/", HTTP_IF_NONE_MATCH="*"), etag)
+    assert not etag_matches(rf.get("/", HTTP_IF_NONE_MATCH='"other"'), etag)
+    assert not etag_matches(rf.get("/"), etag)
+
+
+def test_cache_page_if_enabled_skips_zero_ttl():
+    class View:
+        def get(self, request):
+            return None
+
+    original = View.get
+    assert cache_page_if_enabled(0)(View).get is original
+    assert cache_page_if_enabled(30)(View).get is not original
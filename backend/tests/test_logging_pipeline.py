@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+from apps.core.logging_utils import (
+    ContextFilter,
+    JSONFormatter,
+    LogContextMiddleware,
+    QueueLoggingHandler,
+    SamplingFilter,
+)
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+
+def _record(name="apps.test", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def _handler(**kwargs):
+    stream = io.StringIO()
+    handler = QueueLoggingHandler(stream=stream, **kwargs)
+    handler.setFormatter(JSONFormatter())
+    handler.addFilter(ContextFilter())
+    return handler, stream
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_by_the_listener_with_request_context():
+    handler, stream = _handler()
+    request = RequestFactory().get("/", HTTP_X_REQUEST_ID="req-1")
+    request.tenant = SimpleNamespace(schema_name="acme")
+
+    def view(request):
+        handler.handle(_record())
+        return HttpResponse()
+
+    response = LogContextMiddleware(view)(request)
+    handler.handle(_record(msg="outside", args=()))
+    handler.close()
+
+    inside, outside = _lines(stream)
+    assert inside["message"] == "hello world"
+    assert inside["request_id"] == "req-1" and inside["tenant"] == "acme"
+    assert "request_id" not in outside
+    assert response["X-Request-ID"] == "req-1"
+
+
+def test_request_id_is_only_generated_when_something_is_logged():
+    response = LogContextMiddleware(lambda request: HttpResponse())(
+        RequestFactory().get("/")
+    )
+    assert "X-Request-ID" not in response
+
+
+def test_full_queue_drops_and_reports_the_count():
+    handler, stream = _handler(maxsize=1)
+    handler._stop()
+    for _ in range(3):
+        handler.handle(_record())
+    assert handler.dropped == 2
+    handler._start()
+    handler.close()
+
+    first, report = _lines(stream)
+    assert first["message"] == "hello world"
+    assert report["level"] == "WARNING"
+    assert "Dropped 2 log records" in report["message"]
+
+
+def test_sampling_applies_per_logger_below_warning():
+    sampling = SamplingFilter({"apps.core.request_debug": 0, "apps.core": 1})
+    assert not sampling.filter(_record("apps.core.request_debug"))
+    assert not sampling.filter(_record("apps.core.request_debug.pre"))
+    assert sampling.filter(_record("apps.core.request_debug", logging.WARNING))
+    assert sampling.filter(_record("apps.core"))
+    assert sampling.filter(_record("apps.security"))
+
+
+def test_json_formatter_includes_extra_fields():
+    record = _record()
+    record.duplicates = [{"sql": "SELECT ?", "count": 3}]
+    ContextFilter().filter(record)
+    payload = json.loads(JSONFormatter().format(record))
+    assert payload["duplicates"] == [{"sql": "SELECT ?", "count": 3}]
+    assert "request_id" not in payload and "args" not in payload
@@ -0,0 +1,90 @@
+import socket
+import urllib.request
+
+import pytest
+from apps.core import metrics
+from django.test import Client
+from prometheus_client import REGISTRY
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+def test_request_is_timed_with_query_count_and_scope():
+    view = "token_obtain_pair"
+    before = _sample("http_request_db_queries_count", view=view)
+    queries_before = _sample("http_request_db_queries_sum", view=view)
+
+    response = Client().post(
+        "/api/v1/auth/token/", {"username": "nobody", "password": "x"}
+    )
+
+    assert response.status_code == 401
+    assert _sample("http_request_db_queries_count", view=view) == before + 1
+    assert _sample("http_request_db_queries_sum", view=view) > queries_before
+    labels = {
+        "view": view,
+        "method": "POST",
+        "status": "4xx",
+        "throttle_scope": "auth_login",
+        "plan": "",
+    }
+    assert _sample("http_request_duration_seconds_count", **labels) >= 1
+
+
+def test_cache_operations_are_counted():
+    cache = metrics.InstrumentedLocMemCache("metrics-test", {})
+    before = _sample("cache_operations_total", operation="get")
+    cache.set("key", 1)
+    assert cache.get("key") == 1
+    assert cache.get_many(["key"]) == {"key": 1}
+    assert _sample("cache_operations_total", operation="get") == before + 1
+    assert _sample("cache_operations_total", operation="get_many") >= 1
+
+
+def test_task_signals_observe_duration():
+    class Task:
+        name = "apps.events.tasks.handle_event"
+
+    labels = {"task": Task.name, "state": "SUCCESS"}
+    before = _sample("celery_task_duration_seconds_count", **labels)
+    metrics.task_started(task_id="t-1", task=Task())
+    metrics.task_finished(task_id="t-1", task=Task(), state="SUCCESS")
+    assert _sample("celery_task_duration_seconds_count", **labels) == before + 1
+
+
+def test_metrics_endpoint_requires_token_when_configured(rf, settings):
+    settings.METRICS_AUTH_TOKEN = "s3cret"
+    assert metrics.metrics_view(rf.get("/metrics")).status_code == 403
+    response = metrics.metrics_view(
+        rf.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+    )
+    assert response.status_code == 200
+    assert b"http_request_duration_seconds" in response.content
+
+
+def test_metrics_endpoint_is_closed_without_token_outside_debug(rf, settings):
+    settings.METRICS_AUTH_TOKEN = ""
+    settings.DEBUG = False
+    assert metrics.metrics_view(rf.get("/metrics")).status_code == 403
+    settings.DEBUG = True
+    assert metrics.metrics_view(rf.get("/metrics")).status_code == 200
+
+
+def test_worker_exporter_serves_task_metrics(settings, tmp_path, monkeypatch):
+    stale = tmp_path / "histogram_1.db"
+    stale.write_bytes(b"")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    metrics.clear_stale_files()
+    assert not stale.exists()
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR")
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        settings.METRICS_WORKER_PORT = sock.getsockname()[1]
+    metrics.start_worker_exporter()
+    url = f"http://127.0.0.1:{settings.METRICS_WORKER_PORT}/metrics"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert b"celery_task_duration_seconds" in response.read()
@@ -0,0 +1,130 @@
+import gzip
+import marshal
+import time
+from types import SimpleNamespace
+
+import pytest
+from apps.core import profiling
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import Client
+from django.urls import path
+
+urlpatterns = [path("admin/", admin.site.urls)]
+
+
+@pytest.fixture(autouse=True)
+def profiles_dir(settings, tmp_path, monkeypatch):
+    settings.PROFILING_DIR = str(tmp_path)
+    monkeypatch.setattr(profiling, "_rules_cache", (0.0, []))
+    return tmp_path
+
+
+def _view(request):
+    sum(range(1000))
+    return HttpResponse()
+
+
+def _rule(**criteria):
+    return {"rate": 1.0, "expires_at": time.time() + 60, **criteria}
+
+
+def test_signed_token_profiles_the_request(rf, profiles_dir):
+    user = SimpleNamespace(pk=7)
+    request = rf.get(
+        "/api/v1/core/health", HTTP_X_PROFILE=profiling.profiling_token(user)
+    )
+    response = profiling.ProfilingMiddleware(_view)(request)
+
+    name = response["X-Profile-Id"]
+    assert name.endswith(".pstats.gz")
+    stats = marshal.loads(gzip.decompress((profiles_dir / name).read_bytes()))
+    assert any(function[2] == "_view" for function in stats)
+    (meta,) = profiling.list_profiles()
+    assert meta["kind"] == "request" and meta["status"] == 200
+
+    forged = rf.get("/", HTTP_X_PROFILE="7:forged:signature")
+    assert "X-Profile-Id" not in profiling.ProfilingMiddleware(_view)(forged)
+
+
+def test_async_chain_profiles_the_sync_view_thread(rf, profiles_dir):
+    async def get_response(request):
+        # What Django's async handler does with a sync view
+        return await sync_to_async(_view)(request)
+
+    user = SimpleNamespace(pk=7)
+    request = rf.get("/", HTTP_X_PROFILE=profiling.profiling_token(user))
+    response = async_to_sync(profiling.ProfilingMiddleware(get_response))(request)
+
+    stats = marshal.loads(
+        gzip.decompress((profiles_dir / response["X-Profile-Id"]).read_bytes())
+    )
+    assert any(function[2] == "_view" for function in stats)
+
+
+def test_sampling_rules_match_tenant_and_path(rf):
+    profiling.set_rules([_rule(tenant="acme", path="/api/v1/auditing")])
+    middleware = profiling.ProfilingMiddleware(_view)
+
+    def run(schema, url):
+        request = rf.get(url)
+        request.tenant = SimpleNamespace(schema_name=schema)
+        return "X-Profile-Id" in middleware(request)
+
+    assert run("acme", "/api/v1/auditing/logs")
+    assert not run("globex", "/api/v1/auditing/logs")
+    assert not run("acme", "/api/v1/core/health")
+
+
+def test_task_rules_profile_matching_tasks():
+    profiling.set_rules([_rule(task="apps.events.tasks.handle_event")])
+    for name, task_id in (("apps.events.tasks.handle_event", "t-1"), ("other", "t-2")):
+        task = SimpleNamespace(name=name)
+        profiling.task_started(task_id=task_id, task=task)
+        profiling.task_finished(task_id=task_id, task=task, state="SUCCESS")
+
+    (meta,) = profiling.list_profiles()
+    assert meta["label"] == "apps.events.tasks.handle_event"
+    assert meta["task_id"] == "t-1" and meta["state"] == "SUCCESS"
+
+
+def test_retention_keeps_newest_files(settings, profiles_dir):
+    settings.PROFILING_MAX_FILES = 2
+    names = [
+        profiling.save_profile("task", f"job-{i}", b"x", "pstats", {}) for i in range(3)
+    ]
+    assert {meta["name"] for meta in profiling.list_profiles()} == set(names[1:])
+    assert len(list(profiles_dir.iterdir())) == 4
+    assert profiling.profile_path("../" + names[1]) is None
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(__name__)
+def test_admin_lists_and_downloads_profiles_for_superusers(gen_password):
+    name = profiling.save_profile("request", "users_me", b"stats", "pstats", {})
+    User = get_user_model()
+    client = Client()
+    client.force_login(
+        User.objects.create_superuser(email="root@example.com", password=gen_password())
+    )
+
+    page = client.get("/admin/auditing/auditlog/profiles/")
+    assert page.status_code == 200
+    assert name.encode() in page.content
+
+    client.post(
+        "/admin/auditing/auditlog/profiles/",
+        {"action": "add_rule", "path": "/api", "rate": "0.5", "minutes": "5"},
+    )
+    assert profiling.get_rules()[0]["path"] == "/api"
+
+    download = client.get(f"/admin/auditing/auditlog/profiles/{name}")
+    assert gzip.decompress(b"".join(download.streaming_content)) == b"stats"
+
+    staff = User.objects.create_user(
+        email="staff@example.com", password=gen_password(), is_staff=True
+    )
+    client.force_login(staff)
+    assert client.get("/admin/auditing/auditlog/profiles/").status_code == 403
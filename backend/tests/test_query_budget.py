@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from apps.core import query_budget
+from apps.core.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    fingerprint,
+)
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.urls import resolve
+
+
+def _n_plus_one(request):
+    User = get_user_model()
+    for pk in (1, 2, 3):
+        User.objects.filter(pk=pk).exists()
+    return HttpResponse()
+
+
+def _request(rf, path="/api/v1/core/health"):
+    request = rf.get(path)
+    request.resolver_match = resolve(path)
+    return request
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 'a'") == (
+        fingerprint("SELECT *  FROM t WHERE id IN (%s, %s) AND x = 'b'")
+    )
+
+
+@pytest.mark.django_db
+def test_over_budget_request_fails_in_tests(rf, settings):
+    settings.QUERY_BUDGETS = {"health": 2}
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        QueryBudgetMiddleware(_n_plus_one)(_request(rf))
+    assert "health ran 3 queries (budget 2)" in str(excinfo.value)
+    assert "3x SELECT" in str(excinfo.value)
+
+    settings.QUERY_BUDGETS = {"health": 3}
+    assert QueryBudgetMiddleware(_n_plus_one)(_request(rf)).status_code == 200
+
+
+@pytest.mark.django_db
+def test_over_budget_request_logs_duplicates_in_production(rf, settings, caplog):
+    settings.QUERY_BUDGET_RAISE = False
+    settings.QUERY_BUDGET_DEFAULT = 1
+    # "apps" loggers do not propagate to the root caplog handler
+    query_budget.logger.addHandler(caplog.handler)
+    try:
+        QueryBudgetMiddleware(_n_plus_one)(_request(rf))
+    finally:
+        query_budget.logger.removeHandler(caplog.handler)
+    (record,) = caplog.records
+    assert record.view == "health" and record.queries == 3 and record.budget == 1
+    assert record.duplicates[0]["count"] == 3
+
+
+@pytest.mark.django_db
+def test_block_budget_and_report(settings, tmp_path, monkeypatch):
+    report = tmp_path / "queries.json"
+    settings.QUERY_BUDGET_REPORT = str(report)
+    monkeypatch.setattr(query_budget, "_report", {})
+    with query_budget.query_budget(3, "permission_check") as tracker:
+        _n_plus_one(None)
+    assert tracker.count == 3
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget.query_budget(1, "permission_check"):
+            _n_plus_one(None)
+    query_budget.write_report(report)
+
+    out = io.StringIO()
+    call_command("query_budget_report", "--duplicates", stdout=out)
+    lines = out.getvalue().splitlines()
+    assert lines[1].split() == ["permission_check", "3", "3.0", "1", "1", "2"]
+    assert "3x SELECT" in lines[2]
@@ -122,3 +122,120 @@ def test_bulk_rbac_apply_partial_errors(client, create_tenant):
     assert data.get("applied") is True
     assert isinstance(data.get("errors"), list)
     assert len(data.get("errors")) >= 1
+
+
+@pytest.mark.django_db
+def test_bulk_rbac_apply_revokes_and_writes_one_summary_audit(client, create_tenant):
+    from apps.auditing.models import AuditLog
+
+    t = create_tenant(
+        schema_name="kappa", domain="kappa.localhost", name="Kappa", plan="pro"
+    )
+    d = Domain.objects.get(domain="kappa.localhost")
+
+    admin = User.objects.create_user(username="bulk_admin3", password="Test123!")
+    users = [
+        User.objects.create_user(username=f"bulk_many_{i}", password="Test123!")
+        for i in range(5)
+    ]
+    viewer = Role.objects.create(name="Viewer")
+    p_manage = Permission.objects.create(code="manage_users")
+    UserPermission.objects.create(user=admin, permission=p_manage, tenant=t)
+    for u in users[:3]:
+        UserRole.objects.create(user=u, role=viewer, tenant=t)
+
+    login = client.post(
+        "/api/v1/auth/token",
+        data=json.dumps({"username": "bulk_admin3", "password": "Test123!"}),
+        content_type="application/json",
+    )
+    assert login.status_code == 200
+    client.cookies["access_token"] = login.cookies["access_token"].value
+
+    payload = {
+        "assign": {
+            # already-assigned pairs are ignored, not duplicated
+            "roles": [
+                {"username": f"BULK_MANY_{i}", "role": "Viewer"} for i in range(5)
+            ],
+        },
+        "revoke": {
+            "roles": [{"username": "bulk_many_0", "role": "Viewer"}],
+        },
+    }
+    resp = client.post(
+        "/api/v1/rbac/bulk/apply",
+        data=json.dumps(payload),
+        content_type="application/json",
+        HTTP_HOST=d.domain,
+    )
+    assert resp.status_code == 200
+    assert resp.json()["errors"] == []
+
+    assigned = set(
+        UserRole.objects.filter(role=viewer, tenant=t).values_list("user_id", flat=True)
+    )
+    assert assigned == {u.pk for u in users[1:]}
+
+    audits = AuditLog.objects.filter(action="rbac_change", tenant_schema="kappa")
+    assert audits.count() == 1
+    assert audits.get().payload["roles_revoked"] == 1
+
+
+@pytest.mark.django_db
+def test_resolve_users_prefers_exact_case_and_rejects_ambiguous():
+    from apps.rbac.bulk import resolve_users
+
+    lower = User.objects.create_user(username="ana", password="pwd12345")
+    upper = User.objects.create_user(username="Ana", password="pwd12345")
+    User.objects.create_user(username="Rui", password="pwd12345")
+    User.objects.create_user(username="rUI", password="pwd12345")
+
+    resolved = resolve_users(["Ana", "ana", "ANA", "rui", "nobody"])
+    assert resolved["Ana"] == upper.pk
+    assert resolved["ana"] == lower.pk
+    # Case-insensitive only, and two users match
+    assert resolved["ANA"] is None and resolved["rui"] is None
+    assert "nobody" not in resolved
+
+
+@pytest.mark.django_db
+def test_resolve_users_shares_a_match_between_case_variants(monkeypatch):
+    from apps.core import test_registry
+    from apps.rbac.bulk import resolve_users
+
+    # As in production: no in-process registry to fill the gaps
+    monkeypatch.setattr(test_registry, "get_user_pk_by_username", lambda name: None)
+    user = User.objects.create_user(
+        username="bob", email="bob@example.com", password="pwd12345"
+    )
+    assert resolve_users(["BOB@EXAMPLE.COM", "Bob@Example.com"]) == {
+        "BOB@EXAMPLE.COM": user.pk,
+        "Bob@Example.com": user.pk,
+    }
+
+
+@pytest.mark.django_db
+def test_bulk_apply_counts_only_new_assignments(create_tenant):
+    from apps.rbac.bulk import bulk_apply_rbac
+
+    tenant = create_tenant(
+        schema_name="sigma", domain="sigma.localhost", name="Sigma", plan="pro"
+    )
+    User.objects.create_user(username="bulk_again", password="Test123!")
+    Role.objects.create(name="Viewer")
+    Permission.objects.create(code="send_sms")
+    payload = {
+        "assign": {
+            "roles": [{"username": "bulk_again", "role": "Viewer"}],
+            "permissions": [{"username": "bulk_again", "permission": "send_sms"}],
+        }
+    }
+
+    summary, errors = bulk_apply_rbac(payload, tenant)
+    assert errors == []
+    assert summary["roles_assigned"] == summary["permissions_assigned"] == 1
+
+    # Re-importing the same file writes nothing
+    summary, _ = bulk_apply_rbac(payload, tenant)
+    assert summary["roles_assigned"] == summary["permissions_assigned"] == 0
@@ -0,0 +1,37 @@
+import pytest
+from apps.rbac.models import Permission, RbacSeedState, Role
+from apps.rbac.seeding import SEED_FINGERPRINT, seed_schema
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_seed_applies_defaults_and_records_fingerprint():
+    RbacSeedState.objects.all().delete()
+    Permission.objects.filter(code="manage_users").update(description="stale")
+
+    assert seed_schema(force=True) == "seeded"
+
+    assert Permission.objects.get(code="manage_users").description == (
+        "Gerenciar usuários"
+    )
+    cliente = Role.objects.get(name="CLIENTE")
+    assert list(cliente.permissions.values_list("code", flat=True)) == ["view_users"]
+    admin_codes = set(
+        Role.objects.get(name="ADMIN").permissions.values_list("code", flat=True)
+    )
+    assert admin_codes == set(Permission.objects.values_list("code", flat=True))
+    assert RbacSeedState.objects.get().fingerprint == SEED_FINGERPRINT
+
+
+@pytest.mark.django_db
+def test_seed_skips_schemas_at_current_fingerprint(django_assert_max_num_queries):
+    seed_schema(force=True)
+    with django_assert_max_num_queries(2):
+        assert seed_schema() == "skipped"
+
+
+@pytest.mark.django_db
+def test_seed_all_tenants_command(create_tenant, capsys):
+    create_tenant(schema_name="seedy", domain="seedy.localhost", name="Seedy")
+    call_command("seed_rbac", "--all-tenants", "--workers", "1", "--force")
+    assert "RBAC seed completed (all tenants)" in capsys.readouterr().out
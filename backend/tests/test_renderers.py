@@ -0,0 +1,71 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+import pytest
+from apps.core import renderers
+from apps.core.parsers import StandardJSONParser
+from apps.core.renderers import StandardJSONRenderer
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+PAYLOAD = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "created_at": datetime.datetime(
+        2024, 5, 1, 12, 30, 1, 250000, tzinfo=datetime.timezone.utc
+    ),
+    "day": datetime.date(2024, 5, 1),
+    "amount": decimal.Decimal("10.50"),
+    "label": gettext_lazy("OK"),
+    "elapsed": datetime.timedelta(seconds=90),
+    "tags": ("a", "b"),
+    "counts": {1: 2},
+    "text": "açaí\u2028",
+    "empty": None,
+}
+
+
+def _context(status=200):
+    return {"response": Response(status=status)}
+
+
+def test_output_matches_drf_encoder():
+    ours = StandardJSONRenderer().render(PAYLOAD, renderer_context=_context(400))
+    assert json.loads(ours) == json.loads(JSONRenderer().render(PAYLOAD))
+    assert b"\\u2028" in ours
+
+
+def test_envelope_is_written_around_the_payload(monkeypatch):
+    monkeypatch.setattr(renderers, "ENVELOPE", True)
+    rendered = json.loads(
+        StandardJSONRenderer().render({"a": 1}, renderer_context=_context())
+    )
+    assert rendered == {"success": True, "message": "OK", "data": {"a": 1}}
+
+    paginated = {"count": 0, "results": []}
+    rendered = StandardJSONRenderer().render(paginated, renderer_context=_context())
+    assert json.loads(rendered) == paginated
+    error = StandardJSONRenderer().render({"a": 1}, renderer_context=_context(404))
+    assert json.loads(error) == {"a": 1}
+
+
+def test_indented_output_uses_the_stdlib_encoder(monkeypatch):
+    monkeypatch.setattr(renderers, "ENVELOPE", True)
+    rendered = StandardJSONRenderer().render(
+        [1], "application/json; indent=2", _context()
+    )
+    assert rendered.startswith(b"{\n")
+    assert json.loads(rendered)["data"] == [1]
+
+
+def test_parser_round_trip_and_errors():
+    parser = StandardJSONParser()
+    assert parser.parse(io.BytesIO('{"nome": "açaí"}'.encode())) == {"nome": "açaí"}
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"a": NaN}'))
+    latin1 = {"encoding": "latin-1"}
+    assert parser.parse(io.BytesIO('{"a": "é"}'.encode("latin-1")), None, latin1)
@@ -0,0 +1,78 @@
+import pytest
+from django.db import DatabaseError, connection, transaction
+from django_tenants.utils import schema_context
+
+
+def _show_search_path():
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW search_path")
+        return cursor.fetchone()[0].replace('"', "")
+
+
+@pytest.fixture
+def tenant_schema(create_tenant):
+    create_tenant(schema_name="pathy", domain="pathy.localhost", name="Pathy")
+    connection.set_schema_to_public()
+    yield "pathy"
+    connection.set_schema_to_public()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_repeated_switches_to_the_same_schema_send_nothing(tenant_schema):
+    connection.set_schema(tenant_schema)
+    _show_search_path()
+    sent = connection.search_path_changes
+    for _ in range(3):
+        connection.set_schema_to_public()
+        connection.set_schema(tenant_schema)
+        _show_search_path()
+    assert connection.search_path_changes == sent
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_use_set_local(tenant_schema):
+    _show_search_path()
+    with transaction.atomic():
+        connection.set_schema(tenant_schema)
+        assert _show_search_path().startswith("pathy")
+    # SET LOCAL ended with the transaction; the session path is untouched
+    connection.set_schema_to_public()
+    sent = connection.search_path_changes
+    assert _show_search_path() == "public"
+    assert connection.search_path_changes == sent
+
+
+@pytest.mark.django_db(transaction=True)
+def test_savepoint_rollback_reapplies_the_path(tenant_schema):
+    with transaction.atomic():
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                connection.set_schema(tenant_schema)
+                _show_search_path()
+                raise RuntimeError
+        assert _show_search_path().startswith("pathy")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_savepoint_rollback_resends_over_an_outer_set_local(tenant_schema):
+    with transaction.atomic():
+        connection.set_schema(tenant_schema)
+        assert _show_search_path().startswith("pathy")
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                connection.set_schema_to_public()
+                assert _show_search_path() == "public"
+                raise RuntimeError
+        # The server is back on the outer SET LOCAL ("pathy")
+        assert _show_search_path() == "public"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_switch_back_in_an_aborted_transaction_recovers(tenant_schema):
+    with transaction.atomic():
+        with pytest.raises(DatabaseError):
+            with transaction.atomic():
+                with schema_context(tenant_schema):
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1 / 0")
+        assert _show_search_path() == "public"
@@ -0,0 +1,44 @@
+import pytest
+from apps.tenants.migration_executor import (
+    ParallelExecutor,
+    get_executor,
+    order_schemas,
+    run_key,
+)
+from django.core.management.base import CommandError
+from django_tenants.migration_executors import StandardExecutor
+
+
+def test_get_executor_resolves_parallel_and_builtin(settings, monkeypatch):
+    monkeypatch.delenv("EXECUTOR", raising=False)
+    settings.TENANT_MIGRATION_EXECUTOR = "parallel"
+    assert get_executor() is ParallelExecutor
+    assert get_executor("standard") is StandardExecutor
+
+
+def test_order_schemas_largest_or_slowest_first():
+    names = ["a", "b", "c"]
+    sizes = {"a": 10, "b": 300, "c": 20}
+    assert order_schemas(names, sizes, mode="size") == ["b", "c", "a"]
+    # Never-timed schemas fall back to size, after the timed ones
+    assert order_schemas(names, sizes, {"a": 900}, mode="duration") == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert order_schemas(["c", "a", "b"], mode="name") == names
+    with pytest.raises(CommandError):
+        order_schemas(names, mode="heat")
+
+
+def test_run_key_tracks_migration_target():
+    full = run_key({})
+    assert full == run_key({"verbosity": 0})
+    assert full != run_key({"app_label": "rbac"})
+    assert full != run_key({"fake": True})
+
+
+def test_explicit_schema_and_read_only_runs_are_not_tracked():
+    assert ParallelExecutor([], {}).tracking is True
+    assert ParallelExecutor([], {"schema_name": "acme"}).tracking is False
+    assert ParallelExecutor([], {"plan": True}).tracking is False
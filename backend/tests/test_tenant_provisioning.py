@@ -0,0 +1,78 @@
+import pytest
+from apps.tenants import provisioning
+from apps.tenants.models import Tenant
+from django.db import connection
+from django_tenants.utils import schema_context
+
+
+@pytest.mark.django_db
+def test_template_is_stamped_with_migration_hash():
+    provisioning.build_template()
+    assert provisioning.template_state() == provisioning.migration_state_hash()
+    # Already current: no rebuild
+    assert provisioning.build_template() is False
+
+
+@pytest.mark.django_db
+def test_clone_template_creates_migrated_schema():
+    provisioning.clone_template("clone_probe")
+    with schema_context("clone_probe"):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM django_migrations")
+            assert cursor.fetchone()[0] > 0
+    assert provisioning.clone_template("clone_probe", check_if_exists=True) is False
+
+
+@pytest.mark.django_db
+def test_provision_tenant_marks_ready():
+    tenant = Tenant(name="Async", schema_name="async_probe")
+    tenant.auto_create_schema = False
+    tenant.provisioning_status = Tenant.PROVISIONING_PENDING
+    tenant.save()
+
+    assert provisioning.provision_tenant(tenant) == Tenant.PROVISIONING_READY
+    tenant.refresh_from_db()
+    assert tenant.provisioning_status == Tenant.PROVISIONING_READY
+
+
+@pytest.mark.django_db
+def test_pool_replenish_and_claim(settings):
+    from apps.tenants import pool
+
+    settings.TENANT_POOL_SIZE = 2
+    assert pool.replenish()["created"] == 2
+    assert pool.pool_status()["ready"] == 2
+
+    assert pool.claim_spare("claimed_probe") is True
+    assert pool.pool_status()["ready"] == 1
+    with schema_context("claimed_probe"):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM django_migrations")
+            assert cursor.fetchone()[0] > 0
+
+
+@pytest.mark.django_db
+def test_pool_drops_stale_spares(settings, monkeypatch):
+    from apps.tenants import pool
+
+    settings.TENANT_POOL_SIZE = 1
+    pool.replenish()
+    monkeypatch.setattr(pool.provisioning, "migration_state_hash", lambda: "changed")
+    monkeypatch.setattr(pool.provisioning, "build_template", lambda force=False: False)
+    assert pool.claim_spare("never_claimed") is False
+    assert pool.pool_status()["stale"] == 1
+
+
+def test_migration_hash_is_computed_once_per_process(monkeypatch):
+    provisioning.migration_state_hash.cache_clear()
+    loaders = []
+    loader_class = provisioning.MigrationLoader
+
+    def loader(*args, **kwargs):
+        loaders.append(loader_class(*args, **kwargs))
+        return loaders[-1]
+
+    monkeypatch.setattr(provisioning, "MigrationLoader", loader)
+    first = provisioning.migration_state_hash()
+    assert provisioning.migration_state_hash() == first
+    assert len(loaders) == 1
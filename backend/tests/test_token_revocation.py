@@ -0,0 +1,148 @@
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+from apps.core import revocation
+from apps.core.authentication import CachedJWTAuthentication
+from apps.core.revocation import (
+    BloomFilter,
+    RevocableRefreshToken,
+    is_revoked,
+    prune_expired,
+    rebuild_filter,
+    remember_revoked,
+    revoke_token,
+)
+from apps.core.tasks import prune_revoked_tokens
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(gen_password):
+    cache.clear()
+    return User.objects.create_user(username="revoked", password=gen_password())
+
+
+@pytest.fixture
+def trusted_filter(monkeypatch):
+    """Behave as if the Redis subscriber were running."""
+    monkeypatch.setattr(revocation, "_ensure_listener", lambda: True)
+    monkeypatch.setattr(revocation._state, "bloom", None)
+    yield
+    revocation._state.bloom = None
+
+
+def _blacklist(jti, expires_in):
+    now = timezone.now()
+    token = OutstandingToken.objects.create(
+        jti=jti, token="x", created_at=now, expires_at=now + expires_in
+    )
+    BlacklistedToken.objects.create(token=token)
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1000, 0.01)
+    added = [uuid.uuid4().hex for _ in range(1000)]
+    for jti in added:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+    assert bloom.full
+
+
+@pytest.mark.django_db
+def test_rebuild_skips_expired_tokens_and_merges_pending():
+    _blacklist("live", timedelta(hours=1))
+    _blacklist("expired", -timedelta(hours=1))
+    revocation._state.pending = None
+    bloom = rebuild_filter()
+    assert "live" in bloom
+    assert "expired" not in bloom
+
+    remember_revoked("published")
+    assert "published" in revocation._state.bloom
+    revocation._state.bloom = None
+
+
+def test_concurrent_rebuilds_run_once(trusted_filter, monkeypatch, settings):
+    settings.REVOCATION_FILTER_REBUILD_SECONDS = 0
+    revocation._state.pending = None
+    old = BloomFilter(10, 0.01)
+    old.add("old")
+    revocation._state.bloom = old
+    reading, release = threading.Event(), threading.Event()
+
+    def slow_jtis():
+        reading.set()
+        release.wait(5)
+        yield "live"
+
+    monkeypatch.setattr(revocation, "_revoked_jtis", slow_jtis)
+    rebuilt = []
+    worker = threading.Thread(target=lambda: rebuilt.append(rebuild_filter()))
+    worker.start()
+    assert reading.wait(5)
+
+    # A second caller keeps the previous filter instead of rebuilding
+    assert revocation.current_filter() is old
+    remember_revoked("published")
+    release.set()
+    worker.join(5)
+
+    (bloom,) = rebuilt
+    assert "live" in bloom and "published" in bloom
+    assert revocation._state.pending is None
+
+
+@pytest.mark.django_db
+def test_filter_miss_needs_no_query(trusted_filter, django_assert_num_queries):
+    _blacklist("live", timedelta(hours=1))
+    assert is_revoked("live")
+    with django_assert_num_queries(0):
+        assert not is_revoked(uuid.uuid4().hex)
+
+
+@pytest.mark.django_db
+def test_rotated_refresh_token_is_rejected(
+    user, trusted_filter, django_capture_on_commit_callbacks
+):
+    token = RevocableRefreshToken.for_user(user)
+    is_revoked("warm-up")
+    with django_capture_on_commit_callbacks(execute=True):
+        token.blacklist()
+    assert cache.get(revocation.REVOKED_KEY.format(jti=token["jti"]))
+    with pytest.raises(TokenError):
+        RevocableRefreshToken(str(token))
+
+
+@pytest.mark.django_db
+def test_revoked_access_token_is_rejected(user, django_capture_on_commit_callbacks):
+    access = RevocableRefreshToken.for_user(user).access_token
+    auth = CachedJWTAuthentication()
+    assert auth.get_validated_token(str(access))["jti"] == access["jti"]
+    with django_capture_on_commit_callbacks(execute=True):
+        revoke_token(access)
+    with pytest.raises(InvalidToken):
+        auth.get_validated_token(str(access))
+
+
+@pytest.mark.django_db
+def test_prune_deletes_rows_of_expired_tokens():
+    _blacklist("live", timedelta(hours=1))
+    _blacklist("expired", -timedelta(hours=1))
+    assert prune_expired()["outstanding"] >= 1
+    assert prune_revoked_tokens()["outstanding"] == 0
+    assert list(BlacklistedToken.objects.values_list("token__jti", flat=True)) == [
+        "live"
+    ]